@@ -1,5 +1,4 @@
 import logging
-import json
 from pathlib import Path
 from typing import Optional
 
@@ -11,54 +10,31 @@ from livekit.agents import (
     JobProcess,
     MetricsCollectedEvent,
     RoomInputOptions,
+    RunContext,
     WorkerOptions,
     cli,
+    function_tool,
     metrics,
     tokenize,
-    function_tool,
-    RunContext
 )
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
+from livekit.plugins import deepgram, google, murf, noise_cancellation, silero
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
+from concept_registry import Concept, ConceptRegistry
+from tts_pool import TTSPool
+
 logger = logging.getLogger("agent")
 
 load_dotenv(".env.local")
 
 # Load content from JSON file
-CONTENT_FILE = Path(__file__).parent.parent.parent / "shared-data" / "day4_tutor_content.json"
-
-def load_tutor_content():
-    """Load tutor content from JSON file"""
-    try:
-        with open(CONTENT_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Failed to load tutor content: {e}")
-        return []
-
-TUTOR_CONTENT = load_tutor_content()
-
-def get_concept_by_id(concept_id: str):
-    """Get a specific concept by ID"""
-    for concept in TUTOR_CONTENT:
-        if concept['id'] == concept_id:
-            return concept
-    return None
-
-def get_all_concept_titles():
-    """Get all concept titles for listing"""
-    return [f"{c['id']}: {c['title']}" for c in TUTOR_CONTENT]
-
-
-class TriageAgent(Agent):
-    """Main triage agent that greets users and handles mode selection"""
+CONTENT_FILE = (
+    Path(__file__).parent.parent.parent / "shared-data" / "day4_tutor_content.json"
+)
 
-    def __init__(self, chat_ctx=None) -> None:
-        concept_list = "\n".join(get_all_concept_titles())
 
-        super().__init__(
-            instructions=f"""You are an Active Recall Coach - a friendly tutor who helps students learn through three different modes.
+def _triage_instructions(concept: Optional[Concept], registry: ConceptRegistry) -> str:
+    return f"""You are an Active Recall Coach - a friendly tutor who helps students learn through three different modes.
 
 Your role is to greet the user warmly and help them choose their preferred learning mode.
 
@@ -68,7 +44,7 @@ Available learning modes:
 3. TEACH-BACK mode - You will explain concepts back to me (the best way to learn!)
 
 Available concepts:
-{concept_list}
+{registry.concept_list}
 
 Start by greeting the user enthusiastically and asking which learning mode they'd like to start with.
 If they're unsure, briefly explain what each mode does and recommend starting with LEARN mode if they're new to a topic.
@@ -76,8 +52,166 @@ If they're unsure, briefly explain what each mode does and recommend starting wi
 Keep your responses conversational and encouraging. You're here to make learning fun and effective!
 
 Once the user chooses a mode, use the appropriate transfer tool to connect them to that mode's specialist.
-""",
-            chat_ctx=chat_ctx
+"""
+
+
+def _learn_instructions(concept: Optional[Concept], registry: ConceptRegistry) -> str:
+    if not concept:
+        concept_info = "Concept not found."
+    else:
+        concept_info = f"""
+Concept: {concept["title"]}
+Summary: {concept["summary"]}
+"""
+
+    return f"""You are Matthew, a patient and knowledgeable teacher in LEARN MODE.
+
+{concept_info}
+
+Your role:
+1. Explain the current concept ({concept["title"] if concept else "unknown"}) clearly and thoroughly using the summary provided
+2. Use examples and analogies to make concepts easy to understand
+3. Break down complex ideas into simple, digestible parts
+4. Encourage questions and provide detailed answers
+5. Check for understanding by asking if things make sense
+
+Available concepts to teach:
+{registry.concept_list}
+
+If the student wants to learn a different concept, use the switch_concept tool.
+If they want to switch to Quiz mode, use the transfer_to_quiz_mode tool.
+If they want to switch to Teach-Back mode, use the transfer_to_teachback_mode tool.
+If they want to return to the main menu, use the return_to_triage tool.
+
+Be warm, encouraging, and make learning enjoyable!
+"""
+
+
+def _quiz_instructions(concept: Optional[Concept], registry: ConceptRegistry) -> str:
+    if not concept:
+        concept_info = "Concept not found."
+    else:
+        concept_info = f"""
+Concept: {concept["title"]}
+Sample Question: {concept["sample_question"]}
+Summary (for your reference): {concept["summary"]}
+"""
+
+    return f"""You are Alicia, an enthusiastic quiz master in QUIZ MODE!
+
+{concept_info}
+
+Your role:
+1. Ask the student questions about {concept["title"] if concept else "the concept"}
+2. Start with the sample question provided, then ask follow-up questions
+3. Provide immediate feedback - praise correct answers enthusiastically!
+4. For incorrect answers, gently correct and explain the right answer
+5. Ask if they'd like more questions or want to switch modes
+6. Keep the quiz engaging and encouraging
+
+Available concepts to quiz on:
+{registry.concept_list}
+
+If the student wants to be quizzed on a different concept, use the switch_concept tool.
+If they want to switch to Learn mode, use the transfer_to_learn_mode tool.
+If they want to switch to Teach-Back mode, use the transfer_to_teachback_mode tool.
+If they want to return to the main menu, use the return_to_triage tool.
+
+Be energetic, supportive, and make testing fun!
+"""
+
+
+def _teachback_instructions(
+    concept: Optional[Concept], registry: ConceptRegistry
+) -> str:
+    if not concept:
+        concept_info = "Concept not found."
+    else:
+        concept_info = f"""
+Concept: {concept["title"]}
+Expected explanation (for evaluation): {concept["summary"]}
+"""
+
+    return f"""You are Ken, a supportive coach in TEACH-BACK MODE!
+
+{concept_info}
+
+Your role:
+1. Ask the student to explain {concept["title"] if concept else "the concept"} back to you in their own words
+2. Listen carefully to their explanation
+3. Provide qualitative feedback on their explanation:
+   - What they got right (be specific!)
+   - What they missed or could improve
+   - Overall quality of their understanding (excellent/good/needs work)
+4. Encourage them to try again if they struggled, or move on if they did well
+5. Ask if they want to teach back another concept or switch modes
+
+Available concepts for teach-back:
+{registry.concept_list}
+
+Compare their explanation with the expected summary to evaluate accuracy and completeness.
+
+If the student wants to teach a different concept, use the switch_concept tool.
+If they want to switch to Learn mode, use the transfer_to_learn_mode tool.
+If they want to switch to Quiz mode, use the transfer_to_quiz_mode tool.
+If they want to return to the main menu, use the return_to_triage tool.
+
+Remember: Teaching back is the BEST way to learn! Be encouraging even if they struggle.
+"""
+
+
+# Each agent's voice; prewarm creates a TTS for every one of them
+AGENT_VOICES = {
+    "TriageAgent": "en-US-matthew",
+    "LearnModeAgent": "en-US-matthew",
+    "QuizModeAgent": "en-US-alicia",
+    "TeachBackModeAgent": "en-US-ken",
+}
+DEFAULT_VOICE = "en-US-matthew"
+VOICE_STYLE = "Conversation"
+
+
+def _create_tts(voice: str, style: str) -> murf.TTS:
+    return murf.TTS(
+        voice=voice,
+        style=style,
+        tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
+        text_pacing=True,
+    )
+
+
+tts_pool = TTSPool(_create_tts)
+
+
+def get_tts_for_agent(agent_name: str):
+    """Return the prewarmed TTS for the agent's voice"""
+    return tts_pool.get(AGENT_VOICES.get(agent_name, DEFAULT_VOICE), VOICE_STYLE)
+
+
+# Each mode's instructions, rendered once per concept by the registry
+MODE_INSTRUCTIONS = {
+    "triage": _triage_instructions,
+    "learn": _learn_instructions,
+    "quiz": _quiz_instructions,
+    "teachback": _teachback_instructions,
+}
+
+concept_registry = ConceptRegistry.load(CONTENT_FILE, MODE_INSTRUCTIONS)
+
+
+def get_concept_by_id(concept_id: str):
+    """Get a specific concept by ID"""
+    return concept_registry.get(concept_id)
+
+
+class TriageAgent(Agent):
+    """Main triage agent that greets users and handles mode selection"""
+
+    def __init__(self, chat_ctx=None) -> None:
+        super().__init__(
+            instructions=concept_registry.instructions("triage"),
+            tts=get_tts_for_agent("TriageAgent"),
+            chat_ctx=chat_ctx,
         )
 
     @function_tool
@@ -89,10 +223,15 @@ Once the user chooses a mode, use the appropriate transfer tool to connect them
         """
         concept = get_concept_by_id(concept_id)
         if not concept:
-            return None, f"Sorry, I couldn't find that concept. Available concepts: {', '.join([c['id'] for c in TUTOR_CONTENT])}"
+            return (
+                None,
+                f"Sorry, I couldn't find that concept. Available concepts: {concept_registry.concept_ids}",
+            )
 
         logger.info(f"Transferring to Learn Mode for concept: {concept_id}")
-        return LearnModeAgent(concept_id=concept_id, chat_ctx=self.chat_ctx), f"Transferring to Learn Mode to teach you about {concept['title']}..."
+        return LearnModeAgent(
+            concept_id=concept_id, chat_ctx=self.chat_ctx
+        ), f"Transferring to Learn Mode to teach you about {concept['title']}..."
 
     @function_tool
     async def transfer_to_quiz_mode(self, context: RunContext, concept_id: str):
@@ -103,10 +242,15 @@ Once the user chooses a mode, use the appropriate transfer tool to connect them
         """
         concept = get_concept_by_id(concept_id)
         if not concept:
-            return None, f"Sorry, I couldn't find that concept. Available concepts: {', '.join([c['id'] for c in TUTOR_CONTENT])}"
+            return (
+                None,
+                f"Sorry, I couldn't find that concept. Available concepts: {concept_registry.concept_ids}",
+            )
 
         logger.info(f"Transferring to Quiz Mode for concept: {concept_id}")
-        return QuizModeAgent(concept_id=concept_id, chat_ctx=self.chat_ctx), f"Transferring to Quiz Mode to test your knowledge on {concept['title']}..."
+        return QuizModeAgent(
+            concept_id=concept_id, chat_ctx=self.chat_ctx
+        ), f"Transferring to Quiz Mode to test your knowledge on {concept['title']}..."
 
     @function_tool
     async def transfer_to_teachback_mode(self, context: RunContext, concept_id: str):
@@ -117,10 +261,16 @@ Once the user chooses a mode, use the appropriate transfer tool to connect them
         """
         concept = get_concept_by_id(concept_id)
         if not concept:
-            return None, f"Sorry, I couldn't find that concept. Available concepts: {', '.join([c['id'] for c in TUTOR_CONTENT])}"
+            return (
+                None,
+                f"Sorry, I couldn't find that concept. Available concepts: {concept_registry.concept_ids}",
+            )
 
         logger.info(f"Transferring to Teach-Back Mode for concept: {concept_id}")
-        return TeachBackModeAgent(concept_id=concept_id, chat_ctx=self.chat_ctx), f"Transferring to Teach-Back Mode. Get ready to teach me about {concept['title']}!"
+        return (
+            TeachBackModeAgent(concept_id=concept_id, chat_ctx=self.chat_ctx),
+            f"Transferring to Teach-Back Mode. Get ready to teach me about {concept['title']}!",
+        )
 
 
 class LearnModeAgent(Agent):
@@ -128,40 +278,10 @@ class LearnModeAgent(Agent):
 
     def __init__(self, concept_id: str, chat_ctx=None) -> None:
         self.concept_id = concept_id
-        concept = get_concept_by_id(concept_id)
-        concept_list = "\n".join(get_all_concept_titles())
-
-        if not concept:
-            concept_info = "Concept not found."
-        else:
-            concept_info = f"""
-Concept: {concept['title']}
-Summary: {concept['summary']}
-"""
-
         super().__init__(
-            instructions=f"""You are Matthew, a patient and knowledgeable teacher in LEARN MODE.
-
-{concept_info}
-
-Your role:
-1. Explain the current concept ({concept['title'] if concept else 'unknown'}) clearly and thoroughly using the summary provided
-2. Use examples and analogies to make concepts easy to understand
-3. Break down complex ideas into simple, digestible parts
-4. Encourage questions and provide detailed answers
-5. Check for understanding by asking if things make sense
-
-Available concepts to teach:
-{concept_list}
-
-If the student wants to learn a different concept, use the switch_concept tool.
-If they want to switch to Quiz mode, use the transfer_to_quiz_mode tool.
-If they want to switch to Teach-Back mode, use the transfer_to_teachback_mode tool.
-If they want to return to the main menu, use the return_to_triage tool.
-
-Be warm, encouraging, and make learning enjoyable!
-""",
-            chat_ctx=chat_ctx
+            instructions=concept_registry.instructions("learn", concept_id),
+            tts=get_tts_for_agent("LearnModeAgent"),
+            chat_ctx=chat_ctx,
         )
 
     @function_tool
@@ -173,13 +293,20 @@ Be warm, encouraging, and make learning enjoyable!
         """
         concept = get_concept_by_id(concept_id)
         if not concept:
-            return None, f"Sorry, I couldn't find that concept. Available: {', '.join([c['id'] for c in TUTOR_CONTENT])}"
+            return (
+                None,
+                f"Sorry, I couldn't find that concept. Available: {concept_registry.concept_ids}",
+            )
 
         logger.info(f"Switching to concept: {concept_id} in Learn Mode")
-        return LearnModeAgent(concept_id=concept_id, chat_ctx=self.chat_ctx), f"Switching to learn about {concept['title']}..."
+        return LearnModeAgent(
+            concept_id=concept_id, chat_ctx=self.chat_ctx
+        ), f"Switching to learn about {concept['title']}..."
 
     @function_tool
-    async def transfer_to_quiz_mode(self, context: RunContext, concept_id: Optional[str] = None):
+    async def transfer_to_quiz_mode(
+        self, context: RunContext, concept_id: Optional[str] = None
+    ):
         """Transfer to Quiz Mode to test knowledge.
 
         Args:
@@ -188,10 +315,14 @@ Be warm, encouraging, and make learning enjoyable!
         cid = concept_id or self.concept_id
         concept = get_concept_by_id(cid)
         logger.info(f"Transferring from Learn to Quiz Mode for: {cid}")
-        return QuizModeAgent(concept_id=cid, chat_ctx=self.chat_ctx), f"Let's test your knowledge on {concept['title']}!"
+        return QuizModeAgent(
+            concept_id=cid, chat_ctx=self.chat_ctx
+        ), f"Let's test your knowledge on {concept['title']}!"
 
     @function_tool
-    async def transfer_to_teachback_mode(self, context: RunContext, concept_id: Optional[str] = None):
+    async def transfer_to_teachback_mode(
+        self, context: RunContext, concept_id: Optional[str] = None
+    ):
         """Transfer to Teach-Back Mode where student explains the concept.
 
         Args:
@@ -200,7 +331,9 @@ Be warm, encouraging, and make learning enjoyable!
         cid = concept_id or self.concept_id
         concept = get_concept_by_id(cid)
         logger.info(f"Transferring from Learn to Teach-Back Mode for: {cid}")
-        return TeachBackModeAgent(concept_id=cid, chat_ctx=self.chat_ctx), f"Now it's your turn! Teach me about {concept['title']}!"
+        return TeachBackModeAgent(
+            concept_id=cid, chat_ctx=self.chat_ctx
+        ), f"Now it's your turn! Teach me about {concept['title']}!"
 
     @function_tool
     async def return_to_triage(self, context: RunContext):
@@ -214,42 +347,10 @@ class QuizModeAgent(Agent):
 
     def __init__(self, concept_id: str, chat_ctx=None) -> None:
         self.concept_id = concept_id
-        concept = get_concept_by_id(concept_id)
-        concept_list = "\n".join(get_all_concept_titles())
-
-        if not concept:
-            concept_info = "Concept not found."
-        else:
-            concept_info = f"""
-Concept: {concept['title']}
-Sample Question: {concept['sample_question']}
-Summary (for your reference): {concept['summary']}
-"""
-
         super().__init__(
-            instructions=f"""You are Alicia, an enthusiastic quiz master in QUIZ MODE!
-
-{concept_info}
-
-Your role:
-1. Ask the student questions about {concept['title'] if concept else 'the concept'}
-2. Start with the sample question provided, then ask follow-up questions
-3. Provide immediate feedback - praise correct answers enthusiastically!
-4. For incorrect answers, gently correct and explain the right answer
-5. Ask if they'd like more questions or want to switch modes
-6. Keep the quiz engaging and encouraging
-
-Available concepts to quiz on:
-{concept_list}
-
-If the student wants to be quizzed on a different concept, use the switch_concept tool.
-If they want to switch to Learn mode, use the transfer_to_learn_mode tool.
-If they want to switch to Teach-Back mode, use the transfer_to_teachback_mode tool.
-If they want to return to the main menu, use the return_to_triage tool.
-
-Be energetic, supportive, and make testing fun!
-""",
-            chat_ctx=chat_ctx
+            instructions=concept_registry.instructions("quiz", concept_id),
+            tts=get_tts_for_agent("QuizModeAgent"),
+            chat_ctx=chat_ctx,
         )
 
     @function_tool
@@ -261,13 +362,20 @@ Be energetic, supportive, and make testing fun!
         """
         concept = get_concept_by_id(concept_id)
         if not concept:
-            return None, f"Sorry, I couldn't find that concept. Available: {', '.join([c['id'] for c in TUTOR_CONTENT])}"
+            return (
+                None,
+                f"Sorry, I couldn't find that concept. Available: {concept_registry.concept_ids}",
+            )
 
         logger.info(f"Switching to concept: {concept_id} in Quiz Mode")
-        return QuizModeAgent(concept_id=concept_id, chat_ctx=self.chat_ctx), f"Let's quiz you on {concept['title']}!"
+        return QuizModeAgent(
+            concept_id=concept_id, chat_ctx=self.chat_ctx
+        ), f"Let's quiz you on {concept['title']}!"
 
     @function_tool
-    async def transfer_to_learn_mode(self, context: RunContext, concept_id: Optional[str] = None):
+    async def transfer_to_learn_mode(
+        self, context: RunContext, concept_id: Optional[str] = None
+    ):
         """Transfer to Learn Mode to review concepts.
 
         Args:
@@ -276,10 +384,14 @@ Be energetic, supportive, and make testing fun!
         cid = concept_id or self.concept_id
         concept = get_concept_by_id(cid)
         logger.info(f"Transferring from Quiz to Learn Mode for: {cid}")
-        return LearnModeAgent(concept_id=cid, chat_ctx=self.chat_ctx), f"Let's review {concept['title']}!"
+        return LearnModeAgent(
+            concept_id=cid, chat_ctx=self.chat_ctx
+        ), f"Let's review {concept['title']}!"
 
     @function_tool
-    async def transfer_to_teachback_mode(self, context: RunContext, concept_id: Optional[str] = None):
+    async def transfer_to_teachback_mode(
+        self, context: RunContext, concept_id: Optional[str] = None
+    ):
         """Transfer to Teach-Back Mode where student explains the concept.
 
         Args:
@@ -288,7 +400,9 @@ Be energetic, supportive, and make testing fun!
         cid = concept_id or self.concept_id
         concept = get_concept_by_id(cid)
         logger.info(f"Transferring from Quiz to Teach-Back Mode for: {cid}")
-        return TeachBackModeAgent(concept_id=cid, chat_ctx=self.chat_ctx), f"Now teach me about {concept['title']}!"
+        return TeachBackModeAgent(
+            concept_id=cid, chat_ctx=self.chat_ctx
+        ), f"Now teach me about {concept['title']}!"
 
     @function_tool
     async def return_to_triage(self, context: RunContext):
@@ -302,45 +416,10 @@ class TeachBackModeAgent(Agent):
 
     def __init__(self, concept_id: str, chat_ctx=None) -> None:
         self.concept_id = concept_id
-        concept = get_concept_by_id(concept_id)
-        concept_list = "\n".join(get_all_concept_titles())
-
-        if not concept:
-            concept_info = "Concept not found."
-        else:
-            concept_info = f"""
-Concept: {concept['title']}
-Expected explanation (for evaluation): {concept['summary']}
-"""
-
         super().__init__(
-            instructions=f"""You are Ken, a supportive coach in TEACH-BACK MODE!
-
-{concept_info}
-
-Your role:
-1. Ask the student to explain {concept['title'] if concept else 'the concept'} back to you in their own words
-2. Listen carefully to their explanation
-3. Provide qualitative feedback on their explanation:
-   - What they got right (be specific!)
-   - What they missed or could improve
-   - Overall quality of their understanding (excellent/good/needs work)
-4. Encourage them to try again if they struggled, or move on if they did well
-5. Ask if they want to teach back another concept or switch modes
-
-Available concepts for teach-back:
-{concept_list}
-
-Compare their explanation with the expected summary to evaluate accuracy and completeness.
-
-If the student wants to teach a different concept, use the switch_concept tool.
-If they want to switch to Learn mode, use the transfer_to_learn_mode tool.
-If they want to switch to Quiz mode, use the transfer_to_quiz_mode tool.
-If they want to return to the main menu, use the return_to_triage tool.
-
-Remember: Teaching back is the BEST way to learn! Be encouraging even if they struggle.
-""",
-            chat_ctx=chat_ctx
+            instructions=concept_registry.instructions("teachback", concept_id),
+            tts=get_tts_for_agent("TeachBackModeAgent"),
+            chat_ctx=chat_ctx,
         )
 
     @function_tool
@@ -354,12 +433,12 @@ Remember: Teaching back is the BEST way to learn! Be encouraging even if they st
 
         # This is a simple evaluation - could be enhanced with LLM-based scoring
         feedback = f"""
-Let me evaluate your explanation of {concept['title']}:
+Let me evaluate your explanation of {concept["title"]}:
 
 Your explanation: "{user_explanation}"
 
 Expected key points from the summary:
-{concept['summary']}
+{concept["summary"]}
 
 Based on your explanation, here's my feedback:
 """
@@ -375,13 +454,20 @@ Based on your explanation, here's my feedback:
         """
         concept = get_concept_by_id(concept_id)
         if not concept:
-            return None, f"Sorry, I couldn't find that concept. Available: {', '.join([c['id'] for c in TUTOR_CONTENT])}"
+            return (
+                None,
+                f"Sorry, I couldn't find that concept. Available: {concept_registry.concept_ids}",
+            )
 
         logger.info(f"Switching to concept: {concept_id} in Teach-Back Mode")
-        return TeachBackModeAgent(concept_id=concept_id, chat_ctx=self.chat_ctx), f"Now teach me about {concept['title']}!"
+        return TeachBackModeAgent(
+            concept_id=concept_id, chat_ctx=self.chat_ctx
+        ), f"Now teach me about {concept['title']}!"
 
     @function_tool
-    async def transfer_to_learn_mode(self, context: RunContext, concept_id: Optional[str] = None):
+    async def transfer_to_learn_mode(
+        self, context: RunContext, concept_id: Optional[str] = None
+    ):
         """Transfer to Learn Mode to review concepts.
 
         Args:
@@ -390,10 +476,14 @@ Based on your explanation, here's my feedback:
         cid = concept_id or self.concept_id
         concept = get_concept_by_id(cid)
         logger.info(f"Transferring from Teach-Back to Learn Mode for: {cid}")
-        return LearnModeAgent(concept_id=cid, chat_ctx=self.chat_ctx), f"Let's review {concept['title']}!"
+        return LearnModeAgent(
+            concept_id=cid, chat_ctx=self.chat_ctx
+        ), f"Let's review {concept['title']}!"
 
     @function_tool
-    async def transfer_to_quiz_mode(self, context: RunContext, concept_id: Optional[str] = None):
+    async def transfer_to_quiz_mode(
+        self, context: RunContext, concept_id: Optional[str] = None
+    ):
         """Transfer to Quiz Mode to test knowledge.
 
         Args:
@@ -402,7 +492,9 @@ Based on your explanation, here's my feedback:
         cid = concept_id or self.concept_id
         concept = get_concept_by_id(cid)
         logger.info(f"Transferring from Teach-Back to Quiz Mode for: {cid}")
-        return QuizModeAgent(concept_id=cid, chat_ctx=self.chat_ctx), f"Let's test your knowledge on {concept['title']}!"
+        return QuizModeAgent(
+            concept_id=cid, chat_ctx=self.chat_ctx
+        ), f"Let's test your knowledge on {concept['title']}!"
 
     @function_tool
     async def return_to_triage(self, context: RunContext):
@@ -413,6 +505,10 @@ Based on your explanation, here's my feedback:
 
 def prewarm(proc: JobProcess):
     proc.userdata["vad"] = silero.VAD.load()
+    concept_registry.warm()
+    tts_pool.create(
+        (voice, VOICE_STYLE) for voice in {DEFAULT_VOICE, *AGENT_VOICES.values()}
+    )
 
 
 async def entrypoint(ctx: JobContext):
@@ -421,33 +517,15 @@ async def entrypoint(ctx: JobContext):
         "room": ctx.room.name,
     }
 
-    # Get current agent name from room attributes for voice selection
-    async def get_tts_for_agent(agent_name: str):
-        """Return appropriate TTS configuration based on agent"""
-        voice_map = {
-            "TriageAgent": "en-US-matthew",
-            "LearnModeAgent": "en-US-matthew",
-            "QuizModeAgent": "en-US-alicia",
-            "TeachBackModeAgent": "en-US-ken"
-        }
-
-        voice = voice_map.get(agent_name, "en-US-matthew")
-        logger.info(f"Using voice {voice} for agent {agent_name}")
-
-        return murf.TTS(
-            voice=voice,
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True
-        )
-
-    # Create initial session with TriageAgent
-    initial_tts = await get_tts_for_agent("TriageAgent")
+    # Open every voice's connection now, so the first words in each are not delayed
+    tts_pool.prewarm_connections()
+    ctx.add_shutdown_callback(tts_pool.aclose)
 
+    # Each agent brings its own voice from the pool; this is the default
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
         llm=google.LLM(model="gemini-2.5-flash"),
-        tts=initial_tts,
+        tts=get_tts_for_agent("TriageAgent"),
         turn_detection=MultilingualModel(),
         vad=ctx.proc.userdata["vad"],
         preemptive_generation=True,
@@ -464,28 +542,32 @@ async def entrypoint(ctx: JobContext):
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage: {summary}")
+        logger.info(f"TTS pool: {tts_pool.latency_summary()}")
 
     ctx.add_shutdown_callback(log_usage)
 
-    # Agent handoff callback to update TTS voice
+    # The new agent already speaks in its own voice; tell the frontend who is talking,
+    # and time the switch until that voice's first audio (see tts_pool)
+    attribute_updates = set()
+
     @session.on("agent_handoff")
     def _on_agent_handoff(ev):
-        """Update TTS voice when agent changes"""
+        """Publish the current agent as a room attribute"""
         import asyncio
 
         new_agent_name = type(ev.agent).__name__
-        logger.info(f"Agent handoff to: {new_agent_name}")
-
-        # Update TTS for the new agent in a sync manner
-        async def update_voice():
-            # Update room attributes to track current agent
-            await ctx.room.local_participant.update_attributes({"current_agent": new_agent_name})
-
-            # Update TTS for the new agent
-            new_tts = await get_tts_for_agent(new_agent_name)
-            session.tts = new_tts
+        tts_pool.handoff(ev.agent.tts)
+        logger.info(
+            f"Agent handoff to: {new_agent_name} ({AGENT_VOICES.get(new_agent_name, DEFAULT_VOICE)})"
+        )
 
-        asyncio.create_task(update_voice())
+        task = asyncio.create_task(
+            ctx.room.local_participant.update_attributes(
+                {"current_agent": new_agent_name}
+            )
+        )
+        attribute_updates.add(task)
+        task.add_done_callback(attribute_updates.discard)
 
     # Start with TriageAgent
     await session.start(
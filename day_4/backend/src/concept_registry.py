@@ -0,0 +1,79 @@
+"""
+Tutor concepts indexed by id, with every mode's instructions rendered once.
+
+The agents hand off to each other on every mode or concept switch, and each new
+agent needs its full instructions: a long prompt with the concept's details
+and the list of every concept. ConceptRegistry looks concepts up in a dict and
+renders each (mode, concept id) prompt once - all of them up front with warm(),
+or each the first time it is needed - and keeps it for as long as the registry
+lives. A registry holds one version of the content; load a new one when the
+content file changes.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("agent")
+
+Concept = Dict[str, str]
+
+# Renders a mode's instructions for a concept (None for modes without one, or an unknown id)
+Renderer = Callable[[Optional[Concept], "ConceptRegistry"], str]
+
+
+class ConceptRegistry:
+    """One version of the tutor content: concepts by id and their memoized instructions"""
+
+    def __init__(self, concepts: List[Concept], renderers: Dict[str, Renderer]) -> None:
+        self.concepts = concepts
+        self.renderers = renderers
+        self.by_id: Dict[str, Concept] = {
+            concept["id"]: concept for concept in concepts
+        }
+        # Shared by every prompt and error message, so joined once
+        self.concept_list = "\n".join(f"{c['id']}: {c['title']}" for c in concepts)
+        self.concept_ids = ", ".join(self.by_id)
+        self.version = hashlib.sha256(
+            json.dumps(concepts, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:12]
+        self._instructions: Dict[Tuple[str, Optional[str]], str] = {}
+
+    @classmethod
+    def load(cls, path: Path, renderers: Dict[str, Renderer]) -> "ConceptRegistry":
+        """Registry for the concepts in a JSON file; empty if it can't be read"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                concepts = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load tutor content: {e}")
+            concepts = []
+        return cls(concepts, renderers)
+
+    def get(self, concept_id: Optional[str]) -> Optional[Concept]:
+        return self.by_id.get(concept_id) if concept_id else None
+
+    def instructions(self, mode: str, concept_id: Optional[str] = None) -> str:
+        """The instructions for `mode` on `concept_id`, rendered on first use"""
+        key = (mode, concept_id)
+        cached = self._instructions.get(key)
+        if cached is not None:
+            return cached
+        concept = self.get(concept_id)
+        rendered = self.renderers[mode](concept, self)
+        # Ids the LLM made up aren't kept, so they can't grow the cache
+        if concept_id is None or concept is not None:
+            self._instructions[key] = rendered
+        return rendered
+
+    def warm(self) -> None:
+        """Render every mode's instructions for every concept ahead of the first handoff"""
+        for mode in self.renderers:
+            self.instructions(mode)
+            for concept_id in self.by_id:
+                self.instructions(mode, concept_id)
+        logger.info(
+            f"Rendered {len(self._instructions)} instructions for tutor content {self.version}"
+        )
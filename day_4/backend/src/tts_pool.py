@@ -0,0 +1,100 @@
+"""
+TTS instances for every tutor voice, created before the first handoff.
+
+Each mode speaks in its own voice. Building a murf.TTS on every handoff, and
+opening its websocket on the first utterance, put the setup cost right where
+the student is waiting to hear the new voice. TTSPool creates one instance per
+(voice, style) in the worker's prewarm, and the job warms each one's
+connection when it starts; a handoff is then a dict lookup. Job processes run
+one job each, so the instances and their connections belong to that job.
+
+A voice switch is timed from the agent_handoff event to the first audio frame
+the new agent's TTS synthesizes, worked out from the TTS's own metrics (which
+report the time to first byte from the start of each request).
+latency_summary() reports those times along with how many lookups missed the
+pool and had to create an instance.
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from livekit.agents import tts
+from livekit.agents.metrics import TTSMetrics
+
+logger = logging.getLogger("agent")
+
+VoiceKey = Tuple[str, str]
+
+
+class TTSPool:
+    """One TTS per (voice, style), shared by every agent that speaks in it"""
+
+    def __init__(self, factory: Callable[[str, str], tts.TTS]) -> None:
+        self.factory = factory
+        self._voices: Dict[VoiceKey, tts.TTS] = {}
+        # id() of an instance just handed off to -> when the handoff happened
+        self._handoffs: Dict[int, float] = {}
+        self._switch_seconds: List[float] = []
+        self.misses = 0
+
+    def _create(self, voice: str, style: str) -> tts.TTS:
+        instance = self._voices[(voice, style)] = self.factory(voice, style)
+        instance.on(
+            "metrics_collected",
+            lambda metrics: self._on_tts_metrics(instance, metrics),
+        )
+        return instance
+
+    def create(self, voices: Iterable[VoiceKey]) -> None:
+        """Create the instances for these voices; called from prewarm"""
+        for voice, style in voices:
+            if (voice, style) not in self._voices:
+                self._create(voice, style)
+
+    def prewarm_connections(self) -> None:
+        """Start opening every instance's connection in the background; needs the job's event loop"""
+        for instance in self._voices.values():
+            instance.prewarm()
+
+    def get(self, voice: str, style: str) -> tts.TTS:
+        """The instance for a voice, created now only if prewarm didn't create it"""
+        instance = self._voices.get((voice, style))
+        if instance is None:
+            self.misses += 1
+            logger.warning(
+                f"TTS voice {voice} ({style}) was not prewarmed; creating it now"
+            )
+            instance = self._create(voice, style)
+        return instance
+
+    def handoff(self, instance: tts.TTS) -> None:
+        """Start timing a switch to this voice; called from the agent_handoff event"""
+        self._handoffs[id(instance)] = time.perf_counter()
+
+    def _on_tts_metrics(self, instance: tts.TTS, metrics: TTSMetrics) -> None:
+        handoff_at = self._handoffs.get(id(instance))
+        if handoff_at is None or metrics.ttfb < 0:
+            return
+        # Metrics arrive when a request finishes; duration and ttfb both count from its start
+        first_audio_at = time.perf_counter() - metrics.duration + metrics.ttfb
+        if first_audio_at < handoff_at:
+            # Audio from before the handoff, in the same voice
+            return
+        del self._handoffs[id(instance)]
+        self._switch_seconds.append(first_audio_at - handoff_at)
+
+    def latency_summary(self) -> str:
+        if not self._switch_seconds:
+            return f"no voice switches, {self.misses} not prewarmed"
+        ordered = sorted(self._switch_seconds)
+        p50 = ordered[len(ordered) // 2] * 1e3
+        worst = ordered[-1] * 1e3
+        return (
+            f"{len(ordered)} voice switches, handoff to first audio p50 {p50:.0f}ms, "
+            f"max {worst:.0f}ms, {self.misses} not prewarmed"
+        )
+
+    async def aclose(self) -> None:
+        for instance in self._voices.values():
+            await instance.aclose()
@@ -0,0 +1,44 @@
+from agent import CONTENT_FILE, MODE_INSTRUCTIONS, LearnModeAgent, concept_registry
+from concept_registry import ConceptRegistry
+
+
+def test_concepts_are_looked_up_by_id() -> None:
+    registry = ConceptRegistry.load(CONTENT_FILE, MODE_INSTRUCTIONS)
+
+    for concept in registry.concepts:
+        assert registry.get(concept["id"]) is concept
+    assert registry.get("no-such-concept") is None
+    assert registry.concept_ids == ", ".join(c["id"] for c in registry.concepts)
+
+
+def test_instructions_are_rendered_once_per_mode_and_concept() -> None:
+    calls = []
+
+    def render(concept, registry):
+        calls.append(concept["id"] if concept else None)
+        return f"{concept['title'] if concept else 'menu'}\n{registry.concept_list}"
+
+    registry = ConceptRegistry(
+        [{"id": "loops", "title": "Loops"}], {"learn": render, "triage": render}
+    )
+
+    assert registry.instructions("learn", "loops") == "Loops\nloops: Loops"
+    assert registry.instructions("learn", "loops") is registry.instructions(
+        "learn", "loops"
+    )
+    assert registry.instructions("triage") == "menu\nloops: Loops"
+    registry.instructions("learn", "made-up")
+    registry.instructions("learn", "made-up")
+    assert calls == ["loops", None, None, None]
+
+    registry.warm()
+    assert calls == ["loops", None, None, None, None, "loops"]
+
+
+def test_agents_get_the_memoized_instructions(monkeypatch) -> None:
+    monkeypatch.setenv("MURF_API_KEY", "test-key")
+    concept_id = concept_registry.concepts[0]["id"]
+    agent = LearnModeAgent(concept_id=concept_id)
+
+    assert agent.instructions is concept_registry.instructions("learn", concept_id)
+    assert concept_registry.concepts[0]["summary"] in agent.instructions
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import tts_pool
+from tts_pool import TTSPool
+
+
+class FakeTTS:
+    def __init__(self, voice: str, style: str) -> None:
+        self.voice, self.style = voice, style
+        self.prewarmed = self.closed = False
+        self.listeners = []
+
+    def on(self, event, callback) -> None:
+        assert event == "metrics_collected"
+        self.listeners.append(callback)
+
+    def synthesized(self, ttfb: float, duration: float) -> None:
+        """A request finished now, having started `duration` seconds ago"""
+        for callback in self.listeners:
+            callback(SimpleNamespace(ttfb=ttfb, duration=duration))
+
+    def prewarm(self) -> None:
+        self.prewarmed = True
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+async def test_voices_are_created_once_and_reused() -> None:
+    created = []
+    pool = TTSPool(lambda voice, style: created.append(voice) or FakeTTS(voice, style))
+    pool.create(
+        [
+            ("en-US-matthew", "Conversation"),
+            ("en-US-ken", "Conversation"),
+            ("en-US-matthew", "Conversation"),
+        ]
+    )
+    pool.prewarm_connections()
+
+    ken = pool.get("en-US-ken", "Conversation")
+    assert ken is pool.get("en-US-ken", "Conversation")
+    assert ken.prewarmed and created == ["en-US-matthew", "en-US-ken"]
+    assert pool.misses == 0
+
+    alicia = pool.get("en-US-alicia", "Conversation")
+    assert alicia.voice == "en-US-alicia" and pool.misses == 1
+    assert pool.latency_summary() == "no voice switches, 1 not prewarmed"
+
+    await pool.aclose()
+    assert ken.closed and alicia.closed
+
+
+def test_switches_are_timed_from_handoff_to_first_audio(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(tts_pool.time, "perf_counter", lambda: now[0])
+    pool = TTSPool(FakeTTS)
+    pool.create([("en-US-matthew", "Conversation"), ("en-US-ken", "Conversation")])
+    matthew = pool.get("en-US-matthew", "Conversation")
+    ken = pool.get("en-US-ken", "Conversation")
+
+    pool.handoff(ken)
+    now[0] += 2.0
+    # Matthew's voice finishing its last sentence doesn't count
+    matthew.synthesized(ttfb=0.2, duration=1.5)
+    # Ken's first request: sent 0.5s after the handoff, first audio 0.3s later
+    ken.synthesized(ttfb=0.3, duration=1.5)
+    # Later sentences in the same voice don't count either
+    now[0] += 5.0
+    ken.synthesized(ttfb=0.1, duration=1.0)
+
+    assert pool.latency_summary() == (
+        "1 voice switches, handoff to first audio p50 800ms, max 800ms, 0 not prewarmed"
+    )
+
+
+def test_agents_speak_in_their_own_voice(monkeypatch) -> None:
+    monkeypatch.setenv("MURF_API_KEY", "test-key")
+    from agent import QuizModeAgent, concept_registry, get_tts_for_agent
+
+    agent = QuizModeAgent(concept_id=concept_registry.concepts[0]["id"])
+    assert agent.tts is get_tts_for_agent("QuizModeAgent")
@@ -1,8 +1,10 @@
+import asyncio
 import logging
-import json
 import os
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
+from uuid import uuid4
 
 from dotenv import load_dotenv
 from livekit.agents import (
@@ -12,30 +14,83 @@ from livekit.agents import (
     JobProcess,
     MetricsCollectedEvent,
     RoomInputOptions,
+    RunContext,
+    StopResponse,
+    UserInputTranscribedEvent,
     WorkerOptions,
     cli,
+    function_tool,
+    llm,
     metrics,
     tokenize,
-    function_tool,
-    RunContext
 )
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
+from livekit.plugins import deepgram, google, murf, noise_cancellation, silero
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
+from faq_answers import (
+    compose_answer,
+    context_matches,
+    is_direct_answer,
+    is_question,
+    speakable,
+)
+from faq_prefetch import FAQPrefetcher
+from kb_registry import KnowledgeBaseRegistry, read_tenant
+from lead_checkpoint import LeadCheckpointer
+from lead_scoring import score_lead
+from lead_store import ensure_schema
 from rag_handler import FAQRetriever
 
 logger = logging.getLogger("agent")
 
 load_dotenv(".env.local")
 
-# Initialize FAQ retriever
+# Knowledge bases: data/company_faq.json by default, data/tenants/<tenant>.json for
+# calls whose metadata names a tenant. Each is served from its persisted index
+# (rebuilt if the JSON changed); build them ahead of time with
+# `uv run src/faq_store.py build data/company_faq.json`
 FAQ_FILE = Path(__file__).parent.parent / "data" / "company_faq.json"
-faq_retriever = FAQRetriever(str(FAQ_FILE))
+TENANTS_DIR = Path(__file__).parent.parent / "data" / "tenants"
+kb_registry = KnowledgeBaseRegistry(
+    TENANTS_DIR, FAQ_FILE, max_bytes=int(os.getenv("KB_CACHE_MB", "256")) * 1024 * 1024
+)
+
+# Edits to a loaded knowledge base's JSON are picked up this often, without a restart;
+# calls in progress switch to the new version on their next search
+FAQ_REFRESH_SECONDS = float(os.getenv("FAQ_REFRESH_SECONDS", "30"))
+_kb_refresher: Optional[asyncio.Task] = None
+
+# Captured lead details are written to the lead store at most this often during a call
+LEAD_CHECKPOINT_SECONDS = float(os.getenv("LEAD_CHECKPOINT_SECONDS", "3"))
+
+
+async def _refresh_knowledge_bases_forever() -> None:
+    while True:
+        await asyncio.sleep(FAQ_REFRESH_SECONDS)
+        try:
+            await kb_registry.arefresh()
+        except Exception as e:
+            logger.error(f"Error refreshing knowledge bases: {e}")
+
+
+def _ensure_kb_refresher() -> None:
+    global _kb_refresher
+    if _kb_refresher is None or _kb_refresher.done():
+        _kb_refresher = asyncio.create_task(_refresh_knowledge_bases_forever())
 
 
 class SwiggySDRAssistant(Agent):
-    def __init__(self) -> None:
-        # Initialize lead data storage
+    def __init__(self, faq_retriever: FAQRetriever) -> None:
+        self.faq_retriever = faq_retriever
+        # Searches started from the user's transcripts as they arrive; see faq_prefetch
+        self.faq_prefetcher = FAQPrefetcher(faq_retriever, top_k=2)
+        company = faq_retriever.faq_data.get("company_name", "Swiggy")
+        tagline = faq_retriever.faq_data.get("tagline", "")
+        # Tenants without a tagline get just their name
+        introduction = f"{company}, {tagline}" if tagline else company
+
+        # Initialize lead data storage; the lead id is its row in the lead store
+        self.lead_id = uuid4().hex
         self.lead_data = {
             "name": None,
             "company": None,
@@ -47,20 +102,24 @@ class SwiggySDRAssistant(Agent):
             "questions_asked": [],
             "conversation_started": datetime.now().isoformat(),
         }
+        # Saves lead_data as it is captured, so a dropped call keeps what was gathered
+        self.lead_checkpoint = LeadCheckpointer(
+            self.lead_id, self._lead_snapshot, interval=LEAD_CHECKPOINT_SECONDS
+        )
 
         super().__init__(
-            instructions=f"""You are Alex, a friendly and professional Sales Development Representative for Swiggy, India's leading food delivery and quick commerce platform.
+            instructions=f"""You are Alex, a friendly and professional Sales Development Representative for {introduction}.
 
 ## Your Personality
 - Warm, enthusiastic, and genuinely helpful
 - Professional but conversational
-- Excited about helping businesses grow with Swiggy
+- Excited about helping businesses grow with {company}
 - You speak naturally like a real person, not a robot
 
 ## Your Primary Goals
 1. Greet visitors warmly and ask what brought them here
 2. Understand their business and what they're working on
-3. Answer questions about Swiggy's products, pricing, and services using the FAQ knowledge base
+3. Answer questions about {company}'s products, pricing, and services using the FAQ knowledge base
 4. Qualify and capture lead information naturally during the conversation
 5. Never fabricate information - only use the provided FAQ content
 
@@ -68,9 +127,9 @@ class SwiggySDRAssistant(Agent):
 {faq_retriever.get_company_info()}
 
 ## Conversation Flow
-1. Start with a warm greeting: "Hi! I'm Alex from Swiggy. Thanks for your interest! What brought you here today?"
+1. Start with a warm greeting: "Hi! I'm Alex from {company}. Thanks for your interest! What brought you here today?"
 2. Listen to their needs and ask: "Tell me a bit about your business - what are you currently working on?"
-3. Answer their questions using the search_faq tool
+3. Answer their questions from the FAQ information already in the conversation, or using the search_faq tool when it doesn't cover the question
 4. Naturally collect their information using the capture_lead_info tool as the conversation progresses
 5. When they mention readiness to proceed or say they're done, use the complete_conversation tool
 
@@ -96,16 +155,52 @@ Try to naturally gather:
 Remember: You're having a natural conversation, not conducting an interrogation. Weave these questions naturally into the discussion.""",
         )
 
+    async def on_user_turn_completed(
+        self, turn_ctx: llm.ChatContext, new_message: llm.ChatMessage
+    ) -> None:
+        """
+        Answer a question asked before straight from the answer cache, or else add
+        the FAQ entries matching the user's turn, usually prefetched already, to the
+        turn's context.
+        """
+        text = new_message.text_content
+        if not text:
+            return
+        answer_cache = self.faq_retriever.answer_cache
+        cached = answer_cache.get(text) if is_question(text) else None
+        if cached is not None:
+            logger.info(f"Answering from the answer cache: {text}")
+            self.lead_data["questions_asked"].append(text)
+            self.lead_checkpoint.mark()
+            # Spoken without the LLM, so numbers and currency are spelled out here
+            self.session.say(speakable(cached))
+            raise StopResponse()
+
+        results = await self.faq_prefetcher.search(text)
+        # Strong matches go into the turn's context, so the LLM can answer without calling search_faq
+        relevant = context_matches(results)
+        if relevant:
+            passages = compose_answer(relevant)
+            turn_ctx.add_message(
+                role="assistant",
+                content=f"FAQ information relevant to the user's next message: {passages}",
+            )
+            # A clear FAQ question's answer is cached, so the next caller to ask it hears
+            # it directly. Only the FAQ's own sentences are cached, never the LLM's reply,
+            # which may carry this caller's name or details
+            if is_direct_answer(text, relevant):
+                answer_cache.put(text, passages)
+
     @function_tool
     async def search_faq(self, context: RunContext, query: str):
-        """Search the Swiggy FAQ knowledge base to answer questions about products, pricing, and services.
+        """Search the company FAQ knowledge base to answer questions about products, pricing, and services.
 
         Use this tool whenever the prospect asks about:
-        - What Swiggy offers
+        - What the company offers
         - Pricing and commission structure
         - How to get started or onboarding process
         - Technical details about partnership
-        - Any other questions about Swiggy's services
+        - Any other questions about the company's services
 
         Args:
             query: The question or topic to search for in the FAQ
@@ -113,35 +208,29 @@ Remember: You're having a natural conversation, not conducting an interrogation.
         logger.info(f"Searching FAQ for: {query}")
 
         # Search for relevant FAQ entries
-        results = faq_retriever.search(query, top_k=2)
+        results = await self.faq_prefetcher.search(query)
 
         if not results:
             return "I don't have specific information about that in my knowledge base. Let me connect you with our partnership team who can provide detailed information."
 
         # Store question in lead data
         self.lead_data["questions_asked"].append(query)
+        self.lead_checkpoint.mark()
 
-        # Format the top result as a natural response
-        top_result = results[0]
-        response = top_result['answer']
-
-        # If there's a second relevant result, add brief additional info
-        if len(results) > 1 and results[1]['relevance_score'] > 0.3:
-            response += f" {results[1]['answer'][:100]}..."
-
-        return response
+        # Whole sentences from the top result (and a relevant second one) that fit a spoken reply
+        return compose_answer(results)
 
     @function_tool
     async def capture_lead_info(
         self,
         context: RunContext,
-        name: str = None,
-        company: str = None,
-        email: str = None,
-        role: str = None,
-        use_case: str = None,
-        team_size: str = None,
-        timeline: str = None
+        name: Optional[str] = None,
+        company: Optional[str] = None,
+        email: Optional[str] = None,
+        role: Optional[str] = None,
+        use_case: Optional[str] = None,
+        team_size: Optional[str] = None,
+        timeline: Optional[str] = None,
     ):
         """Capture prospect information during the conversation.
 
@@ -157,7 +246,9 @@ Remember: You're having a natural conversation, not conducting an interrogation.
             team_size: Size of their team or number of employees
             timeline: When they want to start (immediate, soon, later)
         """
-        logger.info(f"Capturing lead info - Name: {name}, Company: {company}, Email: {email}")
+        logger.info(
+            f"Capturing lead info - Name: {name}, Company: {company}, Email: {email}"
+        )
 
         # Update lead data with non-None values
         if name:
@@ -174,6 +265,7 @@ Remember: You're having a natural conversation, not conducting an interrogation.
             self.lead_data["team_size"] = team_size
         if timeline:
             self.lead_data["timeline"] = timeline
+        self.lead_checkpoint.mark()
 
         return "Information captured successfully."
 
@@ -188,71 +280,33 @@ Remember: You're having a natural conversation, not conducting an interrogation.
         """
         logger.info("Completing conversation and generating summary")
 
-        # Save lead data to file
-        self._save_lead_data()
+        # Save lead data to the lead store
+        await self._save_lead_data()
 
         # Generate summary
         summary = self._generate_summary()
 
-        return f"Here's a quick summary of our conversation: {summary} I've captured all your information and our partnership team will reach out to you soon. Thanks for your interest in Swiggy!"
-
-    def _save_lead_data(self):
-        """Save lead data to JSON file"""
-        try:
-            # Create leads directory if it doesn't exist
-            leads_dir = Path(__file__).parent.parent / "data" / "leads"
-            leads_dir.mkdir(parents=True, exist_ok=True)
-
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"lead_{timestamp}.json"
-            filepath = leads_dir / filename
-
-            # Add metadata
-            self.lead_data["conversation_ended"] = datetime.now().isoformat()
-            self.lead_data["lead_score"] = self._calculate_lead_score()
-
-            # Save to file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.lead_data, f, indent=2, ensure_ascii=False)
-
-            logger.info(f"Lead data saved to {filepath}")
-
-        except Exception as e:
-            logger.error(f"Error saving lead data: {e}")
+        return f"Here's a quick summary of our conversation: {summary} I've captured all your information and our partnership team will reach out to you soon. Thanks for your interest in {self.faq_retriever.faq_data.get('company_name', 'Swiggy')}!"
+
+    async def _save_lead_data(self):
+        """Mark the conversation ended and save lead data to the lead store now"""
+        self.lead_data["conversation_ended"] = datetime.now().isoformat()
+        self.lead_data["lead_score"] = self._calculate_lead_score()
+        self.lead_checkpoint.mark()
+        await self.lead_checkpoint.flush()
+        logger.info(f"Lead {self.lead_id} saved")
+
+    def _lead_snapshot(self) -> dict:
+        """A copy of lead_data to store, scored as it stands"""
+        return {
+            **self.lead_data,
+            "questions_asked": list(self.lead_data["questions_asked"]),
+            "lead_score": self._calculate_lead_score(),
+        }
 
     def _calculate_lead_score(self) -> str:
         """Calculate lead qualification score"""
-        score = 0
-
-        # Check completeness
-        if self.lead_data.get("name"):
-            score += 1
-        if self.lead_data.get("email"):
-            score += 2
-        if self.lead_data.get("company"):
-            score += 1
-        if self.lead_data.get("use_case"):
-            score += 1
-
-        # Check timeline
-        timeline = self.lead_data.get("timeline", "").lower()
-        if "immediate" in timeline:
-            score += 2
-        elif "soon" in timeline:
-            score += 1
-
-        # Check engagement
-        if len(self.lead_data.get("questions_asked", [])) >= 3:
-            score += 1
-
-        # Classify
-        if score >= 6:
-            return "hot"
-        elif score >= 4:
-            return "warm"
-        else:
-            return "cold"
+        return score_lead(self.lead_data)
 
     def _generate_summary(self) -> str:
         """Generate a natural summary of the lead"""
@@ -293,6 +347,10 @@ Remember: You're having a natural conversation, not conducting an interrogation.
 
 def prewarm(proc: JobProcess):
     proc.userdata["vad"] = silero.VAD.load()
+    # Most calls use the default knowledge base; load it before the first one
+    kb_registry.get()
+    # Creates the lead store and its indexes once per process
+    ensure_schema()
 
 
 async def entrypoint(ctx: JobContext):
@@ -302,6 +360,15 @@ async def entrypoint(ctx: JobContext):
         "room": ctx.room.name,
     }
 
+    # The client company this call is for; its knowledge base is loaded on first use
+    tenant = read_tenant(ctx.job.metadata or ctx.job.room.metadata)
+    try:
+        faq_retriever = await kb_registry.aget(tenant)
+    except KeyError:
+        logger.warning(f"Unknown tenant {tenant!r}, using the default knowledge base")
+        faq_retriever = await kb_registry.aget()
+    _ensure_kb_refresher()
+
     # Set up a voice AI pipeline using OpenAI, Cartesia, AssemblyAI, and the LiveKit turn detector
     session = AgentSession(
         # Speech-to-text (STT) is your agent's ears, turning the user's speech into text that the LLM can understand
@@ -310,16 +377,16 @@ async def entrypoint(ctx: JobContext):
         # A Large Language Model (LLM) is your agent's brain, processing user input and generating a response
         # See all available models at https://docs.livekit.io/agents/models/llm/
         llm=google.LLM(
-                model="gemini-2.5-flash",
-            ),
+            model="gemini-2.5-flash",
+        ),
         # Text-to-speech (TTS) is your agent's voice, turning the LLM's text into speech that the user can hear
         # See all available models as well as voice selections at https://docs.livekit.io/agents/models/tts/
         tts=murf.TTS(
-                voice="en-US-matthew", 
-                style="Conversation",
-                tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-                text_pacing=True
-            ),
+            voice="en-US-matthew",
+            style="Conversation",
+            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
+            text_pacing=True,
+        ),
         # VAD and turn detection are used to determine when the user is speaking and when the agent should respond
         # See more at https://docs.livekit.io/agents/build/turns
         turn_detection=MultilingualModel(),
@@ -351,6 +418,12 @@ async def entrypoint(ctx: JobContext):
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage: {summary}")
+        prefetcher = assistant.faq_prefetcher
+        logger.info(f"FAQ prefetch: {prefetcher.hits} hits, {prefetcher.misses} misses")
+        answer_cache = faq_retriever.answer_cache
+        logger.info(
+            f"FAQ answer cache (all calls): {answer_cache.hits} hits, {answer_cache.misses} misses"
+        )
 
     ctx.add_shutdown_callback(log_usage)
 
@@ -362,9 +435,18 @@ async def entrypoint(ctx: JobContext):
     # # Start the avatar and wait for it to join
     # await avatar.start(session, room=ctx.room)
 
+    assistant = SwiggySDRAssistant(faq_retriever)
+    # Save whatever lead details were captured, even if the caller hangs up first
+    ctx.add_shutdown_callback(assistant.lead_checkpoint.aclose)
+
+    # Search the FAQ on every transcript as it arrives, before the turn ends
+    @session.on("user_input_transcribed")
+    def _on_user_input_transcribed(ev: UserInputTranscribedEvent):
+        assistant.faq_prefetcher.prefetch(ev.transcript, final=ev.is_final)
+
     # Start the session, which initializes the voice pipeline and warms up the models
     await session.start(
-        agent=SwiggySDRAssistant(),
+        agent=assistant,
         room=ctx.room,
         room_input_options=RoomInputOptions(
             # For telephony applications, use `BVCTelephony` for best results
@@ -0,0 +1,295 @@
+"""
+Spoken answers composed from whole FAQ sentences, and a cache of them.
+
+Answers are split into sentences once, when the knowledge base is loaded (each
+entry carries them as 'sentences', persisted with the index), and
+compose_answer() builds search_faq's reply from whole sentences under a
+character budget. The LLM gets a short answer it can speak as is, instead of a
+full answer plus a clipped fragment of the next one to smooth over.
+
+Prospects ask the same few questions on every call. AnswerCache keeps each
+knowledge base's composed answers by normalized question, so a repeat can be
+spoken directly, without a tool call or an LLM round trip. Publishing a new
+version of the knowledge base empties it. Answers spoken that way skip the LLM's
+instruction to spell out numbers and currency, so speakable() does it instead.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from faq_index import normalize_query
+
+# How long a cached answer is reused, and how many a knowledge base keeps
+ANSWER_CACHE_TTL_SECONDS = 600
+ANSWER_CACHE_SIZE = 512
+
+# About twenty seconds of speech
+VOICE_ANSWER_CHARS = 320
+
+# Sentences from results after the first are added only if they are this relevant
+SECONDARY_MIN_RELEVANCE = 0.3
+
+# A search result counts as evidence that a user turn is about an FAQ entry only
+# with at least this raw BM25 score and this many of the turn's own words in the
+# entry. relevance_score can't be used for this: it is relative to the best score
+# the turn's words could reach, so a one-word turn like "owner" scores near 1.0
+CONTEXT_MIN_SCORE = 4.0
+CONTEXT_MIN_TERMS = 1
+# Stricter, for answers spoken without the LLM and cached for later callers
+DIRECT_ANSWER_MIN_SCORE = 6.0
+DIRECT_ANSWER_MIN_TERMS = 2
+
+# Words a spoken question starts with, when the transcript has no question mark
+_QUESTION_STARTS = frozenset(
+    {
+        "what",
+        "how",
+        "when",
+        "where",
+        "which",
+        "who",
+        "why",
+        "do",
+        "does",
+        "did",
+        "can",
+        "could",
+        "is",
+        "are",
+        "will",
+        "would",
+        "should",
+        "tell",
+    }
+)
+
+# A sentence ends at . ! or ? followed by space and a capital, digit or quote...
+_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+(?=["\'(A-Z0-9])')
+# ...unless the period belongs to one of these
+_ABBREVIATIONS = frozenset(
+    {
+        "rs",
+        "mr",
+        "mrs",
+        "ms",
+        "dr",
+        "no",
+        "vs",
+        "etc",
+        "approx",
+        "e.g",
+        "i.e",
+        "inc",
+        "ltd",
+    }
+)
+
+
+_ONES = [
+    "zero",
+    "one",
+    "two",
+    "three",
+    "four",
+    "five",
+    "six",
+    "seven",
+    "eight",
+    "nine",
+    "ten",
+    "eleven",
+    "twelve",
+    "thirteen",
+    "fourteen",
+    "fifteen",
+    "sixteen",
+    "seventeen",
+    "eighteen",
+    "nineteen",
+]
+_TENS = [
+    "_",
+    "_",
+    "twenty",
+    "thirty",
+    "forty",
+    "fifty",
+    "sixty",
+    "seventy",
+    "eighty",
+    "ninety",
+]
+_SCALES = ((10**9, "billion"), (10**6, "million"), (1000, "thousand"), (100, "hundred"))
+
+# An amount in rupees, a percentage, a range, "500+", or any other number
+_NUMBER = r"\d[\d,]*(?:\.\d+)?"
+_SPOKEN_RE = re.compile(
+    rf"(?:Rs\.?|INR|₹)\s*(?P<rupees>{_NUMBER})"
+    rf"|(?P<low>{_NUMBER})\s*-\s*(?P<high>{_NUMBER})(?P<range_percent>\s*%)?"
+    rf"|(?P<percent>{_NUMBER})\s*%"
+    rf"|(?P<over>{_NUMBER})\+"
+    rf"|(?P<number>{_NUMBER})"
+)
+
+
+def _integer_words(n: int) -> str:
+    if n < 20:
+        return _ONES[n]
+    if n < 100:
+        tens, ones = divmod(n, 10)
+        return _TENS[tens] + (f"-{_ONES[ones]}" if ones else "")
+    scale, name = next((scale, name) for scale, name in _SCALES if n >= scale)
+    high, rest = divmod(n, scale)
+    words = f"{_integer_words(high)} {name}"
+    return f"{words} {_integer_words(rest)}" if rest else words
+
+
+def number_words(number: str) -> str:
+    """A number as written in an answer ("5,000", "2.5") in words"""
+    whole, _, fraction = number.replace(",", "").partition(".")
+    words = _integer_words(int(whole))
+    if fraction:
+        words += " point " + " ".join(_ONES[int(digit)] for digit in fraction)
+    return words
+
+
+def _speak(match: "re.Match[str]") -> str:
+    if match["rupees"]:
+        return f"{number_words(match['rupees'])} rupees"
+    if match["low"]:
+        words = f"{number_words(match['low'])} to {number_words(match['high'])}"
+        return f"{words} percent" if match["range_percent"] else words
+    if match["percent"]:
+        return f"{number_words(match['percent'])} percent"
+    if match["over"]:
+        return f"more than {number_words(match['over'])}"
+    return number_words(match["number"])
+
+
+def speakable(text: str) -> str:
+    """
+    An answer as the LLM would be told to say it: amounts, percentages and other
+    numbers spelled out ("Rs. 5,000" -> "five thousand rupees", "10-20%" -> "ten
+    to twenty percent")
+    """
+    return _SPOKEN_RE.sub(_speak, text)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split an answer into sentences, keeping abbreviations like "Rs. 29" together"""
+    sentences: List[str] = []
+    start = 0
+    for match in _BOUNDARY_RE.finditer(text):
+        words = text[start : match.start()].split()
+        if words and words[-1].rstrip(".").lower() in _ABBREVIATIONS:
+            continue
+        sentences.append(text[start : match.start()].strip())
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def context_matches(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The results strong enough to add to a user turn's context"""
+    return [
+        r
+        for r in results
+        if r["bm25_score"] >= CONTEXT_MIN_SCORE
+        and r["matched_terms"] >= CONTEXT_MIN_TERMS
+    ]
+
+
+def is_question(text: str) -> bool:
+    words = text.strip().lower().split()
+    return bool(words) and (
+        text.rstrip().endswith("?") or words[0].strip(",") in _QUESTION_STARTS
+    )
+
+
+def is_direct_answer(text: str, results: List[Dict[str, Any]]) -> bool:
+    """Whether a user turn is an FAQ question whose best match can be answered without the LLM"""
+    return (
+        bool(results)
+        and is_question(text)
+        and (
+            results[0]["bm25_score"] >= DIRECT_ANSWER_MIN_SCORE
+            and results[0]["matched_terms"] >= DIRECT_ANSWER_MIN_TERMS
+        )
+    )
+
+
+def compose_answer(
+    results: List[Dict[str, Any]], max_chars: int = VOICE_ANSWER_CHARS
+) -> str:
+    """
+    The reply for a search: the best answer's sentences, in order, while they fit
+    in `max_chars`, then leading sentences of other relevant answers that still fit.
+    Always includes the best answer's first sentence, however long.
+    """
+    parts: List[str] = []
+    length = 0
+    for rank, result in enumerate(results):
+        if rank > 0 and result.get("relevance_score", 0) <= SECONDARY_MIN_RELEVANCE:
+            break
+        for sentence in result.get("sentences") or split_sentences(result["answer"]):
+            added = len(sentence) + (1 if parts else 0)
+            if parts and length + added > max_chars:
+                break
+            parts.append(sentence)
+            length += added
+        if length >= max_chars:
+            break
+    return " ".join(parts)
+
+
+class AnswerCache:
+    """Composed answers by normalized question, for one knowledge base, expiring after `ttl` seconds"""
+
+    def __init__(
+        self,
+        current_version: Callable[[], int],
+        ttl: float = ANSWER_CACHE_TTL_SECONDS,
+        max_entries: int = ANSWER_CACHE_SIZE,
+    ) -> None:
+        self.current_version = current_version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[int] = None
+        # key -> (answer, expiry on the monotonic clock)
+        self._answers: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+
+    def _check_version(self) -> None:
+        # Answers came from an older version of the knowledge base; drop them all
+        version = self.current_version()
+        if version != self._version:
+            self._answers.clear()
+            self._version = version
+
+    def get(self, query: str) -> Optional[str]:
+        """The cached answer to `query`, if there is a fresh one"""
+        self._check_version()
+        key = normalize_query(query)
+        cached = self._answers.get(key)
+        if cached is None or cached[1] < time.monotonic():
+            self._answers.pop(key, None)
+            self.misses += 1
+            return None
+        self._answers.move_to_end(key)
+        self.hits += 1
+        return cached[0]
+
+    def put(self, query: str, answer: str) -> None:
+        self._check_version()
+        key = normalize_query(query)
+        if not key:
+            return
+        self._answers[key] = (answer, time.monotonic() + self.ttl)
+        self._answers.move_to_end(key)
+        while len(self._answers) > self.max_entries:
+            self._answers.popitem(last=False)
@@ -0,0 +1,351 @@
+"""
+Retrieval quality and latency benchmark for the FAQ search engines.
+
+`quality` scores every engine on the labeled queries in data/faq_queries.json
+against data/company_faq.json: recall@k (the share of each query's relevant
+entries in its top k) and MRR (mean reciprocal rank of the first relevant
+entry). Fallback results, which have no relevance score, count as misses.
+
+`scale` generates synthetic knowledge bases of the given sizes and reports each
+engine's build time and its p50/p99 query latency. Each synthetic query is a few
+words of one entry's question, so recall@k is reported there too.
+
+Engines, side by side:
+  legacy  the original keyword-overlap scorer, a linear scan over every entry
+  bm25    FAQRetriever.search over the in-memory BM25 index
+  mapped  FAQRetriever.search over the persisted, memory-mapped index
+  matrix  FAQRetriever.search_batch (needs numpy); latency is per query,
+          amortized over batches of BATCH_SIZE
+
+    uv run src/faq_bench.py quality
+    uv run src/faq_bench.py scale --sizes 1000,10000,100000,1000000 --engines bm25,mapped,matrix
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from faq_index import tokenize
+from rag_handler import FAQRetriever
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+FAQ_FILE = DATA_DIR / "company_faq.json"
+QUERIES_FILE = DATA_DIR / "faq_queries.json"
+
+ENGINES = ("legacy", "bm25", "mapped", "matrix")
+TOP_K = 3
+BATCH_SIZE = 64
+# The legacy scorer is a linear scan in Python; past this size it takes minutes per run
+LEGACY_MAX_ENTRIES = 10000
+
+# Searches the given queries, returning each one's results
+SearchFn = Callable[[List[str], int], List[List[Dict[str, Any]]]]
+
+# The stop words the original scorer used
+_LEGACY_STOP_WORDS = frozenset(
+    {
+        "the",
+        "a",
+        "an",
+        "is",
+        "are",
+        "what",
+        "how",
+        "do",
+        "does",
+        "can",
+        "will",
+        "about",
+        "for",
+        "with",
+        "to",
+        "of",
+        "in",
+        "on",
+    }
+)
+
+_LEGACY_KEY_TERMS = {
+    "pricing": (["price", "pricing", "cost", "commission", "fee", "charge"], 0.3),
+    "onboarding": (
+        ["onboard", "start", "signup", "register", "join", "get started"],
+        0.3,
+    ),
+    "delivery": (["delivery", "deliver", "fleet", "rider", "executive"], 0.2),
+    "payment": (["payment", "settle", "money", "pay", "fund"], 0.2),
+    "support": (["support", "help", "assist", "service"], 0.2),
+    "partner": (["partner", "partnership", "collaborate"], 0.2),
+}
+
+
+def legacy_similarity(query: str, text: str) -> float:
+    """FAQRetriever's original _simple_similarity: keyword overlap plus key-term and substring bonuses"""
+    query_lower = query.lower()
+    text_lower = text.lower()
+    query_words = [
+        w for w in query_lower.split() if w not in _LEGACY_STOP_WORDS and len(w) > 2
+    ]
+    text_words = [w for w in text_lower.split() if len(w) > 2]
+    if not query_words:
+        return 0.0
+
+    query_set = set(query_words)
+    similarity = len(query_set & set(text_words)) / len(query_set)
+    for terms, bonus in _LEGACY_KEY_TERMS.values():
+        if any(term in query_lower for term in terms) and any(
+            term in text_lower for term in terms
+        ):
+            similarity += bonus
+    for q_word in query_words:
+        if len(q_word) > 3 and any(
+            q_word in t_word or t_word in q_word for t_word in text_words
+        ):
+            similarity += 0.1
+    return min(similarity, 1.5)
+
+
+def legacy_search(
+    entries: List[Dict[str, str]], query: str, top_k: int
+) -> List[Dict[str, Any]]:
+    """FAQRetriever's original search: score every entry, question weighted over answer"""
+    scored = []
+    for entry in entries:
+        score = (
+            legacy_similarity(query, entry["question"]) * 1.5
+            + legacy_similarity(query, entry["answer"]) * 0.8
+        )
+        if score > 0.05:
+            scored.append({**entry, "relevance_score": score})
+    scored.sort(key=lambda r: r["relevance_score"], reverse=True)
+    return scored[:top_k] if scored else entries[:2]
+
+
+def open_engine(name: str, source: Path, workdir: Path) -> SearchFn:
+    """Load `source` into engine `name`; the time this takes is the engine's build time"""
+    if name == "legacy":
+        with open(source, encoding="utf-8") as f:
+            entries = FAQRetriever._prepare_faq_entries(json.load(f))
+        return lambda queries, top_k: [
+            legacy_search(entries, query, top_k) for query in queries
+        ]
+    if name == "bm25":
+        retriever = FAQRetriever(str(source))
+    elif name == "mapped":
+        retriever = FAQRetriever(str(source), str(workdir / f"{source.stem}.idx"))
+    elif name == "matrix":
+        retriever = FAQRetriever(str(source))
+        retriever.search_batch([""])
+        return retriever.search_batch
+    else:
+        raise ValueError(f"Unknown engine {name!r}; choose from {', '.join(ENGINES)}")
+    return lambda queries, top_k: [retriever.search(query, top_k) for query in queries]
+
+
+def run_queries(
+    search: SearchFn, queries: List[str], top_k: int, batch_size: int
+) -> Tuple[List[List[Dict]], List[float]]:
+    """Results of every query and the latency of each, in seconds"""
+    results, latencies = [], []
+    for start in range(0, len(queries), batch_size):
+        chunk = queries[start : start + batch_size]
+        started = time.perf_counter()
+        results.extend(search(chunk, top_k))
+        elapsed = time.perf_counter() - started
+        latencies.extend([elapsed / len(chunk)] * len(chunk))
+    return results, latencies
+
+
+def quality(
+    results: List[List[Dict[str, Any]]], relevant: List[List[str]], k: int
+) -> Tuple[float, float]:
+    """(recall@k, MRR) of ranked results against each query's relevant questions"""
+    recall, reciprocal_rank = 0.0, 0.0
+    for ranked, expected in zip(results, relevant):
+        found = [r["question"] for r in ranked if r.get("relevance_score", 0) > 0]
+        recall += len(set(found[:k]) & set(expected)) / len(expected)
+        rank = next(
+            (i for i, question in enumerate(found, 1) if question in expected), None
+        )
+        reciprocal_rank += 1 / rank if rank else 0.0
+    return recall / len(relevant), reciprocal_rank / len(relevant)
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def synthetic_faq(
+    size: int, queries: int, seed: int
+) -> Tuple[Dict[str, Any], List[str], List[List[str]]]:
+    """
+    A knowledge base of `size` FAQ entries and queries with their relevant question.
+
+    Words are drawn Zipf-style from the real FAQ's vocabulary padded with
+    made-up words, so term frequencies look like natural text's.
+    """
+    rng = random.Random(seed)
+    with open(FAQ_FILE, encoding="utf-8") as f:
+        real = sorted(
+            {
+                w
+                for entry in FAQRetriever._prepare_faq_entries(json.load(f))
+                for w in (entry["question"] + " " + entry["answer"]).lower().split()
+                if w.isalpha()
+            }
+        )
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = real + [
+        "".join(rng.choices(letters, k=rng.randint(4, 10)))
+        for _ in range(max(5000, size // 20))
+    ]
+    rng.shuffle(vocabulary)
+    cum_weights, total = [], 0.0
+    for rank in range(1, len(vocabulary) + 1):
+        total += 1 / rank
+        cum_weights.append(total)
+
+    faq = []
+    for _ in range(size):
+        question = rng.choices(
+            vocabulary, cum_weights=cum_weights, k=rng.randint(5, 10)
+        )
+        answer = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(20, 40))
+        faq.append(
+            {
+                "question": " ".join(question).capitalize() + "?",
+                "answer": " ".join(answer) + ".",
+            }
+        )
+
+    texts, relevant = [], []
+    for entry in rng.sample(faq, min(queries, size)):
+        words = [
+            w for w in entry["question"].rstrip("?").lower().split() if tokenize(w)
+        ]
+        texts.append(" ".join(rng.sample(words, min(3, len(words)))))
+        relevant.append([entry["question"]])
+    return {"company_name": "Synthetic", "faq": faq}, texts, relevant
+
+
+def bench_quality(engines: List[str], k: int) -> List[Dict[str, Any]]:
+    with open(QUERIES_FILE, encoding="utf-8") as f:
+        labeled = json.load(f)
+    queries = [item["query"] for item in labeled]
+    relevant = [item["relevant"] for item in labeled]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in engines:
+            search = open_engine(name, FAQ_FILE, Path(workdir))
+            results, latencies = run_queries(
+                search, queries, max(k, 10), BATCH_SIZE if name == "matrix" else 1
+            )
+            recall, mrr = quality(results, relevant, k)
+            rows.append(
+                {
+                    "engine": name,
+                    "queries": len(queries),
+                    f"recall@{k}": recall,
+                    "mrr": mrr,
+                    "p50_ms": percentile(latencies, 50) * 1000,
+                    "p99_ms": percentile(latencies, 99) * 1000,
+                }
+            )
+    return rows
+
+
+def bench_scale(
+    engines: List[str], sizes: List[int], queries: int, k: int, seed: int
+) -> List[Dict[str, Any]]:
+    rows = []
+    for size in sizes:
+        faq_data, texts, relevant = synthetic_faq(size, queries, seed)
+        with tempfile.TemporaryDirectory() as workdir:
+            source = Path(workdir) / f"synthetic_{size}.json"
+            source.write_text(json.dumps(faq_data), encoding="utf-8")
+            del faq_data
+            for name in engines:
+                if name == "legacy" and size > LEGACY_MAX_ENTRIES:
+                    print(
+                        f"  skipping legacy at {size:,} entries (over {LEGACY_MAX_ENTRIES:,})"
+                    )
+                    continue
+                started = time.perf_counter()
+                search = open_engine(name, source, Path(workdir))
+                build_s = time.perf_counter() - started
+                results, latencies = run_queries(
+                    search, texts, k, BATCH_SIZE if name == "matrix" else 1
+                )
+                recall, _ = quality(results, relevant, k)
+                rows.append(
+                    {
+                        "engine": name,
+                        "entries": size,
+                        "build_s": build_s,
+                        f"recall@{k}": recall,
+                        "p50_ms": percentile(latencies, 50) * 1000,
+                        "p99_ms": percentile(latencies, 99) * 1000,
+                    }
+                )
+                print(_format_row(rows[-1]))
+                del search
+    return rows
+
+
+def _format_row(row: Dict[str, Any]) -> str:
+    return "  ".join(
+        f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in row.items()
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark FAQ retrieval quality and latency"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command in ("quality", "scale"):
+        sub = commands.add_parser(command)
+        sub.add_argument(
+            "--engines",
+            default=",".join(ENGINES),
+            help="Comma-separated engines to compare",
+        )
+        sub.add_argument("-k", type=int, default=TOP_K, help="Cutoff for recall@k")
+        sub.add_argument("--json", help="Also write the results to this file")
+        if command == "scale":
+            sub.add_argument(
+                "--sizes",
+                default="1000,10000,100000",
+                help="Comma-separated entry counts",
+            )
+            sub.add_argument(
+                "--queries", type=int, default=200, help="Queries per size"
+            )
+            sub.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    engines = args.engines.split(",")
+    if args.command == "quality":
+        rows = bench_quality(engines, args.k)
+        for row in rows:
+            print(_format_row(row))
+    else:
+        rows = bench_scale(
+            engines,
+            [int(size) for size in args.sizes.split(",")],
+            args.queries,
+            args.k,
+            args.seed,
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
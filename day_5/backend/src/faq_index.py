@@ -0,0 +1,479 @@
+"""
+Inverted index over the FAQ knowledge base, scored with BM25.
+
+Entries are tokenized and stemmed once when the index is built, and every
+posting stores its precomputed BM25 impact (question and answer fields weighted
+and summed), so a query only visits the posting lists of its own terms. Partial
+words ("insta" for "instamart") are resolved through a character trigram index
+over the vocabulary rather than by comparing every query word to every entry word.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+# Common English function words, plus the fillers callers say between questions
+# ("yes", "okay", "thanks"); they carry no topic, so they are neither indexed nor
+# counted as evidence that a turn is about an FAQ entry
+STOP_WORDS = frozenset(
+    {
+        "the",
+        "a",
+        "an",
+        "is",
+        "are",
+        "what",
+        "how",
+        "do",
+        "does",
+        "can",
+        "will",
+        "about",
+        "for",
+        "with",
+        "to",
+        "of",
+        "in",
+        "on",
+        "i",
+        "me",
+        "my",
+        "myself",
+        "we",
+        "our",
+        "ours",
+        "ourselves",
+        "you",
+        "your",
+        "yours",
+        "yourself",
+        "he",
+        "him",
+        "his",
+        "she",
+        "her",
+        "it",
+        "its",
+        "they",
+        "them",
+        "their",
+        "which",
+        "whom",
+        "this",
+        "that",
+        "these",
+        "those",
+        "am",
+        "was",
+        "were",
+        "be",
+        "been",
+        "being",
+        "have",
+        "has",
+        "had",
+        "having",
+        "did",
+        "doing",
+        "and",
+        "but",
+        "if",
+        "or",
+        "because",
+        "as",
+        "until",
+        "while",
+        "at",
+        "by",
+        "against",
+        "between",
+        "into",
+        "through",
+        "during",
+        "before",
+        "after",
+        "above",
+        "below",
+        "from",
+        "up",
+        "down",
+        "out",
+        "off",
+        "under",
+        "again",
+        "further",
+        "then",
+        "once",
+        "here",
+        "there",
+        "when",
+        "where",
+        "all",
+        "any",
+        "both",
+        "each",
+        "few",
+        "more",
+        "most",
+        "other",
+        "some",
+        "such",
+        "no",
+        "nor",
+        "not",
+        "only",
+        "own",
+        "same",
+        "so",
+        "than",
+        "too",
+        "very",
+        "just",
+        "should",
+        "now",
+        "would",
+        "could",
+        "also",
+        "let",
+        "well",
+        "really",
+        "yes",
+        "yeah",
+        "yep",
+        "okay",
+        "sure",
+        "thanks",
+        "thank",
+        "please",
+        "hello",
+        "hey",
+        "alright",
+    }
+)
+
+# Topic groups used for query expansion. Text that mentions any term of a group
+# is also indexed under the group's own token, so a query about "cost" matches
+# an entry about "commission" through the shared pricing token, at the group's weight
+KEY_TERM_GROUPS = {
+    "pricing": (["price", "pricing", "cost", "commission", "fee", "charge"], 0.3),
+    "onboarding": (
+        ["onboard", "start", "signup", "register", "join", "get started"],
+        0.3,
+    ),
+    "delivery": (["delivery", "deliver", "fleet", "rider", "executive"], 0.2),
+    "payment": (["payment", "settle", "money", "pay", "fund"], 0.2),
+    "support": (["support", "help", "assist", "service"], 0.2),
+    "partner": (["partner", "partnership", "collaborate"], 0.2),
+}
+
+# Matches in the question count for more than matches in the answer
+FIELD_WEIGHTS = {"question": 1.5, "answer": 0.8}
+
+# Weight of a vocabulary term that only partially matches a query word
+PARTIAL_MATCH_WEIGHT = 0.3
+# Query words shorter than this are never partially matched
+MIN_PARTIAL_LENGTH = 4
+NGRAM = 3
+
+# Standard BM25 parameters: term-frequency saturation and length normalization
+K1 = 1.2
+B = 0.75
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Suffixes stripped by stem(), longest first, with what replaces them
+_SUFFIXES = (
+    ("ss", "ss"),
+    ("ations", "ate"),
+    ("ation", "ate"),
+    ("ments", ""),
+    ("ment", ""),
+    ("ings", ""),
+    ("ing", ""),
+    ("ies", "y"),
+    ("ied", "y"),
+    ("ers", ""),
+    ("er", ""),
+    ("ed", ""),
+    ("es", ""),
+    ("ly", ""),
+    ("s", ""),
+    ("e", ""),
+)
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Strip one common English suffix, so "price", "prices" and "pricing" share a stem"""
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)] + replacement
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Stems of the lowercase words of 3+ characters, without stop words"""
+    return [
+        stem(w)
+        for w in _WORD_RE.findall(text.lower())
+        if len(w) > 2 and w not in STOP_WORDS
+    ]
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: its distinct stemmed terms, in order, so wording and word order don't matter"""
+    return " ".join(sorted(set(tokenize(query))))
+
+
+def ngrams(term: str) -> Set[str]:
+    return {term[i : i + NGRAM] for i in range(len(term) - NGRAM + 1)}
+
+
+def key_term_groups(text: str) -> List[str]:
+    """Tokens of the key-term groups `text` mentions, e.g. '#pricing'"""
+    lowered = text.lower()
+    return [
+        f"#{group}"
+        for group, (terms, _) in KEY_TERM_GROUPS.items()
+        if any(term in lowered for term in terms)
+    ]
+
+
+def index_terms(text: str) -> List[str]:
+    """Everything an entry field is indexed under: its words and its key-term groups"""
+    return tokenize(text) + key_term_groups(text)
+
+
+def expand_query(query: str) -> Dict[str, float]:
+    """Query terms with their weights: 1.0 for words in the query, the group weight for key-term groups"""
+    weights = dict.fromkeys(tokenize(query), 1.0)
+    for token in key_term_groups(query):
+        weights[token] = KEY_TERM_GROUPS[token[1:]][1]
+    return weights
+
+
+class CorpusStats:
+    """The corpus statistics BM25 impacts are computed against"""
+
+    def __init__(
+        self, size: int, avg_lengths: Dict[str, float], doc_freq: Callable[[str], int]
+    ) -> None:
+        self.size = size
+        self.avg_lengths = avg_lengths
+        self.doc_freq = doc_freq
+
+
+class BM25Index:
+    """
+    Term -> [(entry index, impact)] postings over the FAQ entries.
+
+    An entry's score for a query is the weighted sum of its impacts for the
+    query's terms; entries that share no term with the query are never touched.
+
+    With `stats`, impacts are computed against another index's corpus (plus
+    these entries) instead of these entries alone, so the two can be searched
+    together - see LayeredIndex.
+    """
+
+    def __init__(
+        self, entries: List[Dict[str, str]], stats: Optional[CorpusStats] = None
+    ) -> None:
+        self.size = len(entries)
+        self.avg_lengths: Dict[str, float] = {}
+        postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+
+        for field, field_weight in FIELD_WEIGHTS.items():
+            docs = [Counter(index_terms(entry[field])) for entry in entries]
+            lengths = [sum(counts.values()) for counts in docs]
+            avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+            doc_freq = Counter(term for counts in docs for term in counts)
+            self.avg_lengths[field] = avg_length
+            corpus_size = self.size
+            if stats is not None:
+                avg_length = stats.avg_lengths.get(field) or avg_length
+                corpus_size += stats.size
+
+            for doc_id, counts in enumerate(docs):
+                norm = (
+                    K1 * (1 - B + B * lengths[doc_id] / avg_length)
+                    if avg_length
+                    else K1
+                )
+                for term, tf in counts.items():
+                    df = doc_freq[term] + (
+                        stats.doc_freq(term) if stats is not None else 0
+                    )
+                    impact = self._idf(df, corpus_size) * tf * (K1 + 1) / (tf + norm)
+                    postings[term][doc_id] = (
+                        postings[term].get(doc_id, 0.0) + field_weight * impact
+                    )
+
+        self.postings: Dict[str, List[Tuple[int, float]]] = {
+            term: sorted(docs.items()) for term, docs in postings.items()
+        }
+        # Best impact of each term, and of any term, for normalizing scores to 0-1
+        self.max_impact = {
+            term: max(impact for _, impact in docs)
+            for term, docs in self.postings.items()
+        }
+        self.unknown_term_impact = max(self.max_impact.values(), default=1.0)
+
+        # Trigram -> vocabulary terms containing it, for partial matches
+        self.ngram_index: Dict[str, Set[str]] = defaultdict(set)
+        for term in self.postings:
+            if not term.startswith("#"):
+                for gram in ngrams(term):
+                    self.ngram_index[gram].add(term)
+        self._init_partial_matches()
+
+    def _init_partial_matches(self) -> None:
+        # Query words repeat a lot across calls; the index never changes, so memoize per index
+        self.partial_matches = lru_cache(maxsize=4096)(self._partial_matches)
+
+    @staticmethod
+    def _idf(doc_freq: int, corpus_size: int) -> float:
+        return math.log(1 + (corpus_size - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def doc_count(self, term: str) -> int:
+        """Number of entries containing `term`"""
+        return len(self.postings.get(term, ()))
+
+    def corpus_stats(self) -> CorpusStats:
+        """This index's statistics, for scoring a delta index against it"""
+        return CorpusStats(self.size, self.avg_lengths, self.doc_count)
+
+    def posting_arrays(self) -> Tuple[List[str], List[int], List[int], List[float]]:
+        """The postings as flat arrays: (terms, term start offsets, entry indexes, impacts)"""
+        terms = list(self.postings)
+        term_ptr, doc_ids, impacts = [0], [], []
+        for term in terms:
+            for doc_id, impact in self.postings[term]:
+                doc_ids.append(doc_id)
+                impacts.append(impact)
+            term_ptr.append(len(doc_ids))
+        return terms, term_ptr, doc_ids, impacts
+
+    def _partial_matches(self, term: str) -> FrozenSet[str]:
+        """Vocabulary terms that contain `term` or are contained in it"""
+        if len(term) < MIN_PARTIAL_LENGTH or term.startswith("#"):
+            return frozenset()
+        # Terms containing `term` have all of its trigrams
+        grams = [self.ngram_index.get(gram, set()) for gram in ngrams(term)]
+        candidates = set.intersection(*sorted(grams, key=len)) if all(grams) else set()
+        matches = {t for t in candidates if term in t}
+        # Terms inside `term`: each of its substrings is one set lookup
+        for start in range(len(term)):
+            for end in range(start + MIN_PARTIAL_LENGTH, len(term) + 1):
+                if term[start:end] in self.postings:
+                    matches.add(term[start:end])
+        matches.discard(term)
+        return frozenset(matches)
+
+    def expand_partial(self, weights: Dict[str, float]) -> Dict[str, float]:
+        """Add the partial matches of each query term at PARTIAL_MATCH_WEIGHT"""
+        expanded = dict(weights)
+        for term, weight in weights.items():
+            for match in self.partial_matches(term):
+                if match not in weights:
+                    expanded[match] = max(
+                        expanded.get(match, 0.0), weight * PARTIAL_MATCH_WEIGHT
+                    )
+        return expanded
+
+    def score(self, weights: Dict[str, float]) -> Dict[int, float]:
+        """Raw BM25 score of every entry that contains at least one query term"""
+        scores: Dict[int, float] = defaultdict(float)
+        for term, weight in weights.items():
+            for doc_id, impact in self.postings.get(term, ()):
+                scores[doc_id] += weight * impact
+        return scores
+
+    def best_possible(self, weights: Dict[str, float]) -> float:
+        """Upper bound on a score for these terms; words the index has never seen count too"""
+        return sum(
+            weight * self.max_impact.get(term, self.unknown_term_impact)
+            for term, weight in weights.items()
+        )
+
+    def top(
+        self, weights: Dict[str, float], top_k: int, min_score: float = 0.0
+    ) -> List[Tuple[int, float]]:
+        """(entry index, score normalized to 0-1) of the best `top_k` matches, best first"""
+        scores = self.score(weights)
+        if not scores:
+            return []
+        bound = self.best_possible(weights)
+        best = heapq.nlargest(top_k, scores.items(), key=itemgetter(1))
+        return [
+            (doc_id, score / bound)
+            for doc_id, score in best
+            if score / bound > min_score
+        ]
+
+
+class LayeredIndex(BM25Index):
+    """
+    An immutable view of a base index with entries changed since it was built.
+
+    Entries removed or edited since the base was built are hidden by id; new
+    and edited entries live in a small delta index, scored against the base's
+    corpus statistics and numbered after the base's entries. Updating the
+    knowledge base builds a new delta and a new LayeredIndex over the same base,
+    so searches already running keep using the version they started with.
+    """
+
+    def __init__(
+        self, base: BM25Index, delta: BM25Index, deleted: FrozenSet[int]
+    ) -> None:
+        self.base = base
+        self.delta = delta
+        self.deleted = deleted
+        self.size = base.size + delta.size
+        self.avg_lengths = base.avg_lengths
+        self.unknown_term_impact = max(
+            base.unknown_term_impact, delta.unknown_term_impact if delta.size else 0.0
+        )
+        self._init_partial_matches()
+
+    def _partial_matches(self, term: str) -> FrozenSet[str]:
+        return self.base.partial_matches(term) | self.delta.partial_matches(term)
+
+    def doc_count(self, term: str) -> int:
+        return self.base.doc_count(term) + self.delta.doc_count(term)
+
+    def score(self, weights: Dict[str, float]) -> Dict[int, float]:
+        scores = self.base.score(weights)
+        for doc_id in self.deleted:
+            scores.pop(doc_id, None)
+        for doc_id, score in self.delta.score(weights).items():
+            scores[self.base.size + doc_id] = score
+        return scores
+
+    def best_possible(self, weights: Dict[str, float]) -> float:
+        bound = 0.0
+        for term, weight in weights.items():
+            impacts = [
+                index.max_impact[term]
+                for index in (self.base, self.delta)
+                if term in index.max_impact
+            ]
+            bound += weight * (max(impacts) if impacts else self.unknown_term_impact)
+        return bound
+
+    def posting_arrays(self) -> Tuple[List[str], List[int], List[int], List[float]]:
+        terms = list(dict.fromkeys([*self.base.postings, *self.delta.postings]))
+        term_ptr, doc_ids, impacts = [0], [], []
+        for term in terms:
+            for doc_id, impact in self.base.postings.get(term, ()):
+                if doc_id not in self.deleted:
+                    doc_ids.append(doc_id)
+                    impacts.append(impact)
+            for doc_id, impact in self.delta.postings.get(term, ()):
+                doc_ids.append(self.base.size + doc_id)
+                impacts.append(impact)
+            term_ptr.append(len(doc_ids))
+        return terms, term_ptr, doc_ids, impacts
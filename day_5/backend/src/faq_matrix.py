@@ -0,0 +1,99 @@
+"""
+Sparse matrix form of a BM25Index, for scoring many queries at once.
+
+The index's postings become a term-major sparse matrix of BM25 impacts (the
+TF-IDF-style weight of each term in each entry). A batch of queries is a
+sparse query x term matrix of weights, and their scores are the product of
+the two, computed as one scatter-add over the postings the batch touches.
+Top-k selection uses argpartition, so it is linear in the number of entries.
+
+Needs numpy (`uv sync --extra batch`).
+"""
+
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from faq_index import BM25Index
+
+# Queries are scored in chunks so the dense (queries x entries) score block
+# stays around this many float32 cells (16 MB)
+MAX_SCORE_CELLS = 4_000_000
+
+
+class ImpactMatrix:
+    """Term-major (CSC) sparse matrix of BM25 impacts, built from a BM25Index"""
+
+    def __init__(self, index: BM25Index) -> None:
+        self.index = index
+        self.size = index.size
+        terms, term_ptr, doc_ids, impacts = index.posting_arrays()
+        self.columns: Dict[str, int] = {term: col for col, term in enumerate(terms)}
+        self.term_ptr = np.asarray(term_ptr, dtype=np.int64)
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        self.impacts = np.asarray(impacts, dtype=np.float32)
+
+    def _query_matrix(
+        self, batch: List[Dict[str, float]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(row, column, weight) of every query term the index knows"""
+        rows, cols, weights = [], [], []
+        for row, query in enumerate(batch):
+            for term, weight in query.items():
+                col = self.columns.get(term)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    weights.append(weight)
+        return (
+            np.array(rows, dtype=np.int64),
+            np.array(cols, dtype=np.int64),
+            np.array(weights, dtype=np.float32),
+        )
+
+    def scores(self, batch: List[Dict[str, float]]) -> np.ndarray:
+        """Normalized (0-1) scores of every entry for each query, as a len(batch) x size array"""
+        rows, cols, weights = self._query_matrix(batch)
+        starts = self.term_ptr[cols]
+        counts = self.term_ptr[cols + 1] - starts
+
+        # Expand each (query, term) pair into that term's postings
+        pair = np.repeat(np.arange(len(cols)), counts)
+        offsets = np.arange(int(counts.sum())) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        postings = starts[pair] + offsets
+
+        cells = rows[pair] * self.size + self.doc_ids[postings]
+        values = weights[pair] * self.impacts[postings]
+        raw = np.bincount(cells, weights=values, minlength=len(batch) * self.size)
+        raw = raw.reshape(len(batch), self.size).astype(np.float32)
+
+        bounds = np.array(
+            [self.index.best_possible(query) or 1.0 for query in batch],
+            dtype=np.float32,
+        )
+        return raw / bounds[:, None]
+
+    def top(
+        self, batch: List[Dict[str, float]], top_k: int, min_score: float = 0.0
+    ) -> Iterator[List[Tuple[int, float]]]:
+        """Like BM25Index.top for each query in `batch`, in order"""
+        k = min(top_k, self.size)
+        chunk = max(1, MAX_SCORE_CELLS // max(self.size, 1))
+        for start in range(0, len(batch), chunk):
+            scores = self.scores(batch[start : start + chunk])
+            if k < self.size:
+                best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                best = np.broadcast_to(np.arange(self.size), (len(scores), self.size))
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            best = np.take_along_axis(best, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            for docs, values in zip(best.tolist(), best_scores.tolist()):
+                yield [
+                    (doc, score)
+                    for doc, score in zip(docs, values)
+                    if score > min_score
+                ]
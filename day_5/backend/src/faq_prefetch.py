@@ -0,0 +1,109 @@
+"""
+Speculative FAQ retrieval for one call.
+
+Without it the search only starts once the LLM decides to call search_faq, a
+serial hop between the end of the user's turn and the answer. Instead, every
+final STT transcript starts a search as it arrives, and so does an interim one
+once the caller pauses for DEBOUNCE_SECONDS; results are cached per session
+under the query's normalized terms, so by the time the turn ends - or the tool
+is called with the same question - the search has usually finished already.
+
+Interim transcripts arrive several times a second while the caller talks, each
+a little longer than the last, so a search for one that is superseded within
+the debounce window is cancelled before it starts.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from faq_index import normalize_query
+from rag_handler import FAQRetriever
+
+logger = logging.getLogger("rag_handler")
+
+# How long an interim transcript must stand before it is searched
+DEBOUNCE_SECONDS = 0.2
+
+
+class FAQPrefetcher:
+    """FAQ searches for one session, started ahead of time and cached by normalized query"""
+
+    def __init__(
+        self,
+        retriever: FAQRetriever,
+        top_k: int = 2,
+        max_entries: int = 64,
+        debounce: float = DEBOUNCE_SECONDS,
+    ) -> None:
+        self.retriever = retriever
+        self.top_k = top_k
+        self.max_entries = max_entries
+        self.debounce = debounce
+        self.hits = 0
+        self.misses = 0
+        # key -> (knowledge base version searched, search task)
+        self._searches: OrderedDict[str, Tuple[int, asyncio.Task]] = OrderedDict()
+        # The interim transcript waiting out the debounce: (key, timer)
+        self._pending: Optional[Tuple[str, asyncio.TimerHandle]] = None
+
+    def _start(self, key: str, query: str) -> Tuple[asyncio.Task, bool]:
+        """The search for `key`, started now unless it is cached for the current version; and whether it was"""
+        version = self.retriever.version
+        cached = self._searches.get(key)
+        if cached is not None and cached[0] == version:
+            self._searches.move_to_end(key)
+            return cached[1], True
+
+        task = asyncio.ensure_future(
+            asyncio.to_thread(self.retriever.search, query, self.top_k)
+        )
+        self._searches[key] = (version, task)
+        while len(self._searches) > self.max_entries:
+            self._searches.popitem(last=False)
+        return task, False
+
+    def _cancel_pending(self) -> None:
+        if self._pending is not None:
+            self._pending[1].cancel()
+            self._pending = None
+
+    def _start_pending(self, key: str, query: str) -> None:
+        self._pending = None
+        self._start(key, query)
+
+    def prefetch(self, transcript: str, final: bool = True) -> None:
+        """
+        Search for a transcript in the background: a final one at once, an interim
+        one unless another transcript replaces it within the debounce window
+        """
+        key = normalize_query(transcript)
+        if not key:
+            return
+        if self._pending is not None and self._pending[0] == key and not final:
+            return
+        self._cancel_pending()
+        if final or self.debounce <= 0:
+            self._start(key, transcript)
+        else:
+            timer = asyncio.get_running_loop().call_later(
+                self.debounce, self._start_pending, key, transcript
+            )
+            self._pending = (key, timer)
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        """The results for `query`, from a search already started for it if there was one"""
+        key = normalize_query(query)
+        if not key:
+            # Nothing to match on (e.g. "ok"), so the search only returns the fallback entries
+            return self.retriever.search(query, self.top_k)
+        if self._pending is not None and self._pending[0] == key:
+            # Waiting out the debounce; no point waiting any longer
+            self._cancel_pending()
+        task, hit = self._start(key, query)
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return await task
@@ -0,0 +1,346 @@
+"""
+Persisted FAQ index: a versioned binary file that workers memory-map.
+
+The file holds everything FAQRetriever needs - the knowledge-base metadata,
+the search entries, the vocabulary with its postings and BM25 impacts, and
+the trigram index - as flat, sorted arrays. Opening it only maps the file:
+lookups bisect the sorted vocabulary and read postings straight from the
+mapping, so startup does no parsing or index construction, and every worker
+on a machine shares the same pages.
+
+The header records the SHA-256 of the source JSON; FAQRetriever rebuilds the
+file when the source changes.
+
+    uv run src/faq_store.py build data/company_faq.json            # writes data/company_faq.idx
+    uv run src/faq_store.py info data/company_faq.idx
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from faq_index import BM25Index
+
+logger = logging.getLogger("rag_handler")
+
+MAGIC = b"FAQIDX\0\0"
+# Bump whenever the layout, the entries, the tokenizer or the scoring changes
+FORMAT_VERSION = 4
+
+_SECTIONS = (
+    "meta",
+    "stats",
+    "entry_offsets",
+    "entries",
+    "term_offsets",
+    "terms",
+    "term_ptr",
+    "doc_ids",
+    "impacts",
+    "max_impacts",
+    "gram_offsets",
+    "grams",
+    "gram_ptr",
+    "gram_terms",
+)
+# Every version starts with the magic and format version, so they can be checked
+# before the rest of the header, whose layout depends on the version
+_PREFIX = struct.Struct("<8sI")
+# magic, format version, byte order, source sha256, entries, unknown-term impact,
+# then (offset, length) of each section
+_HEADER = struct.Struct(f"<8sI4s32sQd{2 * len(_SECTIONS)}Q")
+_BYTE_ORDER = sys.byteorder[:4].encode().ljust(4, b"\0")
+
+
+def source_hash(path: str) -> bytes:
+    """SHA-256 of the source JSON's bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def _string_table(strings: List[str]) -> Tuple[bytes, bytes]:
+    """(offsets, blob) for a list of strings"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("q", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return offsets.tobytes(), b"".join(encoded)
+
+
+def write_index(
+    path: str,
+    index: BM25Index,
+    entries: List[Dict[str, str]],
+    meta: Dict[str, Any],
+    digest: bytes,
+) -> None:
+    """Write `index` and its entries to `path`, replacing any existing file atomically"""
+    terms = sorted(index.postings)
+    term_ids = {term: i for i, term in enumerate(terms)}
+    term_ptr, doc_ids, impacts = array("q", [0]), array("i"), array("d")
+    for term in terms:
+        for doc_id, impact in index.postings[term]:
+            doc_ids.append(doc_id)
+            impacts.append(impact)
+        term_ptr.append(len(doc_ids))
+    max_impacts = array("d", (index.max_impact[term] for term in terms))
+
+    grams = sorted(index.ngram_index)
+    gram_ptr, gram_terms = array("q", [0]), array("i")
+    for gram in grams:
+        gram_terms.extend(sorted(term_ids[term] for term in index.ngram_index[gram]))
+        gram_ptr.append(len(gram_terms))
+
+    entry_offsets, entry_blob = _string_table(
+        [json.dumps(entry, ensure_ascii=False) for entry in entries]
+    )
+    term_offsets, term_blob = _string_table(terms)
+    gram_offsets, gram_blob = _string_table(grams)
+    sections = [
+        json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+        json.dumps({"avg_lengths": index.avg_lengths}).encode("utf-8"),
+        entry_offsets,
+        entry_blob,
+        term_offsets,
+        term_blob,
+        term_ptr.tobytes(),
+        doc_ids.tobytes(),
+        impacts.tobytes(),
+        max_impacts.tobytes(),
+        gram_offsets,
+        gram_blob,
+        gram_ptr.tobytes(),
+        gram_terms.tobytes(),
+    ]
+
+    # Sections start on 8-byte boundaries so they can be cast to arrays in place
+    layout, offset = [], _HEADER.size
+    for data in sections:
+        offset += -offset % 8
+        layout += [offset, len(data)]
+        offset += len(data)
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        _BYTE_ORDER,
+        digest,
+        index.size,
+        index.unknown_term_impact,
+        *layout,
+    )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".faq-index-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            for data, start in zip(sections, layout[::2]):
+                f.write(b"\0" * (start - f.tell()))
+                f.write(data)
+        # mkstemp creates the file private; every worker user needs to read it
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class _StringTable(Sequence):
+    """The i-th string of an (offsets, blob) pair, decoded on access"""
+
+    def __init__(self, offsets: memoryview, blob: memoryview) -> None:
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return str(self._blob[self._offsets[i] : self._offsets[i + 1]], "utf-8")
+
+
+class _SortedMapping(Mapping):
+    """Read-only mapping over a sorted string table; values are computed from the key's position"""
+
+    def __init__(self, keys: _StringTable, value: Callable[[int], Any]) -> None:
+        self._keys = keys
+        self._value = value
+
+    def _find(self, key: str) -> int:
+        i = bisect_left(self._keys, key)
+        return i if i < len(self._keys) and self._keys[i] == key else -1
+
+    def __getitem__(self, key: str) -> Any:
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._value(i)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class _Entries(Sequence):
+    """FAQ entries, decoded from the mapping on access"""
+
+    def __init__(self, table: _StringTable) -> None:
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return json.loads(self._table[i])
+
+
+class MappedIndex(BM25Index):
+    """A BM25Index read from a memory-mapped index file instead of built from entries"""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        magic, self.format_version = _PREFIX.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a FAQ index")
+        if self.format_version != FORMAT_VERSION:
+            raise ValueError(
+                f"{path} has format {self.format_version}, not {FORMAT_VERSION}"
+            )
+        fields = _HEADER.unpack_from(buffer)
+        (
+            magic,
+            self.format_version,
+            byte_order,
+            self.source_hash,
+            self.size,
+            self.unknown_term_impact,
+        ) = fields[:6]
+        if magic != MAGIC or byte_order != _BYTE_ORDER:
+            raise ValueError(f"{path} is not a FAQ index for this platform")
+
+        layout = fields[6:]
+        section = {
+            name: buffer[layout[2 * i] : layout[2 * i] + layout[2 * i + 1]]
+            for i, name in enumerate(_SECTIONS)
+        }
+        self.meta: Dict[str, Any] = json.loads(str(section["meta"], "utf-8"))
+        self.avg_lengths: Dict[str, float] = json.loads(str(section["stats"], "utf-8"))[
+            "avg_lengths"
+        ]
+        self.entries = _Entries(
+            _StringTable(section["entry_offsets"].cast("q"), section["entries"])
+        )
+
+        terms = _StringTable(section["term_offsets"].cast("q"), section["terms"])
+        self._term_ptr = section["term_ptr"].cast("q")
+        self._doc_ids = section["doc_ids"].cast("i")
+        self._impacts = section["impacts"].cast("d")
+        max_impacts = section["max_impacts"].cast("d")
+        self.postings = _SortedMapping(terms, self._term_postings)
+        self.max_impact = _SortedMapping(terms, max_impacts.__getitem__)
+
+        gram_ptr = section["gram_ptr"].cast("q")
+        gram_terms = section["gram_terms"].cast("i")
+        self.ngram_index = _SortedMapping(
+            _StringTable(section["gram_offsets"].cast("q"), section["grams"]),
+            lambda i: {terms[t] for t in gram_terms[gram_ptr[i] : gram_ptr[i + 1]]},
+        )
+        self._init_partial_matches()
+
+    def doc_count(self, term: str) -> int:
+        i = self.postings._find(term)
+        return self._term_ptr[i + 1] - self._term_ptr[i] if i >= 0 else 0
+
+    def _term_postings(self, i: int) -> List[Tuple[int, float]]:
+        start, end = self._term_ptr[i], self._term_ptr[i + 1]
+        return list(zip(self._doc_ids[start:end], self._impacts[start:end]))
+
+    def posting_arrays(self) -> Tuple[List[str], Any, Any, Any]:
+        return list(self.postings), self._term_ptr, self._doc_ids, self._impacts
+
+
+def open_index(path: str, digest: bytes) -> Optional[MappedIndex]:
+    """Map the index at `path` if it exists and was built by this version from the source with `digest`"""
+    try:
+        index = MappedIndex(path)
+    except (OSError, ValueError, TypeError, struct.error) as e:
+        logger.info(f"No usable FAQ index at {path}: {e}")
+        return None
+    if index.source_hash != digest:
+        logger.info(f"FAQ index at {path} is stale")
+        return None
+    return index
+
+
+def default_index_path(faq_file_path: str) -> str:
+    return os.path.splitext(faq_file_path)[0] + ".idx"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build or inspect a persisted FAQ index"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser(
+        "build", help="Build the index for a knowledge-base JSON file"
+    )
+    build.add_argument("source")
+    build.add_argument(
+        "-o", "--output", help="Index file (default: next to the source, with .idx)"
+    )
+    info = commands.add_parser("info", help="Describe an index file")
+    info.add_argument("index")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        # rag_handler imports this module, so import it only when building
+        from rag_handler import FAQRetriever
+
+        output = args.output or default_index_path(args.source)
+        retriever = FAQRetriever(args.source)
+        meta = {key: value for key, value in retriever.faq_data.items() if key != "faq"}
+        write_index(
+            output,
+            retriever.index,
+            retriever.faq_entries,
+            meta,
+            source_hash(args.source),
+        )
+        print(
+            f"✓ Wrote {output}: {len(retriever.faq_entries)} entries, "
+            f"{len(retriever.index.postings)} terms, {os.path.getsize(output):,} bytes"
+        )
+    else:
+        index = MappedIndex(args.index)
+        print(
+            f"{args.index}: format {index.format_version}, {index.size} entries, "
+            f"{len(index.postings)} terms, source sha256 {index.source_hash.hex()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Knowledge bases for many client companies (tenants) in one worker.
+
+Each tenant has its own FAQ JSON, <tenants dir>/<tenant>.json, with its
+persisted index next to it. The tenant for a call comes from job or room
+metadata, e.g. {"tenant": "acme-foods"}; calls without one use the default
+knowledge base. Tenants are loaded on first use and kept in an LRU that is
+bounded by the total size of their indexes, so one worker can serve hundreds
+of tenants while only holding the ones with recent calls.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from faq_index import LayeredIndex
+from faq_store import MappedIndex, default_index_path
+from rag_handler import FAQRetriever
+
+logger = logging.getLogger("rag_handler")
+
+_TENANT_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+# An index held in memory (one that could not be persisted) is charged at this
+# multiple of its source JSON, roughly what the Python structures take
+IN_MEMORY_OVERHEAD = 10
+
+
+def read_tenant(metadata: str) -> Optional[str]:
+    """
+    Read the tenant a call is for from job or room metadata.
+
+    Expects JSON like {"tenant": "acme-foods"}; returns None when there is no
+    (valid) tenant, so the caller falls back to the default knowledge base.
+    """
+    if not metadata:
+        return None
+    try:
+        data = json.loads(metadata)
+    except ValueError:
+        logger.warning(f"Ignoring non-JSON metadata: {metadata!r}")
+        return None
+    tenant = data.get("tenant") if isinstance(data, dict) else None
+    if tenant is None:
+        return None
+    if not isinstance(tenant, str) or not _TENANT_RE.match(tenant):
+        logger.warning(f"Ignoring invalid tenant in metadata: {tenant!r}")
+        return None
+    return tenant
+
+
+def _charged_bytes(retriever: FAQRetriever) -> int:
+    """What keeping a retriever's current version costs: its mapped index, or an estimate for what is in memory"""
+    index = retriever.index
+    in_memory = os.path.getsize(retriever.faq_file_path) * IN_MEMORY_OVERHEAD
+    changed = 0
+    if isinstance(index, LayeredIndex):
+        # Entries edited since the base index was built are held in memory
+        changed = in_memory * index.delta.size // max(index.size, 1)
+        index = index.base
+    if isinstance(index, MappedIndex):
+        return os.path.getsize(retriever.index_path) + changed
+    return in_memory + changed
+
+
+class KnowledgeBaseRegistry:
+    """Lazily loaded FAQRetrievers per tenant, evicted least recently used past `max_bytes`"""
+
+    def __init__(
+        self,
+        tenants_dir: Path,
+        default_source: Path,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.tenants_dir = Path(tenants_dir)
+        self.default_source = Path(default_source)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._loaded: OrderedDict[Optional[str], Tuple[FAQRetriever, int]] = (
+            OrderedDict()
+        )
+        self._loading: Dict[Optional[str], asyncio.Task] = {}
+
+    def source_path(self, tenant: Optional[str]) -> Path:
+        return (
+            self.default_source
+            if tenant is None
+            else self.tenants_dir / f"{tenant}.json"
+        )
+
+    def _open(self, tenant: Optional[str]) -> Tuple[FAQRetriever, int]:
+        """Load a tenant's retriever (blocking: may rebuild its index) and what it costs to keep"""
+        source = str(self.source_path(tenant))
+        if not os.path.exists(source):
+            raise KeyError(f"No knowledge base for tenant {tenant!r}")
+        retriever = FAQRetriever(source, default_index_path(source))
+        return retriever, _charged_bytes(retriever)
+
+    def _add(self, tenant: Optional[str], retriever: FAQRetriever, size: int) -> None:
+        self._loaded[tenant] = (retriever, size)
+        self.total_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        # Always keep the most recently used tenant, even if it alone is over budget
+        while self.total_bytes > self.max_bytes and len(self._loaded) > 1:
+            evicted, (_, evicted_size) = self._loaded.popitem(last=False)
+            self.total_bytes -= evicted_size
+            logger.info(
+                f"Evicted knowledge base {evicted or 'default'} ({evicted_size:,} bytes)"
+            )
+
+    def get(self, tenant: Optional[str] = None) -> FAQRetriever:
+        """The tenant's retriever, loading it in this thread if needed"""
+        if tenant in self._loaded:
+            self._loaded.move_to_end(tenant)
+            return self._loaded[tenant][0]
+        retriever, size = self._open(tenant)
+        self._add(tenant, retriever, size)
+        return retriever
+
+    async def aget(self, tenant: Optional[str] = None) -> FAQRetriever:
+        """The tenant's retriever, loading it off the event loop; concurrent calls share one load"""
+        if tenant in self._loaded:
+            self._loaded.move_to_end(tenant)
+            return self._loaded[tenant][0]
+        task = self._loading.get(tenant)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(self._open, tenant))
+            self._loading[tenant] = task
+            task.add_done_callback(lambda _: self._loading.pop(tenant, None))
+        retriever, size = await task
+        if tenant not in self._loaded:
+            self._add(tenant, retriever, size)
+        return retriever
+
+    async def arefresh(self) -> int:
+        """Pick up edits to every loaded knowledge base's JSON, off the event loop; returns how many changed"""
+        loaded = [
+            (tenant, retriever) for tenant, (retriever, _) in self._loaded.items()
+        ]
+
+        def refresh_all() -> Dict[Optional[str], Tuple[FAQRetriever, int]]:
+            changed = {}
+            for tenant, retriever in loaded:
+                if retriever.refresh():
+                    changed[tenant] = (retriever, _charged_bytes(retriever))
+            return changed
+
+        changed = await asyncio.to_thread(refresh_all)
+        # A new version can take more (or less) than the one it replaced
+        for tenant, (retriever, size) in changed.items():
+            current = self._loaded.get(tenant)
+            if current is None or current[0] is not retriever:
+                # Evicted while refreshing
+                continue
+            self._loaded[tenant] = (retriever, size)
+            self.total_bytes += size - current[1]
+        self._evict()
+        return len(changed)
+
+    def __contains__(self, tenant: Optional[str]) -> bool:
+        return tenant in self._loaded
+
+    def __len__(self) -> int:
+        return len(self._loaded)
@@ -0,0 +1,75 @@
+"""
+Incremental checkpoints of a conversation's lead.
+
+Every capture marks the lead dirty; the lead is written to the lead store at
+most once every `interval` seconds, with all the captures since the last write
+coalesced into one upsert, and once more when the call shuts down. A caller
+hanging up or the worker dying loses at most the last interval, and no tool
+call ever waits for the database.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional, Set
+
+from lead_store import save_lead
+
+logger = logging.getLogger("agent")
+
+
+class LeadCheckpointer:
+    """Writes one conversation's lead to the lead store, coalescing changes"""
+
+    def __init__(
+        self,
+        lead_id: str,
+        snapshot: Callable[[], Dict[str, Any]],
+        interval: float = 3.0,
+    ) -> None:
+        self.lead_id = lead_id
+        # Returns a copy of the lead as it should be stored; called on the event loop
+        self.snapshot = snapshot
+        self.interval = interval
+        self._dirty = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def mark(self) -> None:
+        """Note that the lead changed; must be called from the event loop"""
+        self._dirty = True
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.interval, self._start_flush
+            )
+
+    def _start_flush(self) -> None:
+        task = asyncio.ensure_future(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self) -> None:
+        """Write the lead now if it changed since the last write"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # One write at a time, so an older snapshot never lands after a newer one
+        async with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            lead = self.snapshot()
+            try:
+                await asyncio.to_thread(save_lead, self.lead_id, lead)
+            except Exception as e:
+                # Try again with the next change or flush
+                self._dirty = True
+                logger.error(f"Error saving lead {self.lead_id}: {e}")
+
+    async def aclose(self) -> None:
+        """Write any pending changes and wait for writes still in flight"""
+        await self.flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
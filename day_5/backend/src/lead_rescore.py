@@ -0,0 +1,221 @@
+"""
+Batch job: rescore every stored lead with the current rules and mark duplicates.
+
+All leads are loaded into one array per column and scored with the rules in
+lead_scoring, applied to whole columns at once. Leads for the same person -
+the same normalized email, or for leads without one the same normalized
+company - are grouped through a hash index; the most recent lead of each group
+is kept and the others get duplicate_of set to it. Only rows whose score or
+duplicate_of changed are written, all in one transaction.
+
+Needs numpy (`uv sync --extra batch`).
+
+    uv run src/lead_rescore.py
+    uv run src/lead_rescore.py --dry-run
+"""
+
+import argparse
+import re
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import lead_store
+from lead_scoring import (
+    DEFAULT_TIER,
+    ENGAGED_QUESTIONS,
+    ENGAGEMENT_POINTS,
+    FIELD_POINTS,
+    MISSING_VALUES,
+    TIERS,
+    TIMELINE_POINTS,
+)
+
+# Text columns are held trimmed and lowercased, with NULL as ''
+_TEXT_COLUMNS = ("name", "email", "company", "use_case", "timeline")
+
+_LOAD_SQL = f"""
+    SELECT id, {", ".join(_TEXT_COLUMNS)},
+        json_array_length(questions_asked), COALESCE(conversation_started, ''), lead_score, duplicate_of
+    FROM leads
+"""
+
+TIER_NAMES = (*(name for _, name in TIERS), DEFAULT_TIER)
+
+_COMPANY_NOISE_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    return value.strip().lower() if value else ""
+
+
+class LeadColumns:
+    """Every stored lead, one array per column, in the same row order"""
+
+    def __init__(self, rows: List[tuple]) -> None:
+        columns = list(zip(*rows)) if rows else [()] * (len(_TEXT_COLUMNS) + 5)
+        self.size = len(rows)
+        self.ids = np.array(columns[0], dtype=np.int64)
+        # Most values repeat (placeholders, timelines, companies), so normalize each distinct one once;
+        # this is several times faster than LOWER(TRIM()) in the query
+        normalize = lru_cache(maxsize=None)(_normalize_text)
+        self.text: Dict[str, np.ndarray] = {
+            column: np.array(list(map(normalize, values)), dtype=str)
+            for column, values in zip(_TEXT_COLUMNS, columns[1:])
+        }
+        rest = columns[len(_TEXT_COLUMNS) + 1 :]
+        self.questions = np.array(rest[0], dtype=np.int64)
+        self.started = np.array(rest[1], dtype=str)
+        self.lead_scores: Tuple[Optional[str], ...] = rest[2]
+        self.duplicate_of: Tuple[Optional[int], ...] = rest[3]
+
+
+def load_leads(conn: sqlite3.Connection) -> LeadColumns:
+    return LeadColumns(conn.execute(_LOAD_SQL).fetchall())
+
+
+def _present(values: np.ndarray) -> np.ndarray:
+    return ~np.isin(values, list(MISSING_VALUES))
+
+
+def score_columns(leads: LeadColumns) -> Tuple[np.ndarray, np.ndarray]:
+    """(points, tier) of every lead: lead_scoring's rules applied to whole columns"""
+    points = np.zeros(leads.size, dtype=np.int64)
+    for field, weight in FIELD_POINTS.items():
+        points += weight * _present(leads.text[field])
+
+    # Only the first timeline word that matches counts, as in lead_points()
+    matched = np.zeros(leads.size, dtype=bool)
+    for word, weight in TIMELINE_POINTS:
+        hit = (np.char.find(leads.text["timeline"], word) >= 0) & ~matched
+        points += weight * hit
+        matched |= hit
+
+    points += ENGAGEMENT_POINTS * (leads.questions >= ENGAGED_QUESTIONS)
+
+    tiers = np.full(leads.size, DEFAULT_TIER, dtype=object)
+    for minimum, name in reversed(TIERS):
+        tiers[points >= minimum] = name
+    return points, tiers
+
+
+def normalize_email(email: str) -> str:
+    """'asha+swiggy@example.com' -> 'asha@example.com' (input is already trimmed and lowercased)"""
+    local, _, domain = email.partition("@")
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def normalize_company(company: str) -> str:
+    """'t.h.t. bytes' and 'tht bytes' -> 'thtbytes' (input is already trimmed and lowercased)"""
+    return _COMPANY_NOISE_RE.sub("", company)
+
+
+def dedupe_key(email: str, company: str) -> Optional[str]:
+    """The key a lead is deduplicated on: its email, or its company if it has no email"""
+    if "@" in email and email not in MISSING_VALUES:
+        return "email:" + normalize_email(email)
+    if company not in MISSING_VALUES:
+        key = normalize_company(company)
+        return "company:" + key if key else None
+    return None
+
+
+def find_duplicates(leads: LeadColumns) -> np.ndarray:
+    """For each lead, the id of the lead it duplicates, or 0 if it is the one kept"""
+    # Hash index from dedupe key to group number; -1 for leads with nothing to dedupe on
+    groups: Dict[str, int] = {}
+    group = np.array(
+        [
+            -1 if key is None else groups.setdefault(key, len(groups))
+            for key in map(
+                dedupe_key, leads.text["email"].tolist(), leads.text["company"].tolist()
+            )
+        ],
+        dtype=np.int64,
+    )
+    if not groups:
+        # No lead has an email or company yet, e.g. leads checkpointed before any details were given
+        return np.zeros(leads.size, dtype=np.int64)
+
+    # Most recent first, so the first lead of each group in this order is the one kept
+    order = np.lexsort((leads.ids, leads.started))[::-1]
+    order = order[group[order] >= 0]
+    _, first = np.unique(group[order], return_index=True)
+    kept = np.empty(len(groups), dtype=np.int64)
+    kept[group[order[first]]] = leads.ids[order[first]]
+
+    duplicate_of = np.where(group >= 0, kept[group], 0)
+    duplicate_of[duplicate_of == leads.ids] = 0
+    return duplicate_of
+
+
+def rescore(conn: sqlite3.Connection, dry_run: bool = False) -> Dict[str, int]:
+    """Rescore and dedupe every lead, writing the changes in one transaction; returns counts"""
+    leads = load_leads(conn)
+    _, tiers = score_columns(leads)
+    duplicate_of = find_duplicates(leads)
+
+    updates = [
+        (tier, int(duplicate) or None, int(lead_id))
+        for lead_id, tier, duplicate, old_tier, old_duplicate in zip(
+            leads.ids.tolist(),
+            tiers.tolist(),
+            duplicate_of.tolist(),
+            leads.lead_scores,
+            leads.duplicate_of,
+        )
+        if tier != old_tier or (duplicate or None) != old_duplicate
+    ]
+    if updates and not dry_run:
+        # Room for the lead_score index pages the update touches
+        conn.execute("PRAGMA cache_size = -262144")
+        with conn:
+            conn.executemany(
+                "UPDATE leads SET lead_score = ?, duplicate_of = ? WHERE id = ?",
+                updates,
+            )
+    return {
+        "leads": leads.size,
+        "changed": len(updates),
+        "duplicates": int(np.count_nonzero(duplicate_of)),
+        **{
+            tier: int(np.count_nonzero((tiers == tier) & (duplicate_of == 0)))
+            for tier in TIER_NAMES
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rescore stored leads and mark duplicates"
+    )
+    parser.add_argument("--db", default=lead_store.DB_PATH)
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would change without writing",
+    )
+    args = parser.parse_args()
+
+    # Adds the duplicate_of column to stores created before it existed
+    lead_store.DB_PATH = args.db
+    lead_store.ensure_schema()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        started = time.perf_counter()
+        counts = rescore(conn, dry_run=args.dry_run)
+        print(
+            f"✓ {'Would update' if args.dry_run else 'Updated'} {counts['changed']:,} of {counts['leads']:,} "
+            f"leads in {time.perf_counter() - started:.1f}s: {counts['duplicates']:,} duplicates; "
+            f"unique leads {', '.join(f'{counts[tier]:,} {tier}' for tier in TIER_NAMES)}"
+        )
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
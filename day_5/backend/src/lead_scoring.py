@@ -0,0 +1,62 @@
+"""
+Lead qualification rules, shared by the agent and the batch rescoring job.
+
+A lead earns points for each detail captured, for how soon they want to start
+and for asking enough questions; its tier (hot, warm or cold) follows from the
+total. Change the rules here and run `uv run src/lead_rescore.py` to apply them
+to every stored lead.
+"""
+
+from typing import Any, Dict, Tuple
+
+# Points for each captured detail
+FIELD_POINTS: Dict[str, int] = {
+    "name": 1,
+    "email": 2,
+    "company": 1,
+    "use_case": 1,
+}
+
+# Points for the first of these found in the timeline
+TIMELINE_POINTS: Tuple[Tuple[str, int], ...] = (
+    ("immediate", 2),
+    ("soon", 1),
+)
+
+# Points for asking at least ENGAGED_QUESTIONS questions
+ENGAGED_QUESTIONS = 3
+ENGAGEMENT_POINTS = 1
+
+# (minimum points, tier), highest first; anything below is cold
+TIERS: Tuple[Tuple[int, str], ...] = (
+    (6, "hot"),
+    (4, "warm"),
+)
+DEFAULT_TIER = "cold"
+
+# Placeholders the LLM fills in for details the caller never gave
+MISSING_VALUES = frozenset({"", "n/a", "na", "none", "null", "unknown", "not provided"})
+
+
+def is_present(value: Any) -> bool:
+    return value is not None and str(value).strip().lower() not in MISSING_VALUES
+
+
+def lead_points(lead: Dict[str, Any]) -> int:
+    points = sum(
+        weight for field, weight in FIELD_POINTS.items() if is_present(lead.get(field))
+    )
+    timeline = str(lead.get("timeline") or "").lower()
+    points += next((weight for word, weight in TIMELINE_POINTS if word in timeline), 0)
+    if len(lead.get("questions_asked") or []) >= ENGAGED_QUESTIONS:
+        points += ENGAGEMENT_POINTS
+    return points
+
+
+def tier(points: int) -> str:
+    return next((name for minimum, name in TIERS if points >= minimum), DEFAULT_TIER)
+
+
+def score_lead(lead: Dict[str, Any]) -> str:
+    """The lead's tier: hot, warm or cold"""
+    return tier(lead_points(lead))
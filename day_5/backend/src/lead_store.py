@@ -0,0 +1,228 @@
+"""
+Durable store for captured leads: one row per conversation in data/leads.db.
+
+SQLite in WAL mode, so reports and batch jobs can read while calls write, and
+every conversation has its own row keyed by lead id, so two conversations that
+end in the same second can't overwrite each other. The functions here block;
+the agent calls them through asyncio.to_thread.
+
+Leads saved as one JSON file each (data/leads/lead_*.json) by earlier versions
+are imported with:
+
+    uv run src/lead_store.py migrate
+    uv run src/lead_store.py list --score hot
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("agent")
+
+DB_PATH = str(Path(__file__).parent.parent / "data" / "leads.db")
+LEADS_DIR = Path(__file__).parent.parent / "data" / "leads"
+
+# What capture_lead_info collects, each stored in its own column
+LEAD_FIELDS = ("name", "company", "email", "role", "use_case", "team_size", "timeline")
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS leads (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        lead_id TEXT NOT NULL UNIQUE,
+        name TEXT,
+        company TEXT,
+        email TEXT,
+        role TEXT,
+        use_case TEXT,
+        team_size TEXT,
+        timeline TEXT,
+        questions_asked TEXT NOT NULL DEFAULT '[]',
+        conversation_started TEXT,
+        conversation_ended TEXT,
+        lead_score TEXT,
+        duplicate_of INTEGER
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_leads_email ON leads (email)",
+    "CREATE INDEX IF NOT EXISTS idx_leads_score ON leads (lead_score, conversation_started)",
+    "CREATE INDEX IF NOT EXISTS idx_leads_timeline ON leads (timeline)",
+    "CREATE INDEX IF NOT EXISTS idx_leads_started ON leads (conversation_started)",
+)
+
+# Columns added since the table was first created; ensure_schema() adds them to older databases.
+# duplicate_of is the id of the lead a duplicate was merged into (see lead_rescore)
+_ADDED_COLUMNS = {"duplicate_of": "INTEGER"}
+
+_COLUMNS = (
+    *LEAD_FIELDS,
+    "questions_asked",
+    "conversation_started",
+    "conversation_ended",
+    "lead_score",
+)
+
+_UPSERT_SQL = f"""
+    INSERT INTO leads (lead_id, {", ".join(_COLUMNS)})
+    VALUES (?, {", ".join("?" for _ in _COLUMNS)})
+    ON CONFLICT (lead_id) DO UPDATE SET {", ".join(f"{column} = excluded.{column}" for column in _COLUMNS)}
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    # Normal sync is durable in WAL mode except for the last commits on power loss
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+def ensure_schema() -> None:
+    """Create the leads table and its indexes, and switch the database to WAL"""
+    Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+    conn = _connect()
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(leads)")}
+        for column, definition in _ADDED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE leads ADD COLUMN {column} {definition}")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _row_values(lead: Dict[str, Any]) -> tuple:
+    return (
+        *(lead.get(field) for field in LEAD_FIELDS),
+        json.dumps(lead.get("questions_asked") or [], ensure_ascii=False),
+        lead.get("conversation_started"),
+        lead.get("conversation_ended"),
+        lead.get("lead_score"),
+    )
+
+
+def _lead_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    lead = dict(row)
+    lead["questions_asked"] = json.loads(lead["questions_asked"])
+    return lead
+
+
+def save_lead(lead_id: str, lead: Dict[str, Any]) -> None:
+    """Insert or replace the lead for one conversation"""
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(_UPSERT_SQL, (lead_id, *_row_values(lead)))
+    finally:
+        conn.close()
+
+
+def get_lead(lead_id: str) -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT * FROM leads WHERE lead_id = ?", (lead_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    return _lead_from_row(row) if row else None
+
+
+def find_leads(
+    email: Optional[str] = None,
+    lead_score: Optional[str] = None,
+    timeline: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = 100,
+    include_duplicates: bool = False,
+) -> List[Dict[str, Any]]:
+    """Leads matching all the given filters, most recent first; `since` is an ISO date or timestamp"""
+    conditions, params = [] if include_duplicates else ["duplicate_of IS NULL"], []
+    for column, value in (
+        ("email", email),
+        ("lead_score", lead_score),
+        ("timeline", timeline),
+    ):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if since is not None:
+        conditions.append("conversation_started >= ?")
+        params.append(since)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            f"SELECT * FROM leads {where} ORDER BY conversation_started DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [_lead_from_row(row) for row in rows]
+
+
+def migrate_json_leads(leads_dir: Path = LEADS_DIR) -> int:
+    """
+    Import lead_*.json files into the store, each under its file name as lead id.
+
+    Files already imported are skipped, so this can be run again safely; the
+    files themselves are left in place. Returns the number of leads imported.
+    """
+    rows = []
+    for path in sorted(Path(leads_dir).glob("lead_*.json")):
+        try:
+            with open(path, encoding="utf-8") as f:
+                rows.append((path.stem, *_row_values(json.load(f))))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable lead file {path}: {e}")
+
+    conn = _connect()
+    try:
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                f"""INSERT OR IGNORE INTO leads (lead_id, {", ".join(_COLUMNS)})
+                    VALUES (?, {", ".join("?" for _ in _COLUMNS)})""",
+                rows,
+            )
+            return conn.total_changes - before
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    global DB_PATH
+    parser = argparse.ArgumentParser(description="Manage the lead store")
+    parser.add_argument("--db", default=DB_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser("migrate", help="Import lead_*.json files")
+    migrate.add_argument("--leads-dir", default=str(LEADS_DIR))
+    listing = commands.add_parser("list", help="Show stored leads, most recent first")
+    listing.add_argument("--email")
+    listing.add_argument("--score", choices=["hot", "warm", "cold"])
+    listing.add_argument("--timeline")
+    listing.add_argument("--since", help="ISO date, e.g. 2025-11-01")
+    listing.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    DB_PATH = args.db
+    ensure_schema()
+    if args.command == "migrate":
+        imported = migrate_json_leads(Path(args.leads_dir))
+        print(f"✓ Imported {imported} leads from {args.leads_dir} into {DB_PATH}")
+    else:
+        for lead in find_leads(
+            args.email, args.score, args.timeline, args.since, args.limit
+        ):
+            print(
+                f"{lead['conversation_started'] or '?':<26} {lead['lead_score'] or '?':<5} "
+                f"{lead['name'] or '-'} ({lead['company'] or '-'}) {lead['email'] or ''}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,163 +1,417 @@
 """
 RAG Handler for FAQ-based question answering
-Uses simple similarity search to find relevant FAQ answers
+Uses a BM25 inverted index (see faq_index.py) to find relevant FAQ answers,
+optionally memory-mapped from a persisted index file (see faq_store.py)
 """
 
 import json
 import logging
-from typing import List, Dict, Any
-from pathlib import Path
+import os
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import Any, Dict, List, Optional, Tuple
+
+from faq_answers import AnswerCache, split_sentences
+from faq_index import BM25Index, LayeredIndex, expand_query, tokenize
+from faq_store import open_index, source_hash, write_index
 
 logger = logging.getLogger("rag_handler")
 
+# Matches scoring below this (on the 0-1 scale) are left out of results
+MIN_RELEVANCE = 0.05
+
+# refresh() rebuilds the whole index, instead of layering a delta over it, once
+# more than this fraction of the base's entries (and at least MIN_COMPACT_ENTRIES) changed
+COMPACT_FRACTION = 0.2
+MIN_COMPACT_ENTRIES = 50
+
+
+class KnowledgeBaseVersion:
+    """One immutable version of a knowledge base: its data, search entries and index"""
+
+    def __init__(
+        self,
+        faq_data: Dict[str, Any],
+        entries: Sequence[Dict[str, str]],
+        index: BM25Index,
+        source_hash: bytes = b"",
+        source_stat: Tuple[int, int] = (0, 0),
+        number: int = 1,
+    ) -> None:
+        self.faq_data = faq_data
+        self.entries = entries
+        self.index = index
+        self.source_hash = source_hash
+        self.source_stat = source_stat
+        self.number = number
+        self.matrix = None
+
+
+class _LayeredEntries(Sequence):
+    """The entries of a LayeredIndex: the base's, then the delta's"""
+
+    def __init__(
+        self, base: Sequence[Dict[str, str]], delta: List[Dict[str, str]]
+    ) -> None:
+        self._base = base
+        self._delta = delta
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._delta)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return (
+            self._base[i] if i < len(self._base) else self._delta[i - len(self._base)]
+        )
+
+
+def _entry_key(entry: Dict[str, str]) -> Tuple[str, str]:
+    return entry["category"], entry["question"]
+
+
+def _source_stat(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
 
 class FAQRetriever:
-    def __init__(self, faq_file_path: str):
-        """Initialize FAQ retriever with company knowledge base"""
-        self.faq_data = self._load_faq_data(faq_file_path)
-        self.faq_entries = self._prepare_faq_entries()
+    def __init__(self, faq_file_path: str, index_path: Optional[str] = None):
+        """
+        Initialize FAQ retriever with company knowledge base
+        With index_path, map the persisted index there, rebuilding it first if the JSON has changed
+        """
+        self.faq_file_path = faq_file_path
+        self.index_path = index_path
+        # The version searches read; replaced whole by refresh(), never modified
+        self._version: Optional[KnowledgeBaseVersion] = None
+        # What refresh() computes deltas against: the last fully built version
+        self._base: Optional[KnowledgeBaseVersion] = None
+        self._base_keys: Optional[Dict[Tuple[str, str], List[int]]] = None
+        # Spoken answers to repeated questions, emptied whenever a new version is published
+        self.answer_cache = AnswerCache(lambda: self.version)
+
+        if index_path and self._open_index():
+            logger.info(f"Mapped {len(self.faq_entries)} FAQ entries from {index_path}")
+            return
+
+        self._publish_base(self._build())
         logger.info(f"Loaded {len(self.faq_entries)} FAQ entries")
+        if index_path:
+            self._save_index()
+
+    @property
+    def faq_data(self) -> Dict[str, Any]:
+        return self._version.faq_data
+
+    @property
+    def faq_entries(self) -> Sequence[Dict[str, str]]:
+        return self._version.entries
+
+    @property
+    def index(self) -> BM25Index:
+        return self._version.index
+
+    @property
+    def version(self) -> int:
+        """Number of the current version; changes whenever refresh() publishes a new one"""
+        return self._version.number
+
+    def _build(self, faq_data: Optional[Dict[str, Any]] = None) -> KnowledgeBaseVersion:
+        """Build a version from the JSON from scratch"""
+        try:
+            stat, digest = (
+                _source_stat(self.faq_file_path),
+                source_hash(self.faq_file_path),
+            )
+        except OSError:
+            stat, digest = (0, 0), b""
+        if faq_data is None:
+            faq_data = self._load_faq_data(self.faq_file_path)
+        entries = self._prepare_faq_entries(faq_data)
+        number = self._version.number + 1 if self._version else 1
+        return KnowledgeBaseVersion(
+            faq_data, entries, BM25Index(entries), digest, stat, number
+        )
+
+    def _publish_base(self, version: KnowledgeBaseVersion) -> None:
+        self._base = version
+        self._base_keys = None
+        self._version = version
+
+    def _open_index(self) -> bool:
+        """Use the persisted index if it was built from the current JSON"""
+        try:
+            stat, digest = (
+                _source_stat(self.faq_file_path),
+                source_hash(self.faq_file_path),
+            )
+        except OSError as e:
+            logger.error(f"Error loading FAQ data: {e}")
+            return False
+        index = open_index(self.index_path, digest)
+        if index is None:
+            return False
+        number = self._version.number if self._version else 1
+        self._publish_base(
+            KnowledgeBaseVersion(index.meta, index.entries, index, digest, stat, number)
+        )
+        return True
+
+    def _save_index(self) -> None:
+        """Persist the freshly built index, then switch to the mapped copy so its pages are shared"""
+        version = self._version
+        if not version.entries:
+            return
+        try:
+            meta = {
+                key: value for key, value in version.faq_data.items() if key != "faq"
+            }
+            write_index(
+                self.index_path,
+                version.index,
+                version.entries,
+                meta,
+                version.source_hash,
+            )
+        except OSError as e:
+            logger.warning(
+                f"Could not write FAQ index to {self.index_path}, using it in memory: {e}"
+            )
+            return
+        logger.info(f"Rebuilt FAQ index at {self.index_path}")
+        self._open_index()
+
+    def refresh(self) -> bool:
+        """
+        Pick up edits to the JSON without restarting (blocking: run it off the event loop)
+
+        Entries added, edited or removed since the base version go into a small
+        delta index layered over the base, and the new version replaces the
+        current one in a single assignment, so a search sees either the old
+        version or the new one, never a mix. Once the delta grows past
+        COMPACT_FRACTION of the base, the whole index is rebuilt instead.
+        Returns True if a new version was published.
+        """
+        current = self._version
+        try:
+            stat = _source_stat(self.faq_file_path)
+            if stat == current.source_stat:
+                return False
+            digest = source_hash(self.faq_file_path)
+        except OSError as e:
+            logger.error(f"Error loading FAQ data: {e}")
+            return False
+        if digest == current.source_hash:
+            current.source_stat = stat
+            return False
+
+        faq_data = self._load_faq_data(self.faq_file_path)
+        if not faq_data:
+            # Unreadable, e.g. caught half-written; keep serving the current version
+            return False
+        entries = self._prepare_faq_entries(faq_data)
+
+        base = self._base
+        if self._base_keys is None:
+            self._base_keys = defaultdict(list)
+            for i, entry in enumerate(base.entries):
+                self._base_keys[_entry_key(entry)].append(i)
+
+        # Entries identical to one in the base stay there; everything else is new or edited
+        unmatched = {key: list(ids) for key, ids in self._base_keys.items()}
+        kept, delta = set(), []
+        for entry in entries:
+            ids = unmatched.get(_entry_key(entry))
+            if ids and base.entries[ids[0]] == entry:
+                kept.add(ids.pop(0))
+            else:
+                delta.append(entry)
+        deleted = frozenset(range(len(base.entries))) - kept
+
+        if len(delta) + len(deleted) > max(
+            MIN_COMPACT_ENTRIES, COMPACT_FRACTION * len(base.entries)
+        ):
+            self._publish_base(self._build(faq_data))
+            logger.info(
+                f"Rebuilt FAQ index: {len(entries)} entries (version {self._version.number})"
+            )
+            if self.index_path:
+                self._save_index()
+            return True
+
+        index = LayeredIndex(
+            base.index, BM25Index(delta, stats=base.index.corpus_stats()), deleted
+        )
+        self._version = KnowledgeBaseVersion(
+            faq_data,
+            _LayeredEntries(base.entries, delta),
+            index,
+            digest,
+            stat,
+            current.number + 1,
+        )
+        logger.info(
+            f"Updated FAQ index: {len(delta)} new or edited, {len(deleted)} removed "
+            f"(version {self._version.number})"
+        )
+        return True
 
     def _load_faq_data(self, file_path: str) -> Dict[str, Any]:
         """Load FAQ data from JSON file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open(file_path, encoding="utf-8") as f:
                 return json.load(f)
         except Exception as e:
             logger.error(f"Error loading FAQ data: {e}")
             return {}
 
-    def _prepare_faq_entries(self) -> List[Dict[str, str]]:
+    @staticmethod
+    def _prepare_faq_entries(faq_data: Dict[str, Any]) -> List[Dict[str, str]]:
         """Prepare FAQ entries for search"""
         entries = []
 
         # Add main FAQs
-        for faq in self.faq_data.get('faq', []):
-            entries.append({
-                'question': faq['question'],
-                'answer': faq['answer'],
-                'category': 'faq'
-            })
+        for faq in faq_data.get("faq", []):
+            entries.append(
+                {
+                    "question": faq["question"],
+                    "answer": faq["answer"],
+                    "category": "faq",
+                }
+            )
 
         # Add product information as searchable content
-        for product in self.faq_data.get('products', []):
-            entries.append({
-                'question': f"What is {product['name']}? Tell me about {product['name']}",
-                'answer': f"{product['name']}: {product['description']}. Key features: {', '.join(product['key_features'][:3])}. Best for: {product['target_audience']}",
-                'category': 'product'
-            })
+        for product in faq_data.get("products", []):
+            entries.append(
+                {
+                    "question": f"What is {product['name']}? Tell me about {product['name']}",
+                    "answer": f"{product['name']}: {product['description']}. Key features: {', '.join(product['key_features'][:3])}. Best for: {product['target_audience']}",
+                    "category": "product",
+                }
+            )
 
         # Add pricing information
-        for pricing in self.faq_data.get('pricing', []):
-            entries.append({
-                'question': f"What is the pricing for {pricing['product']}? How much does {pricing['product']} cost?",
-                'answer': f"{pricing['product']} - {pricing['model']}: {pricing['details']}",
-                'category': 'pricing'
-            })
+        for pricing in faq_data.get("pricing", []):
+            entries.append(
+                {
+                    "question": f"What is the pricing for {pricing['product']}? How much does {pricing['product']} cost?",
+                    "answer": f"{pricing['product']} - {pricing['model']}: {pricing['details']}",
+                    "category": "pricing",
+                }
+            )
+
+        # Split answers into sentences once, for composing spoken replies (see faq_answers)
+        for entry in entries:
+            entry["sentences"] = split_sentences(entry["answer"])
 
         return entries
 
-    def _simple_similarity(self, query: str, text: str) -> float:
-        """
-        Enhanced keyword-based similarity score with better matching
-        """
-        query_lower = query.lower()
-        text_lower = text.lower()
-
-        # Remove common stop words
-        stop_words = {'the', 'a', 'an', 'is', 'are', 'what', 'how', 'do', 'does', 'can', 'will', 'about', 'for', 'with', 'to', 'of', 'in', 'on'}
-
-        query_words = [w for w in query_lower.split() if w not in stop_words and len(w) > 2]
-        text_words = [w for w in text_lower.split() if len(w) > 2]
-
-        if not query_words:
-            return 0.0
-
-        # Calculate word overlap
-        query_set = set(query_words)
-        text_set = set(text_words)
-        overlap = query_set.intersection(text_set)
-
-        # Base similarity
-        similarity = len(overlap) / len(query_set) if query_set else 0.0
-
-        # Bonus for key terms
-        key_terms = {
-            'pricing': (['price', 'pricing', 'cost', 'commission', 'fee', 'charge'], 0.3),
-            'onboarding': (['onboard', 'start', 'signup', 'register', 'join', 'get started'], 0.3),
-            'delivery': (['delivery', 'deliver', 'fleet', 'rider', 'executive'], 0.2),
-            'payment': (['payment', 'settle', 'money', 'pay', 'fund'], 0.2),
-            'support': (['support', 'help', 'assist', 'service'], 0.2),
-            'partner': (['partner', 'partnership', 'collaborate'], 0.2),
-        }
-
-        for key, (terms, bonus) in key_terms.items():
-            if any(term in query_lower for term in terms):
-                if any(term in text_lower for term in terms):
-                    similarity += bonus
-
-        # Bonus for partial word matches (like "price" matching "pricing")
-        for q_word in query_words:
-            if len(q_word) > 3:
-                if any(q_word in t_word or t_word in q_word for t_word in text_words):
-                    similarity += 0.1
-
-        return min(similarity, 1.5)
-
     def search(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """
         Search for relevant FAQ entries
-        Returns top_k most relevant entries
+        Returns top_k most relevant entries, with a relevance_score between 0 and 1
+        (relative to the best score the query's terms could reach), the raw
+        bm25_score, and matched_terms: how many of the query's words the entry has
         """
-        if not query or not self.faq_entries:
+        version = self._version
+        if not query or not version.entries:
             return []
 
-        # Calculate similarity scores
-        scored_entries = []
-        for entry in self.faq_entries:
-            # Search in both question and answer with higher weight on question
-            question_score = self._simple_similarity(query, entry['question']) * 1.5
-            answer_score = self._simple_similarity(query, entry['answer']) * 0.8
+        weights = self._query_weights(version, query)
+        matches = version.index.top(weights, top_k, min_score=MIN_RELEVANCE)
+        return self._results(version, query, weights, matches)
 
-            total_score = question_score + answer_score
-
-            # Much lower threshold - if any match at all, include it
-            if total_score > 0.05:
-                scored_entries.append({
-                    **entry,
-                    'relevance_score': total_score
-                })
-
-        # Sort by relevance and return top_k
-        scored_entries.sort(key=lambda x: x['relevance_score'], reverse=True)
-
-        # If we have results, return them; otherwise return top 2 FAQs as fallback
-        if scored_entries:
-            return scored_entries[:top_k]
-        else:
-            # Return most general FAQs as fallback
-            return self.faq_entries[:2]
+    def search_batch(
+        self, queries: List[str], top_k: int = 3
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for many queries at once, e.g. for offline evaluation
+        Returns one list per query, the same as search() would; needs numpy
+        """
+        version = self._version
+        if not version.entries:
+            return [[] for _ in queries]
+        if version.matrix is None:
+            try:
+                from faq_matrix import ImpactMatrix
+            except ImportError as e:
+                raise ImportError(
+                    "search_batch needs numpy: install it with `uv sync --extra batch`"
+                ) from e
+            version.matrix = ImpactMatrix(version.index)
+
+        weights = [
+            self._query_weights(version, query) if query else {} for query in queries
+        ]
+        results = version.matrix.top(weights, top_k, min_score=MIN_RELEVANCE)
+        return [
+            self._results(version, query, query_weights, matches) if query else []
+            for query, query_weights, matches in zip(queries, weights, results)
+        ]
+
+    @staticmethod
+    def _query_weights(version: KnowledgeBaseVersion, query: str) -> Dict[str, float]:
+        return version.index.expand_partial(expand_query(query))
+
+    @staticmethod
+    def _results(
+        version: KnowledgeBaseVersion,
+        query: str,
+        weights: Dict[str, float],
+        matches: List[Tuple[int, float]],
+    ) -> List[Dict[str, Any]]:
+        if matches:
+            bound = version.index.best_possible(weights)
+            terms = set(tokenize(query))
+            results = []
+            for i, score in matches:
+                entry = version.entries[i]
+                matched = len(
+                    terms.intersection(
+                        tokenize(f"{entry['question']} {entry['answer']}")
+                    )
+                )
+                results.append(
+                    {
+                        **entry,
+                        "relevance_score": score,
+                        "bm25_score": score * bound,
+                        "matched_terms": matched,
+                    }
+                )
+            return results
+
+        # No match at all: return the most general FAQs as fallback
+        deleted = getattr(version.index, "deleted", frozenset())
+        general = (
+            version.entries[i] for i in range(len(version.entries)) if i not in deleted
+        )
+        return [
+            {**entry, "relevance_score": 0.0, "bm25_score": 0.0, "matched_terms": 0}
+            for entry, _ in zip(general, range(2))
+        ]
 
     def get_company_info(self) -> str:
         """Get formatted company information"""
-        info = self.faq_data.get('company_info', {})
-        company_name = self.faq_data.get('company_name', '')
-        tagline = self.faq_data.get('tagline', '')
-        description = self.faq_data.get('description', '')
+        company_name = self.faq_data.get("company_name", "")
+        tagline = self.faq_data.get("tagline", "")
+        description = self.faq_data.get("description", "")
 
         return f"{company_name} - {tagline}. {description}"
 
     def get_all_products(self) -> List[Dict[str, Any]]:
         """Get all products"""
-        return self.faq_data.get('products', [])
+        return self.faq_data.get("products", [])
 
-    def get_pricing_info(self, product_name: str = None) -> str:
+    def get_pricing_info(self, product_name: Optional[str] = None) -> str:
         """Get pricing information for a specific product or all"""
-        pricing_list = self.faq_data.get('pricing', [])
+        pricing_list = self.faq_data.get("pricing", [])
 
         if product_name:
             for pricing in pricing_list:
-                if product_name.lower() in pricing['product'].lower():
+                if product_name.lower() in pricing["product"].lower():
                     return f"{pricing['product']}: {pricing['details']}"
             return "Pricing information not found for that specific product."
 
@@ -166,4 +420,8 @@ class FAQRetriever:
         for pricing in pricing_list[:3]:  # Limit to top 3
             pricing_summary.append(f"{pricing['product']}: {pricing['model']}")
 
-        return "Our pricing: " + "; ".join(pricing_summary) + ". Custom pricing available for high-volume partners."
+        return (
+            "Our pricing: "
+            + "; ".join(pricing_summary)
+            + ". Custom pricing available for high-volume partners."
+        )
@@ -0,0 +1,11 @@
+import pytest
+
+import lead_store
+
+
+@pytest.fixture
+def leads_db(tmp_path, monkeypatch):
+    """An empty lead store that lead_store is pointed at for the test."""
+    monkeypatch.setattr(lead_store, "DB_PATH", str(tmp_path / "leads.db"))
+    lead_store.ensure_schema()
+    return tmp_path / "leads.db"
@@ -0,0 +1,159 @@
+import json
+from pathlib import Path
+
+from faq_answers import (
+    AnswerCache,
+    compose_answer,
+    context_matches,
+    is_direct_answer,
+    speakable,
+    split_sentences,
+)
+from rag_handler import FAQRetriever
+
+FAQ_FILE = Path(__file__).parent.parent / "data" / "company_faq.json"
+
+
+def test_sentences_split_at_boundaries_but_not_abbreviations() -> None:
+    text = "Charges start at Rs. 29 for 2 km. Business accounts get discounts! Is that 2.5 km? Yes."
+
+    assert split_sentences(text) == [
+        "Charges start at Rs. 29 for 2 km.",
+        "Business accounts get discounts!",
+        "Is that 2.5 km?",
+        "Yes.",
+    ]
+
+
+def test_answer_is_whole_sentences_within_the_budget() -> None:
+    results = [
+        {
+            "answer": "First point here. Second point is longer than the first. Third.",
+            "relevance_score": 0.9,
+        },
+        {"answer": "Other answer. More of it.", "relevance_score": 0.5},
+        {"answer": "Barely related.", "relevance_score": 0.1},
+    ]
+
+    assert (
+        compose_answer(results, max_chars=60)
+        == "First point here. Second point is longer than the first."
+    )
+    assert compose_answer(results, max_chars=85) == (
+        "First point here. Second point is longer than the first. Third. Other answer."
+    )
+    assert compose_answer(results, max_chars=5) == "First point here."
+    assert "Barely" not in compose_answer(results, max_chars=1000)
+
+
+def test_only_faq_questions_get_faq_context() -> None:
+    retriever = FAQRetriever(str(FAQ_FILE))
+
+    for filler in [
+        "yes",
+        "that's all",
+        "I'm the owner",
+        "okay sounds good",
+        "we are a team of ten",
+    ]:
+        assert context_matches(retriever.search(filler, top_k=2)) == [], filler
+    for question in [
+        "How much does it cost?",
+        "do I need an fssai license",
+        "what is genie",
+    ]:
+        assert context_matches(retriever.search(question, top_k=2)), question
+
+
+def test_filler_turns_are_never_answered_directly_or_cached() -> None:
+    retriever = FAQRetriever(str(FAQ_FILE))
+    cache = retriever.answer_cache
+    fillers = [
+        "yes",
+        "that's all",
+        "I'm the owner",
+        "can you help me",
+        "I'm ready to get started",
+        "we run a restaurant in pune",
+    ]
+    for filler in fillers:
+        results = retriever.search(filler, top_k=2)
+        assert not is_direct_answer(filler, results), filler
+    # Fillers made only of stop words have no cache key at all
+    cache.put("that's all", "Some FAQ answer.")
+    assert cache.get("that's all") is None
+
+    for question in [
+        "How much does it cost?",
+        "do I need an fssai license",
+        "how are payments settled",
+    ]:
+        assert is_direct_answer(question, retriever.search(question, top_k=2)), question
+
+
+def test_entries_carry_their_sentences(tmp_path) -> None:
+    source = tmp_path / "faq.json"
+    source.write_text(FAQ_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+    FAQRetriever(str(source), str(tmp_path / "faq.idx"))
+    mapped = FAQRetriever(str(source), str(tmp_path / "faq.idx"))
+
+    entry = mapped.search("genie pricing", top_k=1)[0]
+    assert " ".join(entry["sentences"]) == entry["answer"]
+
+
+def test_answer_cache_matches_rewordings_and_expires(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("faq_answers.time.monotonic", lambda: now[0])
+    cache = AnswerCache(lambda: 1, ttl=60, max_entries=2)
+
+    cache.put("How much does Genie cost?", "Genie starts at twenty nine rupees.")
+    assert (
+        cache.get("genie, how much does it cost")
+        == "Genie starts at twenty nine rupees."
+    )
+    assert cache.get("How do I get paid?") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    now[0] += 61
+    assert cache.get("How much does Genie cost?") is None
+
+    for question in ["onboarding time", "payment cycle", "genie pricing"]:
+        cache.put(question, question)
+    assert cache.get("onboarding time") is None
+    assert cache.get("genie pricing") == "genie pricing"
+
+
+def test_answer_cache_is_emptied_when_the_knowledge_base_changes(tmp_path) -> None:
+    source = tmp_path / "faq.json"
+    source.write_text(FAQ_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+    retriever = FAQRetriever(str(source))
+    retriever.answer_cache.put("genie pricing", "Old price.")
+    assert retriever.answer_cache.get("genie pricing") == "Old price."
+
+    data = json.loads(source.read_text(encoding="utf-8"))
+    data["faq"][0]["answer"] = "Something new."
+    source.write_text(json.dumps(data), encoding="utf-8")
+    assert retriever.refresh() is True
+
+    assert retriever.answer_cache.get("genie pricing") is None
+
+
+def test_cached_answers_are_spoken_with_numbers_in_words() -> None:
+    assert speakable("Charges start at Rs. 29 for short distances up to 2 km.") == (
+        "Charges start at twenty-nine rupees for short distances up to two km."
+    )
+    assert speakable("Campaigns from ₹5,000; commission is 15% to 25%.") == (
+        "Campaigns from five thousand rupees; commission is fifteen percent to "
+        "twenty-five percent."
+    )
+    assert speakable("Typically 10-20% on sales, live in 5-7 days.") == (
+        "Typically ten to twenty percent on sales, live in five to seven days."
+    )
+    assert speakable("500+ cities, 200,000 restaurants, 2.5 km") == (
+        "more than five hundred cities, two hundred thousand restaurants, "
+        "two point five km"
+    )
+
+    retriever = FAQRetriever(str(FAQ_FILE))
+    for entry in retriever.faq_data["faq"]:
+        assert not any(ch.isdigit() or ch in "%₹" for ch in speakable(entry["answer"]))
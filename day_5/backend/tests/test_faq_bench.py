@@ -0,0 +1,32 @@
+from faq_bench import bench_quality, quality, synthetic_faq
+
+
+def test_quality_counts_only_scored_results() -> None:
+    results = [
+        [
+            {"question": "a", "relevance_score": 0.9},
+            {"question": "b", "relevance_score": 0.5},
+        ],
+        [{"question": "c"}, {"question": "d"}],
+    ]
+
+    recall, mrr = quality(results, [["b"], ["c"]], k=1)
+
+    assert recall == 0.0
+    assert mrr == 0.25
+
+
+def test_bm25_is_no_worse_than_the_legacy_scorer_on_the_labeled_queries() -> None:
+    rows = {row["engine"]: row for row in bench_quality(["legacy", "bm25"], k=3)}
+
+    assert rows["bm25"]["recall@3"] >= rows["legacy"]["recall@3"]
+    assert rows["bm25"]["mrr"] >= rows["legacy"]["mrr"]
+
+
+def test_synthetic_queries_come_from_their_entry() -> None:
+    faq_data, queries, relevant = synthetic_faq(200, 20, seed=1)
+
+    assert len(faq_data["faq"]) == 200
+    assert len(queries) == len(relevant) == 20
+    for query, (question,) in zip(queries, relevant):
+        assert all(word in question.lower() for word in query.split())
@@ -0,0 +1,82 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from faq_prefetch import FAQPrefetcher, normalize_query
+from rag_handler import FAQRetriever
+
+FAQ_FILE = Path(__file__).parent.parent / "data" / "company_faq.json"
+
+
+class CountingRetriever(FAQRetriever):
+    searches = 0
+
+    def search(self, query, top_k=3):
+        self.searches += 1
+        return super().search(query, top_k)
+
+
+@pytest.fixture
+def retriever() -> CountingRetriever:
+    return CountingRetriever(str(FAQ_FILE))
+
+
+def test_queries_with_the_same_terms_share_a_key() -> None:
+    assert normalize_query("How much does it cost?") == normalize_query(
+        "cost, how much"
+    )
+    assert normalize_query("the prices") == normalize_query("price")
+    assert normalize_query("ok") == ""
+
+
+async def test_prefetched_transcripts_are_cache_hits(retriever) -> None:
+    prefetcher = FAQPrefetcher(retriever)
+    for transcript in ["how much", "how much does it cost", "How much does it cost?"]:
+        prefetcher.prefetch(transcript)
+
+    results = await prefetcher.search("how much does it COST")
+
+    # "how much" and "how much does it cost"; the final transcript repeats the second
+    assert retriever.searches == 2
+    assert results == retriever.search("How much does it cost?", top_k=2)
+    assert (prefetcher.hits, prefetcher.misses) == (1, 0)
+
+
+async def test_a_new_knowledge_base_version_is_searched_again(tmp_path) -> None:
+    source = tmp_path / "faq.json"
+    source.write_text(FAQ_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+    retriever = CountingRetriever(str(source))
+    prefetcher = FAQPrefetcher(retriever)
+    await prefetcher.search("zanzibar")
+
+    data = json.loads(source.read_text(encoding="utf-8"))
+    data["faq"].append(
+        {"question": "Do you deliver to zanzibar?", "answer": "Not yet."}
+    )
+    source.write_text(json.dumps(data), encoding="utf-8")
+    assert retriever.refresh()
+
+    results = await prefetcher.search("zanzibar")
+    assert results[0]["answer"] == "Not yet."
+    assert prefetcher.misses == 2
+
+
+async def test_only_the_last_interim_transcript_is_searched(retriever) -> None:
+    prefetcher = FAQPrefetcher(retriever, debounce=0.01)
+    for transcript in ["how", "how much", "how much does it", "how much does it cost"]:
+        prefetcher.prefetch(transcript, final=False)
+    await asyncio.sleep(0.05)
+    assert retriever.searches == 1
+
+    await prefetcher.search("How much does it cost?")
+    assert (retriever.searches, prefetcher.hits) == (1, 1)
+
+
+async def test_a_search_does_not_wait_out_the_debounce(retriever) -> None:
+    prefetcher = FAQPrefetcher(retriever, debounce=60)
+    prefetcher.prefetch("when do I get paid", final=False)
+
+    results = await asyncio.wait_for(prefetcher.search("when do I get paid"), timeout=5)
+    assert results and retriever.searches == 1
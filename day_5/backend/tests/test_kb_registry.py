@@ -0,0 +1,108 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from kb_registry import KnowledgeBaseRegistry, read_tenant
+
+FAQ_FILE = Path(__file__).parent.parent / "data" / "company_faq.json"
+
+
+def _tenant(tenants_dir: Path, name: str, company: str) -> None:
+    data = json.loads(FAQ_FILE.read_text(encoding="utf-8"))
+    data["company_name"] = company
+    data["faq"].append(
+        {
+            "question": f"What does {company} sell?",
+            "answer": f"{company} sells {name} things.",
+        }
+    )
+    (tenants_dir / f"{name}.json").write_text(json.dumps(data), encoding="utf-8")
+
+
+@pytest.fixture
+def registry(tmp_path) -> KnowledgeBaseRegistry:
+    default = tmp_path / "company_faq.json"
+    default.write_text(FAQ_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+    tenants = tmp_path / "tenants"
+    tenants.mkdir()
+    for name in ("acme", "globex", "initech"):
+        _tenant(tenants, name, name.title())
+    return KnowledgeBaseRegistry(tenants, default)
+
+
+def test_tenant_is_read_from_metadata() -> None:
+    assert read_tenant('{"tenant": "acme"}') == "acme"
+    assert read_tenant("") is None
+    assert read_tenant("not json") is None
+    assert read_tenant('{"tenant": "../../etc/passwd"}') is None
+
+
+async def test_tenants_load_lazily_and_share_one_load(registry) -> None:
+    assert len(registry) == 0
+
+    first, second = await registry.aget("acme"), await registry.aget("acme")
+
+    assert first is second
+    assert first.faq_data["company_name"] == "Acme"
+    assert (
+        first.search("What does Acme sell?", top_k=1)[0]["answer"]
+        == "Acme sells acme things."
+    )
+    assert "globex" not in registry
+    with pytest.raises(KeyError):
+        await registry.aget("unknown")
+
+
+def test_registry_evicts_least_recently_used_past_its_budget(registry) -> None:
+    registry.get("acme")
+    per_tenant = registry.total_bytes
+    registry.max_bytes = 2 * per_tenant + per_tenant // 2
+
+    registry.get("globex")
+    registry.get("acme")
+    registry.get("initech")
+
+    assert "globex" not in registry
+    assert "acme" in registry and "initech" in registry
+    assert registry.total_bytes <= registry.max_bytes
+
+
+async def test_refreshed_tenants_are_recharged_and_evicted_past_the_budget(
+    registry,
+) -> None:
+    registry.get("acme")
+    per_tenant = registry.total_bytes
+    registry.max_bytes = 2 * per_tenant + per_tenant // 2
+    globex = registry.get("globex")
+
+    source = registry.source_path("globex")
+    data = json.loads(source.read_text(encoding="utf-8"))
+    data["faq"] += [
+        {"question": f"Question {i} about Globex?", "answer": f"Answer {i}."}
+        for i in range(200)
+    ]
+    source.write_text(json.dumps(data), encoding="utf-8")
+
+    assert await registry.arefresh() == 1
+    assert globex.search("Question 150 about Globex?", top_k=1)[0]["answer"] == (
+        "Answer 150."
+    )
+    # The bigger globex no longer fits next to acme, the least recently used
+    assert "acme" not in registry and "globex" in registry
+    assert registry.total_bytes > per_tenant
+    assert registry.total_bytes <= registry.max_bytes
+
+
+def test_tenant_without_a_tagline_is_introduced_by_name(registry) -> None:
+    from agent import SwiggySDRAssistant
+
+    source = registry.source_path("acme")
+    data = json.loads(source.read_text(encoding="utf-8"))
+    del data["tagline"]
+    source.write_text(json.dumps(data), encoding="utf-8")
+
+    assistant = SwiggySDRAssistant(registry.get("acme"))
+    assert "Sales Development Representative for Acme.\n" in assistant.instructions
+    tagged = SwiggySDRAssistant(registry.get("globex"))
+    assert "for Globex, India's leading" in tagged.instructions
@@ -0,0 +1,37 @@
+import asyncio
+
+import lead_store
+from lead_checkpoint import LeadCheckpointer
+from lead_store import get_lead
+
+
+async def test_captures_are_coalesced_into_one_write(leads_db, monkeypatch) -> None:
+    writes = []
+
+    def save_lead(lead_id, lead):
+        writes.append(lead_id)
+        lead_store.save_lead(lead_id, lead)
+
+    monkeypatch.setattr("lead_checkpoint.save_lead", save_lead)
+    lead = {"name": None, "questions_asked": []}
+    checkpoint = LeadCheckpointer("call-1", lambda: dict(lead), interval=0.05)
+
+    lead["name"] = "Asha"
+    checkpoint.mark()
+    lead["questions_asked"].append("pricing")
+    checkpoint.mark()
+    assert get_lead("call-1") is None
+
+    await asyncio.sleep(0.15)
+    assert len(writes) == 1
+    assert get_lead("call-1")["name"] == "Asha"
+
+
+async def test_close_writes_pending_changes(leads_db) -> None:
+    lead = {"name": "Ben", "questions_asked": []}
+    checkpoint = LeadCheckpointer("call-2", lambda: dict(lead), interval=60)
+    checkpoint.mark()
+
+    await checkpoint.aclose()
+
+    assert get_lead("call-2")["name"] == "Ben"
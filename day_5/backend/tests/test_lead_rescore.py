@@ -0,0 +1,96 @@
+import sqlite3
+
+import pytest
+
+from lead_scoring import score_lead
+from lead_store import find_leads, get_lead, save_lead
+
+np = pytest.importorskip("numpy")
+from lead_rescore import load_leads, rescore, score_columns  # noqa: E402
+
+LEADS = {
+    "a": {
+        "name": "Asha",
+        "email": "asha@example.com",
+        "company": "Acme Foods",
+        "use_case": "restaurant",
+        "timeline": "Immediately",
+        "questions_asked": ["a", "b", "c"],
+        "conversation_started": "2025-11-01",
+    },
+    "b": {
+        "name": "Asha",
+        "email": " ASHA+swiggy@example.com",
+        "timeline": "soon",
+        "questions_asked": [],
+        "conversation_started": "2025-11-03",
+    },
+    "c": {
+        "name": "N/A",
+        "email": "N/A",
+        "company": "ACME foods.",
+        "timeline": None,
+        "questions_asked": ["a"],
+        "conversation_started": "2025-11-02",
+    },
+    "d": {
+        "name": "Ben",
+        "company": "Acme-Foods",
+        "use_case": "cafe",
+        "timeline": "later",
+        "questions_asked": ["a", "b", "c", "d"],
+        "conversation_started": "2025-11-04",
+    },
+    "e": {"name": None, "questions_asked": [], "conversation_started": "2025-11-05"},
+}
+
+
+@pytest.fixture
+def conn(leads_db):
+    for lead_id, lead in LEADS.items():
+        save_lead(lead_id, {**lead, "lead_score": "cold"})
+    conn = sqlite3.connect(leads_db)
+    yield conn
+    conn.close()
+
+
+def test_vectorized_rules_match_score_lead(conn) -> None:
+    leads = load_leads(conn)
+    _, tiers = score_columns(leads)
+
+    expected = [score_lead(LEADS[lead_id]) for lead_id in LEADS]
+    assert tiers.tolist() == expected
+
+
+def test_rescore_marks_older_leads_with_the_same_email_or_company(conn) -> None:
+    counts = rescore(conn)
+
+    assert get_lead("a")["duplicate_of"] == get_lead("b")["id"]
+    assert get_lead("c")["duplicate_of"] == get_lead("d")["id"]
+    assert get_lead("b")["duplicate_of"] is None
+    assert get_lead("e")["duplicate_of"] is None
+    assert get_lead("a")["lead_score"] == "hot"
+    assert counts["duplicates"] == 2
+    assert {lead["lead_id"] for lead in find_leads()} == {"b", "d", "e"}
+
+    assert rescore(conn)["changed"] == 0
+
+
+def test_rescore_without_any_email_or_company(leads_db) -> None:
+    for lead_id in ("x", "y"):
+        save_lead(
+            lead_id,
+            {
+                "name": None,
+                "questions_asked": ["what is genie"],
+                "conversation_started": "2025-11-06",
+            },
+        )
+    conn = sqlite3.connect(leads_db)
+    try:
+        counts = rescore(conn)
+    finally:
+        conn.close()
+
+    assert (counts["leads"], counts["duplicates"]) == (2, 0)
+    assert get_lead("x")["duplicate_of"] is None
@@ -0,0 +1,60 @@
+import json
+
+import lead_store
+from lead_store import find_leads, get_lead, migrate_json_leads, save_lead
+
+
+def _lead(**fields):
+    lead = dict.fromkeys(lead_store.LEAD_FIELDS)
+    lead.update(
+        questions_asked=[],
+        conversation_started="2025-11-26T21:07:47",
+        lead_score="cold",
+    )
+    lead.update(fields)
+    return lead
+
+
+def test_each_conversation_keeps_its_own_lead(leads_db) -> None:
+    save_lead("a", _lead(name="Asha", email="asha@example.com"))
+    save_lead("b", _lead(name="Ben", email="ben@example.com"))
+    save_lead(
+        "a",
+        _lead(
+            name="Asha",
+            email="asha@example.com",
+            lead_score="hot",
+            questions_asked=["pricing"],
+        ),
+    )
+
+    assert get_lead("a")["lead_score"] == "hot"
+    assert get_lead("a")["questions_asked"] == ["pricing"]
+    assert get_lead("b")["name"] == "Ben"
+    assert [lead["lead_id"] for lead in find_leads(email="ben@example.com")] == ["b"]
+    assert [lead["lead_id"] for lead in find_leads(lead_score="hot")] == ["a"]
+
+
+def test_json_leads_are_migrated_once(leads_db, tmp_path) -> None:
+    leads_dir = tmp_path / "leads"
+    leads_dir.mkdir()
+    (leads_dir / "lead_20251126_211008.json").write_text(
+        json.dumps(
+            _lead(
+                company="t h t bytes",
+                lead_score="warm",
+                questions_asked=["onboarding process"],
+            )
+        )
+    )
+    (leads_dir / "lead_broken.json").write_text("{")
+
+    assert migrate_json_leads(leads_dir) == 1
+    assert migrate_json_leads(leads_dir) == 0
+    lead = get_lead("lead_20251126_211008")
+    assert lead["company"] == "t h t bytes"
+    assert lead["questions_asked"] == ["onboarding process"]
+    assert (
+        find_leads(since="2025-11-01", lead_score="warm")[0]["lead_id"]
+        == "lead_20251126_211008"
+    )
@@ -0,0 +1,187 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from faq_index import BM25Index, expand_query
+from rag_handler import FAQRetriever
+
+FAQ_FILE = Path(__file__).parent.parent / "data" / "company_faq.json"
+
+
+@pytest.fixture(scope="module")
+def retriever() -> FAQRetriever:
+    return FAQRetriever(str(FAQ_FILE))
+
+
+def test_search_ranks_the_matching_faq_first(retriever) -> None:
+    results = retriever.search("How much does it cost to partner?", top_k=2)
+
+    assert results[0]["question"] == "How much does it cost to partner with Swiggy?"
+    assert all(0 < r["relevance_score"] <= 1 for r in results)
+    assert results[0]["relevance_score"] >= results[1]["relevance_score"]
+
+
+def test_key_term_groups_expand_the_query(retriever) -> None:
+    """'commission' and 'cost' share the pricing group, so either finds pricing entries."""
+    assert "#pricing" in expand_query("what is the commission")
+    results = retriever.search("what is the commission", top_k=3)
+    assert all(r["category"] in ("pricing", "faq") for r in results)
+    assert any(r["category"] == "pricing" for r in results)
+
+
+def test_unknown_query_falls_back_to_general_faqs(retriever) -> None:
+    results = retriever.search("xyzzy", top_k=3)
+
+    assert [r["relevance_score"] for r in results] == [0.0, 0.0]
+    assert results[0]["question"] == retriever.faq_entries[0]["question"]
+
+
+def test_query_only_touches_matching_entries() -> None:
+    entries = [
+        {"question": f"Question {i}", "answer": f"filler answer {i}"}
+        for i in range(1000)
+    ]
+    entries.append({"question": "Rare term here", "answer": "zanzibar"})
+    index = BM25Index(entries)
+
+    scores = index.score(expand_query("zanzibar"))
+    assert list(scores) == [1000]
+
+
+def test_word_forms_share_a_stem(retriever) -> None:
+    results = retriever.search("menu prices", top_k=1)
+
+    assert results[0]["question"] == "Can I control my menu pricing on Swiggy?"
+
+
+def test_partial_words_match_through_the_ngram_index(retriever) -> None:
+    assert "instamart" in retriever.index.partial_matches("insta")
+    assert "deliv" in retriever.index.partial_matches("delivery")
+
+    results = retriever.search("insta", top_k=1)
+    assert "Instamart" in results[0]["question"]
+
+
+def test_search_batch_matches_search(retriever) -> None:
+    pytest.importorskip("numpy")
+    queries = [
+        "How much does it cost?",
+        "insta",
+        "xyzzy",
+        "",
+        "menu prices",
+        "do you deliver for me",
+    ]
+
+    batch = retriever.search_batch(queries, top_k=3)
+
+    assert len(batch) == len(queries)
+    for query, results in zip(queries, batch):
+        expected = retriever.search(query, top_k=3)
+        assert [r["question"] for r in results] == [r["question"] for r in expected]
+        assert [r["relevance_score"] for r in results] == pytest.approx(
+            [r["relevance_score"] for r in expected], rel=1e-5
+        )
+
+
+def test_persisted_index_is_mapped_and_rebuilt_when_the_source_changes(
+    tmp_path,
+) -> None:
+    source = tmp_path / "faq.json"
+    source.write_text(FAQ_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+    index_path = tmp_path / "faq.idx"
+
+    built = FAQRetriever(str(source), str(index_path))
+    assert index_path.exists()
+    mapped = FAQRetriever(str(source), str(index_path))
+    assert type(mapped.index).__name__ == "MappedIndex"
+    in_memory = FAQRetriever(str(source))
+    for query in ["How much does it cost?", "insta", "xyzzy", "menu prices"]:
+        assert mapped.search(query) == in_memory.search(query)
+    assert mapped.get_company_info() == in_memory.get_company_info()
+
+    data = json.loads(source.read_text(encoding="utf-8"))
+    data["faq"].append({"question": "Do you support zanzibar?", "answer": "Not yet."})
+    source.write_text(json.dumps(data), encoding="utf-8")
+
+    rebuilt = FAQRetriever(str(source), str(index_path))
+    assert len(rebuilt.faq_entries) == len(built.faq_entries) + 1
+    assert rebuilt.search("zanzibar", top_k=1)[0]["answer"] == "Not yet."
+
+
+def test_index_in_an_older_format_is_rebuilt(tmp_path) -> None:
+    import faq_store
+
+    source = tmp_path / "faq.json"
+    source.write_text(FAQ_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+    index_path = tmp_path / "faq.idx"
+    FAQRetriever(str(source), str(index_path))
+    # An older version whose sections don't fit this version's layout: a JSON section
+    # followed by one that doesn't divide into 8-byte offsets
+    body = b'{"avg_lengths": {}}' + b"\0" * 3
+    start, json_length = faq_store._HEADER.size, len(body) - 3
+    layout = [start, json_length, start, json_length] + [start + json_length, 3] * (
+        len(faq_store._SECTIONS) - 2
+    )
+    header = faq_store._HEADER.pack(
+        faq_store.MAGIC,
+        faq_store.FORMAT_VERSION - 1,
+        faq_store._BYTE_ORDER,
+        b"\0" * 32,
+        1,
+        1.0,
+        *layout,
+    )
+    index_path.write_bytes(header + body)
+
+    retriever = FAQRetriever(str(source), str(index_path))
+    assert retriever.search("genie pricing", top_k=1)
+    assert (
+        faq_store.MappedIndex(str(index_path)).format_version
+        == faq_store.FORMAT_VERSION
+    )
+
+
+def test_refresh_applies_edits_without_rebuilding_the_base(tmp_path) -> None:
+    source = tmp_path / "faq.json"
+    source.write_text(FAQ_FILE.read_text(encoding="utf-8"), encoding="utf-8")
+    index_path = tmp_path / "faq.idx"
+    retriever = FAQRetriever(str(source), str(index_path))
+    base, before = retriever.index, retriever._version
+    assert retriever.refresh() is False
+
+    data = json.loads(source.read_text(encoding="utf-8"))
+    data["faq"][0]["answer"] = "We now also deliver to zanzibar."
+    removed = data["faq"].pop(1)
+    data["faq"].append(
+        {
+            "question": "Do you support quokka merchants?",
+            "answer": "Yes, quokkas welcome.",
+        }
+    )
+    source.write_text(json.dumps(data), encoding="utf-8")
+
+    assert retriever.refresh() is True
+    assert retriever.index.base is base
+    assert len(retriever.index.deleted) == 2
+    assert (
+        retriever.search("zanzibar", top_k=1)[0]["question"]
+        == data["faq"][0]["question"]
+    )
+    assert retriever.search("quokka", top_k=1)[0]["answer"] == "Yes, quokkas welcome."
+    assert removed["question"] not in [
+        r["question"] for r in retriever.search(removed["question"], top_k=5)
+    ]
+    # A search that started on the old version still sees it
+    assert before.index.score(expand_query("quokka")) == {}
+
+    rebuilt = FAQRetriever(str(source))
+    assert len(rebuilt.faq_entries) == len(retriever.faq_entries) - len(
+        retriever.index.deleted
+    )
+    for query in ["How much does it cost?", "quokka", "zanzibar"]:
+        assert (
+            retriever.search(query, top_k=1)[0]["question"]
+            == rebuilt.search(query, top_k=1)[0]["question"]
+        )
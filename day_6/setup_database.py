@@ -1,17 +1,185 @@
+import argparse
+import random
 import sqlite3
+import time
 from datetime import datetime, timedelta
-import random
+from itertools import islice
+from typing import Optional
 
-def setup_database():
-    """
-    Creates SQLite database with fraud_cases table and populates it with sample data.
-    """
-    # Connect to database (creates file if doesn't exist)
-    conn = sqlite3.connect('fraud_cases.db')
-    cursor = conn.cursor()
+DB_PATH = "fraud_cases.db"
 
-    # Create fraud_cases table
-    cursor.execute('''
+CASE_COLUMNS = (
+    "user_name",
+    "security_identifier",
+    "card_ending",
+    "transaction_amount",
+    "transaction_name",
+    "transaction_time",
+    "transaction_category",
+    "transaction_source",
+    "transaction_location",
+    "security_question",
+    "security_answer",
+    "status",
+    "outcome_note",
+)
+
+INSERT_CASE_SQL = f"""
+    INSERT INTO fraud_cases ({", ".join(CASE_COLUMNS)})
+    VALUES ({", ".join("?" for _ in CASE_COLUMNS)})
+"""
+
+# Secondary indexes, built after bulk loads so inserts don't pay for them.
+# idx_fraud_cases_lookup serves the agent's LOWER(user_name) + status lookup.
+CASE_INDEXES = {
+    "idx_fraud_cases_lookup": "fraud_cases (LOWER(user_name), status)",
+    "idx_fraud_cases_status": "fraud_cases (status)",
+}
+
+# Default status mix for generated cases: mostly open cases, like a live queue
+DEFAULT_STATUS_MIX = {
+    "pending_review": 0.70,
+    "confirmed_safe": 0.15,
+    "confirmed_fraud": 0.10,
+    "verification_failed": 0.05,
+}
+
+OUTCOME_NOTES = {
+    "pending_review": "",
+    "confirmed_safe": "Customer confirmed they authorized the transaction",
+    "confirmed_fraud": "Customer confirmed they did NOT authorize the transaction - card blocked",
+    "verification_failed": "Customer failed security verification",
+    # Generated in_progress cases have no lease, so the campaign reclaims them on its first tick
+    "in_progress": "",
+    "call_failed": "No outcome after 3 call attempts",
+}
+
+FIRST_NAMES = [
+    "John",
+    "Sarah",
+    "Mike",
+    "Emma",
+    "Tom",
+    "Anna",
+    "David",
+    "Lisa",
+    "James",
+    "Maria",
+    "Robert",
+    "Laura",
+    "Daniel",
+    "Kate",
+    "Paul",
+    "Nina",
+    "Mark",
+    "Rita",
+    "Sam",
+    "Priya",
+    "Rahul",
+    "Asha",
+    "Vikram",
+    "Neha",
+    "Arjun",
+    "Meera",
+    "Ravi",
+    "Sana",
+    "Kiran",
+    "Amit",
+]
+
+LAST_NAMES = [
+    "Smith",
+    "Wilson",
+    "Johnson",
+    "Davis",
+    "Brown",
+    "Taylor",
+    "Clark",
+    "Lewis",
+    "Walker",
+    "Hall",
+    "Young",
+    "King",
+    "Wright",
+    "Green",
+    "Baker",
+    "Adams",
+    "Nelson",
+    "Hill",
+    "Moore",
+    "White",
+    "Sharma",
+    "Patel",
+    "Singh",
+    "Kumar",
+    "Gupta",
+    "Rao",
+    "Iyer",
+    "Mehta",
+    "Reddy",
+    "Nair",
+]
+
+# (merchant name, category, source domain)
+MERCHANTS = [
+    ("Electronics World Online", "Electronics", "electronicsworld.net"),
+    ("Luxury Fashion Boutique", "Fashion & Apparel", "luxuryfashion-outlet.com"),
+    ("International Wire Transfer Service", "Money Transfer", "quickwire-transfer.biz"),
+    ("Gaming Store Pro", "Gaming & Entertainment", "gamingstorepro.online"),
+    (
+        "Premium Watches International",
+        "Jewelry & Accessories",
+        "premiumwatches-intl.co",
+    ),
+    ("Global Travel Deals", "Travel", "globaltraveldeals.xyz"),
+    ("Crypto Exchange Express", "Cryptocurrency", "cryptoexpress-trade.io"),
+    ("Mega Gadget Hub", "Electronics", "megagadgethub.shop"),
+    ("Designer Shoes Outlet", "Fashion & Apparel", "designershoes-sale.net"),
+    ("Online Casino Royale", "Gambling", "casinoroyale-online.bet"),
+    ("Gift Card Bazaar", "Gift Cards", "giftcardbazaar.store"),
+    ("Pharma Direct Online", "Pharmacy", "pharmadirect-rx.biz"),
+]
+
+LOCATIONS = [
+    "Lagos, Nigeria",
+    "Shanghai, China",
+    "Moscow, Russia",
+    "Bucharest, Romania",
+    "Istanbul, Turkey",
+    "Kyiv, Ukraine",
+    "Manila, Philippines",
+    "Sao Paulo, Brazil",
+    "Dubai, UAE",
+    "Bangkok, Thailand",
+    "Mumbai, India",
+    "London, UK",
+]
+
+# (question, possible answers)
+SECURITY_QUESTIONS = [
+    (
+        "What is your favorite color?",
+        ["blue", "red", "green", "black", "white", "yellow"],
+    ),
+    ("What is your pet's name?", ["max", "bella", "rocky", "coco", "tiger", "bruno"]),
+    (
+        "What city were you born in?",
+        ["london", "delhi", "mumbai", "chennai", "pune", "paris"],
+    ),
+    (
+        "What is your favorite food?",
+        ["pizza", "biryani", "pasta", "dosa", "sushi", "burger"],
+    ),
+    (
+        "What is your mother's name?",
+        ["mary", "sita", "anna", "lakshmi", "grace", "rose"],
+    ),
+]
+
+
+def create_table(cursor):
+    """Create the fraud_cases table if it doesn't exist"""
+    cursor.execute("""
         CREATE TABLE IF NOT EXISTS fraud_cases (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_name TEXT NOT NULL,
@@ -28,114 +196,361 @@ def setup_database():
             status TEXT DEFAULT 'pending_review',
             outcome_note TEXT DEFAULT ''
         )
-    ''')
+    """)
+
+
+def create_indexes(cursor):
+    """Create the secondary indexes on fraud_cases"""
+    for name, definition in CASE_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+def drop_indexes_and_triggers(cursor):
+    """
+    Drop every index and trigger on fraud_cases so bulk inserts only touch the table b-tree.
+
+    That includes the ones ensure_schema() adds (risk scoring, the name index
+    triggers); migrate() puts them back and scores and indexes the new rows.
+    """
+    objects = cursor.execute("""
+        SELECT type, name FROM sqlite_master
+        WHERE tbl_name = 'fraud_cases' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    """).fetchall()
+    for kind, name in objects:
+        cursor.execute(f"DROP {kind.upper()} IF EXISTS {name}")
+    # The one-time steps over existing rows have to run again for the loaded ones
+    cursor.execute("PRAGMA user_version = 0")
+
+
+def setup_database(db_path: str = DB_PATH):
+    """
+    Creates SQLite database with fraud_cases table and populates it with sample data.
+    """
+    # Connect to database (creates file if doesn't exist)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # Create fraud_cases table
+    create_table(cursor)
+    create_indexes(cursor)
 
     # Sample fraud cases with simple English names for voice recognition
     fraud_cases = [
         {
-            'user_name': 'John Smith',
-            'security_identifier': 'JS2847',
-            'card_ending': '4242',
-            'transaction_amount': 45999.50,
-            'transaction_name': 'Electronics World Online',
-            'transaction_time': (datetime.now() - timedelta(hours=3)).strftime('%Y-%m-%d %H:%M:%S'),
-            'transaction_category': 'Electronics',
-            'transaction_source': 'electronicsworld.net',
-            'transaction_location': 'Lagos, Nigeria',
-            'security_question': 'What is your favorite color?',
-            'security_answer': 'blue',
-            'status': 'pending_review',
-            'outcome_note': ''
+            "user_name": "John Smith",
+            "security_identifier": "JS2847",
+            "card_ending": "4242",
+            "transaction_amount": 45999.50,
+            "transaction_name": "Electronics World Online",
+            "transaction_time": (datetime.now() - timedelta(hours=3)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            "transaction_category": "Electronics",
+            "transaction_source": "electronicsworld.net",
+            "transaction_location": "Lagos, Nigeria",
+            "security_question": "What is your favorite color?",
+            "security_answer": "blue",
+            "status": "pending_review",
+            "outcome_note": "",
         },
         {
-            'user_name': 'Sarah Wilson',
-            'security_identifier': 'SW1923',
-            'card_ending': '7890',
-            'transaction_amount': 89750.00,
-            'transaction_name': 'Luxury Fashion Boutique',
-            'transaction_time': (datetime.now() - timedelta(hours=5)).strftime('%Y-%m-%d %H:%M:%S'),
-            'transaction_category': 'Fashion & Apparel',
-            'transaction_source': 'luxuryfashion-outlet.com',
-            'transaction_location': 'Shanghai, China',
-            'security_question': 'What is your pet\'s name?',
-            'security_answer': 'max',
-            'status': 'pending_review',
-            'outcome_note': ''
+            "user_name": "Sarah Wilson",
+            "security_identifier": "SW1923",
+            "card_ending": "7890",
+            "transaction_amount": 89750.00,
+            "transaction_name": "Luxury Fashion Boutique",
+            "transaction_time": (datetime.now() - timedelta(hours=5)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            "transaction_category": "Fashion & Apparel",
+            "transaction_source": "luxuryfashion-outlet.com",
+            "transaction_location": "Shanghai, China",
+            "security_question": "What is your pet's name?",
+            "security_answer": "max",
+            "status": "pending_review",
+            "outcome_note": "",
         },
         {
-            'user_name': 'Mike Johnson',
-            'security_identifier': 'MJ5612',
-            'card_ending': '3456',
-            'transaction_amount': 125000.00,
-            'transaction_name': 'International Wire Transfer Service',
-            'transaction_time': (datetime.now() - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S'),
-            'transaction_category': 'Money Transfer',
-            'transaction_source': 'quickwire-transfer.biz',
-            'transaction_location': 'Moscow, Russia',
-            'security_question': 'What city were you born in?',
-            'security_answer': 'london',
-            'status': 'pending_review',
-            'outcome_note': ''
+            "user_name": "Mike Johnson",
+            "security_identifier": "MJ5612",
+            "card_ending": "3456",
+            "transaction_amount": 125000.00,
+            "transaction_name": "International Wire Transfer Service",
+            "transaction_time": (datetime.now() - timedelta(hours=1)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            "transaction_category": "Money Transfer",
+            "transaction_source": "quickwire-transfer.biz",
+            "transaction_location": "Moscow, Russia",
+            "security_question": "What city were you born in?",
+            "security_answer": "london",
+            "status": "pending_review",
+            "outcome_note": "",
         },
         {
-            'user_name': 'Emma Davis',
-            'security_identifier': 'ED8934',
-            'card_ending': '6789',
-            'transaction_amount': 32499.99,
-            'transaction_name': 'Gaming Store Pro',
-            'transaction_time': (datetime.now() - timedelta(hours=8)).strftime('%Y-%m-%d %H:%M:%S'),
-            'transaction_category': 'Gaming & Entertainment',
-            'transaction_source': 'gamingstorepro.online',
-            'transaction_location': 'Bucharest, Romania',
-            'security_question': 'What is your favorite food?',
-            'security_answer': 'pizza',
-            'status': 'pending_review',
-            'outcome_note': ''
+            "user_name": "Emma Davis",
+            "security_identifier": "ED8934",
+            "card_ending": "6789",
+            "transaction_amount": 32499.99,
+            "transaction_name": "Gaming Store Pro",
+            "transaction_time": (datetime.now() - timedelta(hours=8)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            "transaction_category": "Gaming & Entertainment",
+            "transaction_source": "gamingstorepro.online",
+            "transaction_location": "Bucharest, Romania",
+            "security_question": "What is your favorite food?",
+            "security_answer": "pizza",
+            "status": "pending_review",
+            "outcome_note": "",
         },
         {
-            'user_name': 'Tom Brown',
-            'security_identifier': 'TB4521',
-            'card_ending': '9012',
-            'transaction_amount': 67800.00,
-            'transaction_name': 'Premium Watches International',
-            'transaction_time': (datetime.now() - timedelta(hours=12)).strftime('%Y-%m-%d %H:%M:%S'),
-            'transaction_category': 'Jewelry & Accessories',
-            'transaction_source': 'premiumwatches-intl.co',
-            'transaction_location': 'Istanbul, Turkey',
-            'security_question': 'What is your mother\'s name?',
-            'security_answer': 'mary',
-            'status': 'pending_review',
-            'outcome_note': ''
-        }
+            "user_name": "Tom Brown",
+            "security_identifier": "TB4521",
+            "card_ending": "9012",
+            "transaction_amount": 67800.00,
+            "transaction_name": "Premium Watches International",
+            "transaction_time": (datetime.now() - timedelta(hours=12)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            "transaction_category": "Jewelry & Accessories",
+            "transaction_source": "premiumwatches-intl.co",
+            "transaction_location": "Istanbul, Turkey",
+            "security_question": "What is your mother's name?",
+            "security_answer": "mary",
+            "status": "pending_review",
+            "outcome_note": "",
+        },
     ]
 
     # Insert sample data
-    for case in fraud_cases:
-        cursor.execute('''
-            INSERT INTO fraud_cases (
-                user_name, security_identifier, card_ending, transaction_amount,
-                transaction_name, transaction_time, transaction_category,
-                transaction_source, transaction_location, security_question,
-                security_answer, status, outcome_note
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            case['user_name'], case['security_identifier'], case['card_ending'],
-            case['transaction_amount'], case['transaction_name'], case['transaction_time'],
-            case['transaction_category'], case['transaction_source'], case['transaction_location'],
-            case['security_question'], case['security_answer'], case['status'],
-            case['outcome_note']
-        ))
+    cursor.executemany(
+        INSERT_CASE_SQL,
+        [tuple(case[column] for column in CASE_COLUMNS) for case in fraud_cases],
+    )
 
     # Commit changes and close connection
     conn.commit()
     conn.close()
 
     print("✓ Database setup completed successfully!")
-    print(f"✓ Created 'fraud_cases.db' with {len(fraud_cases)} sample fraud cases")
+    print(f"✓ Created '{db_path}' with {len(fraud_cases)} sample fraud cases")
     print("✓ Table 'fraud_cases' created with all required columns")
     print("\nSample cases added for:")
     for case in fraud_cases:
-        print(f"  - {case['user_name']} (Card ending: {case['card_ending']}, Amount: ₹{case['transaction_amount']:,.2f})")
+        print(
+            f"  - {case['user_name']} (Card ending: {case['card_ending']}, Amount: ₹{case['transaction_amount']:,.2f})"
+        )
+
+
+def parse_status_mix(spec: str) -> dict:
+    """Parse a status mix like 'pending_review=0.8,confirmed_fraud=0.2' into weights"""
+    mix = {}
+    for part in spec.split(","):
+        status, _, weight = part.partition("=")
+        status = status.strip()
+        if status not in OUTCOME_NOTES:
+            raise ValueError(
+                f"Unknown status '{status}'. Expected one of: {', '.join(OUTCOME_NOTES)}"
+            )
+        mix[status] = float(weight)
+        if mix[status] < 0:
+            raise ValueError(f"Weight for '{status}' must not be negative")
+    if not any(mix.values()):
+        raise ValueError("Status mix needs at least one positive weight")
+    return mix
+
+
+def generate_cases(
+    count: int,
+    seed: int = 42,
+    status_mix: Optional[dict] = None,
+    max_age_hours: int = 72,
+    anchor_time: Optional[datetime] = None,
+):
+    """
+    Yield `count` synthetic case rows (tuples in CASE_COLUMNS order).
+
+    The same seed always produces the same cases; transaction times are offsets
+    from `anchor_time` (default: now), so they stay realistic on every run.
+    """
+    rng = random.Random(seed)
+    status_mix = status_mix or DEFAULT_STATUS_MIX
+    statuses = list(status_mix)
+    weights = list(status_mix.values())
+    anchor_time = anchor_time or datetime.now()
+    max_age_seconds = max_age_hours * 3600
+
+    # Draw statuses in chunks - one choices() call is much cheaper than one per row
+    chunk_size = 10000
+    produced = 0
+    while produced < count:
+        n = min(chunk_size, count - produced)
+        for status in rng.choices(statuses, weights=weights, k=n):
+            first = rng.choice(FIRST_NAMES)
+            last = rng.choice(LAST_NAMES)
+            merchant, category, source = rng.choice(MERCHANTS)
+            question, answers = rng.choice(SECURITY_QUESTIONS)
+            # Log-normal amounts: mostly tens of thousands of rupees, with a long tail
+            amount = round(min(rng.lognormvariate(10.3, 0.9), 5000000.0), 2)
+            age = timedelta(seconds=rng.randrange(max_age_seconds))
+            yield (
+                f"{first} {last}",
+                f"{first[0]}{last[0]}{rng.randrange(10000):04d}",
+                f"{rng.randrange(10000):04d}",
+                amount,
+                merchant,
+                (anchor_time - age).strftime("%Y-%m-%d %H:%M:%S"),
+                category,
+                source,
+                rng.choice(LOCATIONS),
+                question,
+                rng.choice(answers),
+                status,
+                OUTCOME_NOTES[status],
+            )
+        produced += n
+
+
+def bulk_load(
+    count: int,
+    db_path: str = DB_PATH,
+    seed: int = 42,
+    status_mix: Optional[dict] = None,
+    batch_size: int = 100000,
+    max_age_hours: int = 72,
+    anchor_time: Optional[datetime] = None,
+):
+    """
+    Load `count` generated cases for load testing.
+
+    Rows go in with executemany, one transaction per batch, with every index
+    and trigger on the table dropped for the duration of the load. The case
+    indexes are rebuilt at the end, and migrate() restores the rest.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+    # Bulk-load settings: this is throwaway test data, so trade durability for speed
+    cursor.execute("PRAGMA journal_mode = MEMORY")
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA cache_size = -262144")  # 256 MiB page cache
+
+    create_table(cursor)
+    drop_indexes_and_triggers(cursor)
+
+    started = time.perf_counter()
+    rows = generate_cases(
+        count,
+        seed=seed,
+        status_mix=status_mix,
+        max_age_hours=max_age_hours,
+        anchor_time=anchor_time,
+    )
+    loaded = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        cursor.execute("BEGIN")
+        cursor.executemany(INSERT_CASE_SQL, batch)
+        cursor.execute("COMMIT")
+        loaded += len(batch)
+        print(f"  ... {loaded:,}/{count:,} cases loaded", end="\r", flush=True)
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cursor.execute("BEGIN")
+    create_indexes(cursor)
+    cursor.execute("COMMIT")
+    cursor.execute("ANALYZE")
+    index_seconds = time.perf_counter() - started
+    conn.close()
+
+    print(
+        f"\n✓ Loaded {loaded:,} generated cases into '{db_path}' in {load_seconds:.1f}s "
+        f"({loaded / max(load_seconds, 1e-9):,.0f} rows/s)"
+    )
+    print(f"✓ Built {len(CASE_INDEXES)} indexes in {index_seconds:.1f}s")
+    migrate(db_path)
+
+
+def migrate(db_path: str = DB_PATH):
+    """
+    Bring a database up to the schema the agent and the campaign expect.
+
+    Adds the campaign columns, risk scoring, the fuzzy name index and the
+    case_events table, and scores and indexes any existing cases. Run it on
+    every deploy, before the agent workers start; it is a no-op once done.
+    """
+    # Imported here so the plain setup and bulk load work without the agent's src/ on the path
+    import case_store
+
+    started = time.perf_counter()
+    case_store.DB_PATH = db_path
+    case_store.ensure_schema()
+    print(
+        f"✓ Schema of '{db_path}' is at version {case_store.schema_version()} "
+        f"({time.perf_counter() - started:.1f}s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the fraud_cases database")
+    parser.add_argument(
+        "--db", default=DB_PATH, help="Database file (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--generate",
+        type=int,
+        metavar="N",
+        help="Load N synthetic cases instead of the five sample cases",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Random seed for generated cases (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--status-mix",
+        type=parse_status_mix,
+        default=DEFAULT_STATUS_MIX,
+        help="Status weights, e.g. 'pending_review=0.7,confirmed_safe=0.2,confirmed_fraud=0.1'",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100000,
+        help="Rows per transaction when generating (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-age-hours",
+        type=int,
+        default=72,
+        help="Spread generated transaction times over this many hours (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--migrate-only",
+        action="store_true",
+        help="Only migrate an existing database, without adding cases (run this on deploy)",
+    )
+    args = parser.parse_args()
+
+    if args.migrate_only:
+        migrate(args.db)
+    elif args.generate is None:
+        setup_database(args.db)
+        migrate(args.db)
+    else:
+        bulk_load(
+            args.generate,
+            db_path=args.db,
+            seed=args.seed,
+            status_mix=args.status_mix,
+            batch_size=args.batch_size,
+            max_age_hours=args.max_age_hours,
+        )
+
 
-if __name__ == '__main__':
-    setup_database()
+if __name__ == "__main__":
+    main()
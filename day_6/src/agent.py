@@ -1,76 +1,240 @@
+import asyncio
+import json
 import logging
-import sqlite3
+import os
+import time
+from typing import List, Optional, Tuple
 
 from dotenv import load_dotenv
+from livekit import api
 from livekit.agents import (
+    NOT_GIVEN,
     Agent,
     AgentSession,
     JobContext,
     JobProcess,
     MetricsCollectedEvent,
     RoomInputOptions,
+    RunContext,
     WorkerOptions,
     cli,
+    llm,
     metrics,
     tokenize,
-    llm,
 )
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
+from livekit.plugins import deepgram, google, murf, noise_cancellation, silero
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
+from audit_log import AuditWriter
+from case_store import (
+    SCHEMA_VERSION,
+    CaseLookup,
+    acquire_case,
+    check_security_answer,
+    complete_case,
+    find_case_lookup_fuzzy,
+    get_case_details,
+    get_case_lookup_by_id,
+    get_case_lookup_by_name,
+    release_case,
+    renew_case_leases,
+    schema_version,
+)
+from session_state import FraudCallState, TTLCache, normalize_name
+
 logger = logging.getLogger("fraud-agent")
 
 load_dotenv(".env.local")
 
-# Global state for fraud case tracking
-current_case_data = {}
-verified_users = {}
+# A call's lease on its case lasts CASE_LEASE_SECONDS unless renewed; the worker
+# renews the leases of all its calls every LEASE_RENEW_SECONDS, so if the worker
+# dies the case is free for another worker shortly after.
+CASE_LEASE_SECONDS = 120
+LEASE_RENEW_SECONDS = 30
+# A case handed back without an outcome (e.g. the customer hung up) isn't
+# called again by the campaign for this long
+RELEASE_RETRY_SECONDS = 300
+
+# The name the campaign scheduler dispatches outbound calls to
+AGENT_NAME = os.getenv("LIVEKIT_AGENT_NAME", "fraud-agent")
+# Outbound calls are placed through this LiveKit SIP trunk
+SIP_OUTBOUND_TRUNK_ID = os.getenv("SIP_OUTBOUND_TRUNK_ID", "")
+# Participant identity of the customer on an outbound call
+CUSTOMER_IDENTITY = "customer"
+
+# Cases leased by calls on this worker (case id -> call id), renewed together by
+# one background task. Per-call state lives on the AgentSession; this is the
+# only cross-call state. Each successful renewal sets its entry again, so a live
+# call is tracked for as long as it lasts; an entry only expires once its lease
+# has stopped being renewed for CLAIM_TTL_SECONDS, e.g. if the renewer died.
+CLAIM_TTL_SECONDS = 30 * 60
+active_cases = TTLCache(maxsize=1024, ttl=CLAIM_TTL_SECONDS)
+_lease_renewer: Optional[asyncio.Task] = None
+
+# Audit trail for every call on this worker, written to case_events in batches
+audit = AuditWriter()
+
+
+async def _renew_leases_forever() -> None:
+    while True:
+        await asyncio.sleep(LEASE_RENEW_SECONDS)
+        claims = active_cases.items()
+        if not claims:
+            continue
+        renewed = await asyncio.to_thread(
+            renew_case_leases, claims, CASE_LEASE_SECONDS, time.time()
+        )
+        if renewed is not None:
+            refresh_claims(claims, renewed)
+
+
+def refresh_claims(
+    claims: List[Tuple[int, str]], renewed: List[Tuple[int, str]]
+) -> None:
+    """Keep tracking the claims whose lease was renewed and forget the ones that lost it"""
+    held = set(renewed)
+    for case_id, call_id in claims:
+        if active_cases.get(case_id) != call_id:
+            # Released or re-claimed while the renewal ran
+            continue
+        if (case_id, call_id) in held:
+            active_cases.set(case_id, call_id)
+        else:
+            active_cases.pop(case_id)
+    if len(held) < len(claims):
+        logger.warning(
+            f"Renewed {len(held)} of {len(claims)} case leases; the rest were lost"
+        )
+
+
+def _ensure_lease_renewer() -> None:
+    global _lease_renewer
+    if _lease_renewer is None or _lease_renewer.done():
+        _lease_renewer = asyncio.create_task(_renew_leases_forever())
 
 
-# Database helper functions
-def get_fraud_case_by_name(user_name: str):
-    """Fetch fraud case from database by user name"""
+def _parse_metadata(metadata: Optional[str]) -> dict:
+    if not metadata:
+        return {}
     try:
-        conn = sqlite3.connect('fraud_cases.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT * FROM fraud_cases
-            WHERE LOWER(user_name) = LOWER(?)
-            AND status = 'pending_review'
-            LIMIT 1
-        ''', (user_name,))
-
-        row = cursor.fetchone()
-        conn.close()
-
-        if row:
-            return dict(row)
-        return None
-    except Exception as e:
-        logger.error(f"Database error: {e}")
-        return None
+        data = json.loads(metadata)
+    except ValueError:
+        logger.warning(f"Ignoring non-JSON metadata: {metadata!r}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def read_case_key(metadata: Optional[str]) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Read the case an outbound call was dialled for from job or room metadata.
+
+    Expects JSON like {"case_id": 42} or {"user_name": "John Smith"}; returns
+    (case_id, user_name), either of which may be None.
+    """
+    data = _parse_metadata(metadata)
+    case_id = data.get("case_id")
+    user_name = data.get("user_name")
+    try:
+        case_id = int(case_id) if case_id is not None else None
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid case_id in metadata: {case_id!r}")
+        case_id = None
+    return case_id, user_name or None
 
 
-def update_fraud_case_status(case_id: int, status: str, outcome_note: str = ""):
-    """Update fraud case status in database"""
+def read_phone_number(metadata: Optional[str]) -> Optional[str]:
+    """The number to dial from job metadata like {"phone_number": "+15550100"}; None for inbound calls"""
+    phone_number = _parse_metadata(metadata).get("phone_number")
+    return phone_number if isinstance(phone_number, str) and phone_number else None
+
+
+async def dial_customer(ctx: JobContext, phone_number: str) -> bool:
+    """Call the customer into the room through the outbound SIP trunk; True once they answer"""
+    if not SIP_OUTBOUND_TRUNK_ID:
+        logger.error("SIP_OUTBOUND_TRUNK_ID is not set; cannot place outbound calls")
+        return False
     try:
-        conn = sqlite3.connect('fraud_cases.db')
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE fraud_cases
-            SET status = ?, outcome_note = ?
-            WHERE id = ?
-        ''', (status, outcome_note, case_id))
-
-        conn.commit()
-        conn.close()
-        return True
-    except Exception as e:
-        logger.error(f"Database update error: {e}")
+        await ctx.api.sip.create_sip_participant(
+            api.CreateSIPParticipantRequest(
+                room_name=ctx.room.name,
+                sip_trunk_id=SIP_OUTBOUND_TRUNK_ID,
+                sip_call_to=phone_number,
+                participant_identity=CUSTOMER_IDENTITY,
+                wait_until_answered=True,
+            )
+        )
+    except api.TwirpError as e:
+        logger.warning(
+            f"Outbound call not answered: {e.message} (SIP status {e.metadata.get('sip_status_code')})"
+        )
         return False
+    return True
+
+
+def prefetch_case(
+    case_id: Optional[int], user_name: Optional[str]
+) -> Optional[CaseLookup]:
+    """Load the lookup projection for a known case (blocking, run it in a thread)"""
+    if case_id is not None:
+        return get_case_lookup_by_id(case_id)
+    if user_name:
+        return get_case_lookup_by_name(user_name)
+    return None
+
+
+async def claim_case(state: FraudCallState, case: CaseLookup) -> Optional[str]:
+    """Lease `case` for this call and make it current. Returns an error message if another call has it."""
+    if state.case and state.case.id == case.id:
+        return None
+    if not await asyncio.to_thread(
+        acquire_case, case.id, state.call_id, CASE_LEASE_SECONDS, time.time()
+    ):
+        audit.record(case.id, "claim_rejected", state.call_id)
+        return f"The case for {case.user_name} is already being handled on another call. Apologize and ask them to contact the bank directly."
+    if state.case:
+        await release_call_case(state)
+    active_cases.set(case.id, state.call_id)
+    state.load_case(case)
+    audit.record(case.id, "claimed", state.call_id)
+    _ensure_lease_renewer()
+    return None
+
+
+async def release_call_case(state: FraudCallState) -> None:
+    """Hand the call's case back to the queue if it is still leased without an outcome"""
+    if state.case and active_cases.pop(state.case.id) == state.call_id:
+        case_id = state.case.id
+        if await asyncio.to_thread(
+            release_case, case_id, state.call_id, time.time() + RELEASE_RETRY_SECONDS
+        ):
+            audit.record(case_id, "released", state.call_id)
+
+
+async def finish_call_case(state: FraudCallState, status: str, note: str) -> bool:
+    """Record the outcome on the call's case and stop renewing its lease"""
+    case_id = state.case.id
+    success = await asyncio.to_thread(
+        complete_case, case_id, state.call_id, status, note
+    )
+    active_cases.pop(case_id)
+    audit.record(
+        case_id, status if success else f"{status}_not_recorded", state.call_id, note
+    )
+    return success
+
+
+async def await_prefetched_case(state: FraudCallState) -> Optional[CaseLookup]:
+    """Wait for a prefetch started in the entrypoint and load its case into the call"""
+    if state.prefetch is None:
+        return None
+    case = await state.prefetch
+    state.prefetch = None
+    if case is None:
+        return None
+    state.lookups[normalize_name(case.user_name)] = case
+    if await claim_case(state, case) is not None:
+        return None
+    return case
 
 
 class FraudAlertAssistant(Agent):
@@ -98,17 +262,26 @@ IMPORTANT RULES:
 - If user cannot be verified, politely end the call without sharing details
 - Use the tools provided to fetch and update case information""",
         )
-        self.session_id = None
 
-    def _get_session_id(self):
-        """Generate a unique session ID for this conversation"""
-        if not self.session_id:
-            import time
-            self.session_id = str(int(time.time() * 1000))
-        return self.session_id
+    async def on_enter(self) -> None:
+        # For outbound calls the case was prefetched while the session started, so
+        # open with the identity check instead of asking for a name and looking it up
+        state: FraudCallState = self.session.userdata
+        case = await await_prefetched_case(state)
+        if case is None:
+            return
+
+        logger.info(f"Prefetched fraud case ID {case.id} for outbound call")
+        self.session.generate_reply(
+            instructions=f"Greet the customer professionally and introduce yourself as calling from SecureBank Fraud Department. "
+            f"Confirm you are speaking with {case.user_name}. The case is already loaded (security identifier: {case.security_identifier}), "
+            f"so do not look it up again - ask them the security question: {case.security_question}"
+        )
 
     @llm.function_tool()
-    async def lookup_fraud_case(self, user_name: str) -> str:
+    async def lookup_fraud_case(
+        self, context: RunContext[FraudCallState], user_name: str
+    ) -> str:
         """Look up a fraud case in the database by customer name. Use this after getting the customer's name.
 
         Args:
@@ -119,18 +292,44 @@ IMPORTANT RULES:
         """
         logger.info(f"Looking up fraud case for: {user_name}")
 
-        case = get_fraud_case_by_name(user_name)
-        session_id = self._get_session_id()
+        state = context.userdata
+        await await_prefetched_case(state)
+
+        key = normalize_name(user_name)
+        if key in state.lookups:
+            case = state.lookups[key]
+        else:
+            case = await asyncio.to_thread(get_case_lookup_by_name, user_name)
+            if case is None:
+                # Speech-to-text often mishears names; fall back to the closest pending case
+                match = await asyncio.to_thread(find_case_lookup_fuzzy, user_name)
+                if match:
+                    case, score = match
+                    logger.info(
+                        f"Fuzzy matched '{user_name}' to case ID {case.id} (similarity {score:.2f})"
+                    )
+                    audit.record(
+                        case.id,
+                        "fuzzy_match",
+                        state.call_id,
+                        f"heard {user_name!r}, similarity {score:.2f}",
+                    )
+            state.lookups[key] = case
 
         if case:
-            current_case_data[session_id] = case
-            verified_users[session_id] = False
-            return f"Case found for {case['user_name']}. Security identifier: {case['security_identifier']}. Ask them the security question: {case['security_question']}"
+            error = await claim_case(state, case)
+            if error:
+                return error
+            if normalize_name(case.user_name) != key:
+                return f"Closest match is a case for {case.user_name}. Confirm the customer's name is {case.user_name} before continuing. Security identifier: {case.security_identifier}. Then ask them the security question: {case.security_question}"
+            return f"Case found for {case.user_name}. Security identifier: {case.security_identifier}. Ask them the security question: {case.security_question}"
         else:
             return f"No pending fraud case found for {user_name}. Please verify the name and try again, or inform the customer there may be an error."
 
     @llm.function_tool()
-    async def verify_security_answer(self, customer_answer: str) -> str:
+    async def verify_security_answer(
+        self, context: RunContext[FraudCallState], customer_answer: str
+    ) -> str:
         """Verify the customer's security answer. Use this after they answer the security question.
 
         Args:
@@ -139,31 +338,37 @@ IMPORTANT RULES:
         Returns:
             Transaction details if verified, or failure message
         """
-        session_id = self._get_session_id()
+        state = context.userdata
 
-        if session_id not in current_case_data:
+        if not state.case:
             return "No case is currently loaded. Please look up the customer first."
 
-        case = current_case_data[session_id]
-        logger.info(f"Verifying security answer for case ID: {case['id']}")
-
-        correct_answer = case['security_answer'].lower().strip()
-        provided_answer = customer_answer.lower().strip()
-
-        if correct_answer == provided_answer:
-            verified_users[session_id] = True
-            return f"Verification successful. Provide the transaction details: A transaction of {case['transaction_amount']} rupees at {case['transaction_name']} in {case['transaction_location']} on {case['transaction_time']} using card ending in {case['card_ending']}. Source: {case['transaction_source']}. Ask if they authorized this transaction."
+        case = state.case
+        logger.info(f"Verifying security answer for case ID: {case.id}")
+
+        if state.verified or await asyncio.to_thread(
+            check_security_answer, case.id, customer_answer
+        ):
+            if not state.verified:
+                audit.record(case.id, "verified", state.call_id)
+            state.verified = True
+            if state.details is None:
+                state.details = await asyncio.to_thread(get_case_details, case.id)
+            details = state.details
+            if details is None:
+                return "Verification succeeded but the transaction details could not be loaded. Apologize and ask them to contact the bank directly."
+            return f"Verification successful. Provide the transaction details: A transaction of {details.transaction_amount} rupees at {details.transaction_name} in {details.transaction_location} on {details.transaction_time} using card ending in {details.card_ending}. Source: {details.transaction_source}. Ask if they authorized this transaction."
         else:
-            verified_users[session_id] = False
-            update_fraud_case_status(
-                case['id'],
-                'verification_failed',
-                'Customer failed security verification'
+            state.verified = False
+            await finish_call_case(
+                state, "verification_failed", "Customer failed security verification"
             )
             return "Verification failed. For security reasons, end the call politely and ask them to contact the bank directly."
 
     @llm.function_tool()
-    async def update_case_status(self, customer_authorized: bool) -> str:
+    async def update_case_status(
+        self, context: RunContext[FraudCallState], customer_authorized: bool
+    ) -> str:
         """Update the fraud case status after getting customer's response about the transaction.
 
         Args:
@@ -172,27 +377,29 @@ IMPORTANT RULES:
         Returns:
             Confirmation message with next steps to tell the customer
         """
-        session_id = self._get_session_id()
+        state = context.userdata
 
-        if session_id not in current_case_data:
+        if not state.case:
             return "No case is currently loaded."
 
-        if not verified_users.get(session_id, False):
+        if not state.verified:
             return "Customer has not been verified yet. Cannot update case status."
 
-        case = current_case_data[session_id]
-        logger.info(f"Updating case ID {case['id']} - Customer authorized: {customer_authorized}")
+        case = state.case
+        logger.info(
+            f"Updating case ID {case.id} - Customer authorized: {customer_authorized}"
+        )
 
         if customer_authorized:
-            status = 'confirmed_safe'
-            note = 'Customer confirmed they authorized the transaction'
+            status = "confirmed_safe"
+            note = "Customer confirmed they authorized the transaction"
             message = "Case updated as safe transaction. Thank the customer and let them know no further action is needed."
         else:
-            status = 'confirmed_fraud'
-            note = 'Customer confirmed they did NOT authorize the transaction - card blocked'
+            status = "confirmed_fraud"
+            note = "Customer confirmed they did NOT authorize the transaction - card blocked"
             message = "Case updated as fraud. Inform customer their card will be blocked immediately and a new card will be issued within 5-7 business days. Thank them for their time."
 
-        success = update_fraud_case_status(case['id'], status, note)
+        success = await finish_call_case(state, status, note)
 
         if success:
             return message
@@ -202,6 +409,14 @@ IMPORTANT RULES:
 
 def prewarm(proc: JobProcess):
     proc.userdata["vad"] = silero.VAD.load()
+    # Migrating a large database takes far longer than a process gets to start,
+    # so that is done on deploy by setup_database.py; here we only check it was
+    version = schema_version()
+    if version < SCHEMA_VERSION:
+        logger.error(
+            f"fraud_cases.db is at schema version {version}, expected {SCHEMA_VERSION}; "
+            "run `uv run setup_database.py --migrate-only` before starting the agent"
+        )
 
 
 async def entrypoint(ctx: JobContext):
@@ -212,23 +427,25 @@ async def entrypoint(ctx: JobContext):
     }
 
     # Set up a voice AI pipeline using Murf, Deepgram, Google Gemini, and the LiveKit turn detector
-    session = AgentSession(
+    session = AgentSession[FraudCallState](
+        # Per-call state for the tools; dropped again in the shutdown callback below
+        userdata=FraudCallState(call_id=ctx.room.name),
         # Speech-to-text (STT) is your agent's ears, turning the user's speech into text that the LLM can understand
         # See all available models at https://docs.livekit.io/agents/models/stt/
         stt=deepgram.STT(model="nova-3"),
         # A Large Language Model (LLM) is your agent's brain, processing user input and generating a response
         # See all available models at https://docs.livekit.io/agents/models/llm/
         llm=google.LLM(
-                model="gemini-2.5-flash",
-            ),
+            model="gemini-2.5-flash",
+        ),
         # Text-to-speech (TTS) is your agent's voice, turning the LLM's text into speech that the user can hear
         # See all available models as well as voice selections at https://docs.livekit.io/agents/models/tts/
         tts=murf.TTS(
-                voice="en-US-matthew",
-                style="Conversation",
-                tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-                text_pacing=True
-            ),
+            voice="en-US-matthew",
+            style="Conversation",
+            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
+            text_pacing=True,
+        ),
         # VAD and turn detection are used to determine when the user is speaking and when the agent should respond
         # See more at https://docs.livekit.io/agents/build/turns
         turn_detection=MultilingualModel(),
@@ -253,13 +470,48 @@ async def entrypoint(ctx: JobContext):
 
     ctx.add_shutdown_callback(log_usage)
 
+    async def release_call_state():
+        state = session.userdata
+        await release_call_case(state)
+        state.clear()
+        await audit.flush()
+
+    ctx.add_shutdown_callback(release_call_state)
+
+    # Outbound calls carry the case they were dialled for in the job (or room)
+    # metadata; fetch it while the session starts up rather than mid-conversation
+    metadata = ctx.job.metadata or ctx.job.room.metadata
+    case_id, user_name = read_case_key(metadata)
+    if case_id is not None or user_name:
+        session.userdata.prefetch = asyncio.create_task(
+            asyncio.to_thread(prefetch_case, case_id, user_name)
+        )
+
+    # Campaign calls also carry the number to dial. Ring the customer while the
+    # case loads, and only start the session (and its greeting) once they answer
+    phone_number = read_phone_number(metadata)
+    if phone_number and not await dial_customer(ctx, phone_number):
+        if case_id is not None:
+            # Back to the queue; the campaign applies its retry backoff
+            await asyncio.to_thread(
+                release_case,
+                case_id,
+                ctx.room.name,
+                time.time() + RELEASE_RETRY_SECONDS,
+            )
+        ctx.shutdown(reason="outbound call not answered")
+        return
+
     # Start the session, which initializes the voice pipeline and warms up the models
     await session.start(
         agent=FraudAlertAssistant(),
         room=ctx.room,
         room_input_options=RoomInputOptions(
-            # For telephony applications, use `BVCTelephony` for best results
-            noise_cancellation=noise_cancellation.BVC(),
+            # Telephony-tuned noise cancellation for phone calls
+            noise_cancellation=noise_cancellation.BVCTelephony()
+            if phone_number
+            else noise_cancellation.BVC(),
+            participant_identity=CUSTOMER_IDENTITY if phone_number else NOT_GIVEN,
         ),
     )
 
@@ -268,4 +520,9 @@ async def entrypoint(ctx: JobContext):
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    # Registered under AGENT_NAME so the campaign scheduler's dispatches reach it
+    cli.run_app(
+        WorkerOptions(
+            entrypoint_fnc=entrypoint, prewarm_fnc=prewarm, agent_name=AGENT_NAME
+        )
+    )
@@ -0,0 +1,68 @@
+"""
+Batched writer for the case_events audit trail.
+
+Recording an event only appends it to an in-memory buffer. The buffer is
+written in one transaction every `max_events` events or `max_delay_ms`,
+whichever comes first, so auditing never puts a database write on a tool call.
+"""
+
+import asyncio
+import logging
+import time
+from typing import List, Optional, Set
+
+from case_store import CaseEvent, append_case_events
+
+logger = logging.getLogger("fraud-agent")
+
+
+class AuditWriter:
+    """Buffers case events and flushes them in batches off the event loop"""
+
+    def __init__(self, max_events: int = 100, max_delay_ms: float = 500.0) -> None:
+        self.max_events = max_events
+        self.max_delay_ms = max_delay_ms
+        self._buffer: List[CaseEvent] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def record(
+        self, case_id: int, event: str, actor: str = "", detail: str = ""
+    ) -> None:
+        """Queue an event; must be called from the event loop"""
+        self._buffer.append((case_id, event, actor, detail, time.time()))
+        if len(self._buffer) >= self.max_events:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_delay_ms / 1000, self._start_flush
+            )
+
+    def _start_flush(self) -> None:
+        task = asyncio.ensure_future(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self) -> None:
+        """Write everything recorded so far"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # One flush at a time, so batches land in the order they were recorded
+        async with self._lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            try:
+                await asyncio.to_thread(append_case_events, batch)
+            except Exception as e:
+                logger.error(f"Database error: dropped {len(batch)} audit events: {e}")
+
+    async def aclose(self) -> None:
+        """Flush what is buffered and wait for any flush still in flight"""
+        await self.flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
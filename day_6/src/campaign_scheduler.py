@@ -0,0 +1,475 @@
+"""
+Outbound fraud-call campaign scheduler.
+
+Leases pending_review cases from fraud_cases.db in priority order (highest
+risk score, then largest amount, then oldest transaction) and dispatches a fraud agent job for each one,
+passing {"case_id": ..., "phone_number": ...} as job metadata so the agent
+prefetches the case and dials the customer.
+
+Concurrency is capped globally and per worker pool (an agent_name the agent
+workers register under). A case that ends without an outcome - the lease ran
+out or the dispatch failed - goes back to the queue with exponential backoff,
+and is marked call_failed after --max-attempts.
+
+    uv run src/campaign_scheduler.py --pool fraud-agent=4 --max-concurrent 8
+    uv run src/campaign_scheduler.py --local --until-empty   # no LiveKit needed
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+import case_store
+from audit_log import AuditWriter
+from case_store import (
+    OUTCOME_STATUSES,
+    QueuedCase,
+    complete_case,
+    count_queued_cases,
+    defer_pending_case,
+    ensure_schema,
+    get_case_progress,
+    lease_pending_cases,
+    reclaim_expired_cases,
+    release_case,
+    transition_case,
+)
+
+logger = logging.getLogger("campaign-scheduler")
+
+load_dotenv(".env.local")
+
+
+class WorkerPool:
+    """Agent workers registered under one agent_name, with their own concurrency limit"""
+
+    def __init__(self, agent_name: str, max_concurrent: int) -> None:
+        self.agent_name = agent_name
+        self.max_concurrent = max_concurrent
+        self.active = 0
+
+    @property
+    def free(self) -> int:
+        return max(self.max_concurrent - self.active, 0)
+
+
+class CampaignMetrics:
+    """Counters and gauges for the campaign, rendered in Prometheus text format"""
+
+    def __init__(self, window_seconds: float = 3600.0) -> None:
+        self.window_seconds = window_seconds
+        self.dispatched = 0
+        self.resolved = 0
+        self.retried = 0
+        self.failed = 0
+        self.queue_depth = 0
+        self.retry_waiting = 0
+        self.in_flight = 0
+        self._resolved_at: deque = deque()
+
+    def record_resolved(self, now: float) -> None:
+        self.resolved += 1
+        self._resolved_at.append(now)
+
+    def resolved_per_hour(self, now: float) -> float:
+        while self._resolved_at and self._resolved_at[0] < now - self.window_seconds:
+            self._resolved_at.popleft()
+        return len(self._resolved_at) * 3600.0 / self.window_seconds
+
+    def snapshot(self, now: float) -> Dict[str, float]:
+        return {
+            "queue_depth": self.queue_depth,
+            "retry_waiting": self.retry_waiting,
+            "in_flight": self.in_flight,
+            "dispatched_total": self.dispatched,
+            "resolved_total": self.resolved,
+            "retried_total": self.retried,
+            "failed_total": self.failed,
+            "resolved_per_hour": round(self.resolved_per_hour(now), 1),
+        }
+
+    def render_prometheus(self, now: float) -> str:
+        return "".join(
+            f"fraud_campaign_{name} {value}\n"
+            for name, value in self.snapshot(now).items()
+        )
+
+
+class LiveKitDispatcher:
+    """Dispatches a fraud agent job into a fresh room for each case"""
+
+    def __init__(self) -> None:
+        # Imported here so --local runs don't need LiveKit credentials or the API client
+        from livekit import api
+
+        self._api_module = api
+        self._api = (
+            api.LiveKitAPI()
+        )  # LIVEKIT_URL / LIVEKIT_API_KEY / LIVEKIT_API_SECRET
+
+    async def dispatch(self, case: QueuedCase, pool: WorkerPool) -> None:
+        if not case.phone_number:
+            # Fails the attempt, so the case is retried and eventually marked call_failed
+            raise ValueError("no phone number on file")
+        api = self._api_module
+        await self._api.agent_dispatch.create_dispatch(
+            api.CreateAgentDispatchRequest(
+                agent_name=pool.agent_name,
+                # The room is named after the case's lease owner, so the agent
+                # joining it (call id = room name) already holds the lease
+                room=case.owner,
+                metadata=json.dumps(
+                    {"case_id": case.id, "phone_number": case.phone_number}
+                ),
+            )
+        )
+
+    async def aclose(self) -> None:
+        await self._api.aclose()
+
+
+class LocalDispatcher:
+    """
+    Stand-in for LiveKit when testing the scheduler locally.
+
+    Each "call" takes a random few seconds; answered calls record a random
+    outcome in the database, unanswered ones hand the case back.
+    """
+
+    def __init__(
+        self,
+        min_call_seconds: float = 1.0,
+        max_call_seconds: float = 4.0,
+        answer_rate: float = 0.8,
+        fraud_rate: float = 0.5,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.min_call_seconds = min_call_seconds
+        self.max_call_seconds = max_call_seconds
+        self.answer_rate = answer_rate
+        self.fraud_rate = fraud_rate
+        self._rng = random.Random(seed)
+        self._calls = set()
+
+    async def dispatch(self, case: QueuedCase, pool: WorkerPool) -> None:
+        task = asyncio.create_task(self._call(case))
+        self._calls.add(task)
+        task.add_done_callback(self._calls.discard)
+
+    async def _call(self, case: QueuedCase) -> None:
+        await asyncio.sleep(
+            self._rng.uniform(self.min_call_seconds, self.max_call_seconds)
+        )
+        if self._rng.random() >= self.answer_rate:
+            # Like the agent when a customer hangs up: hand the case back without an outcome
+            logger.info(f"[local] case {case.id}: no answer")
+            await asyncio.to_thread(release_case, case.id, case.owner, time.time())
+            return
+        if self._rng.random() < self.fraud_rate:
+            status, note = (
+                "confirmed_fraud",
+                "Customer confirmed they did NOT authorize the transaction - card blocked",
+            )
+        else:
+            status, note = (
+                "confirmed_safe",
+                "Customer confirmed they authorized the transaction",
+            )
+        await asyncio.to_thread(complete_case, case.id, case.owner, status, note)
+        logger.info(f"[local] case {case.id}: {status}")
+
+    async def aclose(self) -> None:
+        for task in list(self._calls):
+            task.cancel()
+
+
+class CampaignScheduler:
+    def __init__(
+        self,
+        dispatcher,
+        pools: List[WorkerPool],
+        max_concurrent: int,
+        lease_seconds: float = 180.0,
+        max_attempts: int = 3,
+        retry_base_seconds: float = 300.0,
+        retry_max_seconds: float = 3600.0,
+        poll_interval: float = 2.0,
+        room_prefix: str = "fraud-case",
+    ) -> None:
+        self.dispatcher = dispatcher
+        self.pools = pools
+        self.max_concurrent = max_concurrent
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.poll_interval = poll_interval
+        self.room_prefix = room_prefix
+        self.metrics = CampaignMetrics()
+        self.audit = AuditWriter()
+        # case id -> (case, pool) for every case this scheduler has in flight
+        self._in_flight: Dict[int, tuple] = {}
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(
+            self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds
+        )
+        return delay * random.uniform(0.8, 1.2)
+
+    def _finish(self, case_id: int) -> None:
+        _, pool = self._in_flight.pop(case_id)
+        pool.active -= 1
+
+    async def _no_outcome(self, case: QueuedCase, now: float) -> None:
+        """The call ended without an outcome: back off and retry the case, or give up on it"""
+        retry_at = now + self._retry_delay(case.attempts)
+        # Hand it back if the call still holds it (lease timed out); if the agent
+        # already handed it back (customer hung up), this just applies the backoff
+        await asyncio.to_thread(release_case, case.id, case.owner, retry_at)
+        await asyncio.to_thread(defer_pending_case, case.id, retry_at)
+
+        if case.attempts >= self.max_attempts:
+            self.metrics.failed += 1
+            logger.warning(
+                f"Case {case.id}: no outcome after {case.attempts} call attempts"
+            )
+            await asyncio.to_thread(
+                transition_case,
+                case.id,
+                "pending_review",
+                "call_failed",
+                f"No outcome after {case.attempts} call attempts",
+            )
+            self.audit.record(
+                case.id,
+                "call_failed",
+                case.owner,
+                f"No outcome after {case.attempts} call attempts",
+            )
+        else:
+            self.metrics.retried += 1
+            self.audit.record(
+                case.id,
+                "retry_scheduled",
+                case.owner,
+                f"Retry in {retry_at - now:.0f}s",
+            )
+            logger.info(
+                f"Case {case.id}: retrying in {retry_at - now:.0f}s (attempt {case.attempts})"
+            )
+
+    async def _reap(self, now: float) -> None:
+        """Free the slots of calls that reached an outcome or lost their lease"""
+        progress = await asyncio.to_thread(get_case_progress, list(self._in_flight))
+        for case_id in list(self._in_flight):
+            case, _ = self._in_flight[case_id]
+            status, lease_owner, lease_expires_at = progress.get(
+                case_id, (None, None, None)
+            )
+            if status in OUTCOME_STATUSES:
+                self._finish(case_id)
+                self.metrics.record_resolved(now)
+                logger.info(f"Case {case_id} resolved: {status}")
+            elif status == "in_progress" and lease_owner == case.owner:
+                if (lease_expires_at or 0) < now:
+                    self._finish(case_id)
+                    await self._no_outcome(case, now)
+            elif status == "in_progress":
+                # Another call took the case over, e.g. the customer called the bank back
+                self._finish(case_id)
+                logger.info(f"Case {case_id} taken over by {lease_owner}")
+            else:
+                self._finish(case_id)
+                await self._no_outcome(case, now)
+
+    async def _dispatch(self, case: QueuedCase, pool: WorkerPool) -> None:
+        try:
+            await self.dispatcher.dispatch(case, pool)
+        except Exception as e:
+            logger.error(f"Dispatch of case {case.id} to {pool.agent_name} failed: {e}")
+            if case.id in self._in_flight:
+                self._finish(case.id)
+                await self._no_outcome(case, time.time())
+
+    async def tick(self) -> None:
+        now = time.time()
+        await self._reap(now)
+        # Calls whose worker died mid-call (no campaign involved) go back in the queue too
+        reclaimed = await asyncio.to_thread(reclaim_expired_cases, now)
+        if reclaimed:
+            logger.info(f"Reclaimed {reclaimed} cases with expired leases")
+
+        free = min(
+            self.max_concurrent - len(self._in_flight), sum(p.free for p in self.pools)
+        )
+        if free > 0:
+            leased = await asyncio.to_thread(
+                lease_pending_cases, self.room_prefix, free, self.lease_seconds, now
+            )
+            for case in leased:
+                # Least-loaded pool with room, so pools fill evenly
+                pool = max(self.pools, key=lambda p: p.free)
+                pool.active += 1
+                self._in_flight[case.id] = (case, pool)
+                self.metrics.dispatched += 1
+                logger.info(
+                    f"Dispatching case {case.id} (risk {case.risk_score or 0:.0f}, ₹{case.transaction_amount:,.2f}, attempt {case.attempts}) to {pool.agent_name}"
+                )
+                self.audit.record(
+                    case.id,
+                    "dispatched",
+                    case.owner,
+                    f"attempt {case.attempts} to {pool.agent_name}",
+                )
+                await self._dispatch(case, pool)
+
+        self.metrics.in_flight = len(self._in_flight)
+        self.metrics.queue_depth, self.metrics.retry_waiting = await asyncio.to_thread(
+            count_queued_cases, now
+        )
+
+    async def run(self, until_empty: bool = False) -> None:
+        last_report = 0.0
+        while True:
+            try:
+                await self.tick()
+            except sqlite3.Error as e:
+                # Usually "database is locked" while agents write; the in-flight
+                # calls stay tracked and the next tick picks up where this one stopped
+                logger.error(
+                    f"Campaign tick failed, retrying in {self.poll_interval}s: {e}"
+                )
+                await asyncio.sleep(self.poll_interval)
+                continue
+            now = time.time()
+            drained = (
+                not self._in_flight
+                and not self.metrics.queue_depth
+                and not self.metrics.retry_waiting
+            )
+            if now - last_report >= 30 or (until_empty and drained):
+                logger.info(f"Campaign: {self.metrics.snapshot(now)}")
+                last_report = now
+            if until_empty and drained:
+                return
+            await asyncio.sleep(self.poll_interval)
+
+
+async def serve_metrics(metrics: CampaignMetrics, port: int):
+    """Serve the campaign metrics at http://0.0.0.0:<port>/metrics for Prometheus"""
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        await reader.readline()
+        body = metrics.render_prometheus(time.time()).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+            + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "0.0.0.0", port)
+
+
+def parse_pool(spec: str) -> WorkerPool:
+    """Parse 'agent_name=limit'"""
+    agent_name, _, limit = spec.partition("=")
+    return WorkerPool(agent_name, int(limit or 1))
+
+
+async def main(args) -> None:
+    case_store.DB_PATH = args.db
+    await asyncio.to_thread(ensure_schema)
+
+    dispatcher = LocalDispatcher(seed=args.seed) if args.local else LiveKitDispatcher()
+    pools = args.pool or [
+        WorkerPool(os.getenv("LIVEKIT_AGENT_NAME", "fraud-agent"), args.max_concurrent)
+    ]
+    scheduler = CampaignScheduler(
+        dispatcher,
+        pools,
+        args.max_concurrent,
+        lease_seconds=args.lease_seconds,
+        max_attempts=args.max_attempts,
+        retry_base_seconds=args.retry_base_seconds,
+        retry_max_seconds=args.retry_max_seconds,
+        poll_interval=args.poll_interval,
+    )
+    server = (
+        await serve_metrics(scheduler.metrics, args.metrics_port)
+        if args.metrics_port
+        else None
+    )
+    try:
+        await scheduler.run(until_empty=args.until_empty)
+    finally:
+        if server:
+            server.close()
+        await dispatcher.aclose()
+        await scheduler.audit.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Dispatch outbound fraud calls for pending cases"
+    )
+    parser.add_argument("--db", default=case_store.DB_PATH)
+    parser.add_argument(
+        "--pool",
+        type=parse_pool,
+        action="append",
+        help="Worker pool as agent_name=max_concurrent (repeatable)",
+    )
+    parser.add_argument(
+        "--max-concurrent", type=int, default=4, help="Global cap on calls in flight"
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=180.0,
+        help="How long a dispatched call has to join and start renewing its lease",
+    )
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument(
+        "--retry-base-seconds",
+        type=float,
+        default=300.0,
+        help="Backoff before the first retry; doubles with every attempt",
+    )
+    parser.add_argument(
+        "--retry-max-seconds",
+        type=float,
+        default=3600.0,
+        help="Longest backoff between attempts",
+    )
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument(
+        "--metrics-port", type=int, help="Serve Prometheus metrics on this port"
+    )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Simulate calls instead of dispatching to LiveKit",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Random seed for --local call outcomes"
+    )
+    parser.add_argument(
+        "--until-empty", action="store_true", help="Exit once the queue is drained"
+    )
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s"
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,771 @@
+"""
+Read/write access to the fraud_cases table.
+
+Each step of a call fetches only the columns it needs: a CaseLookup to find the
+customer and ask the security question, and CaseDetails once they are verified.
+The security answer itself is never loaded - it is checked inside SQLite.
+"""
+
+import logging
+import sqlite3
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+from risk_scoring import install_risk_trigger, score_cases
+
+logger = logging.getLogger("fraud-agent")
+
+DB_PATH = "fraud_cases.db"
+
+
+def _connect() -> sqlite3.Connection:
+    return sqlite3.connect(DB_PATH)
+
+
+class CaseLookup:
+    """What the agent needs before verification: who the case is for and what to ask"""
+
+    # Selected in this order, the order of __init__'s arguments
+    COLUMNS = ("id", "user_name", "security_identifier", "security_question")
+    __slots__ = ("id", "security_identifier", "security_question", "user_name")
+
+    def __init__(
+        self,
+        case_id: int,
+        user_name: str,
+        security_identifier: str,
+        security_question: str,
+    ) -> None:
+        self.id = case_id
+        self.user_name = user_name
+        self.security_identifier = security_identifier
+        self.security_question = security_question
+
+    def __repr__(self) -> str:
+        return f"CaseLookup(id={self.id}, user_name={self.user_name!r})"
+
+
+class CaseDetails:
+    """The suspicious transaction, only read once the customer has been verified"""
+
+    # Selected in this order, the order of __init__'s arguments
+    COLUMNS = (
+        "id",
+        "card_ending",
+        "transaction_amount",
+        "transaction_name",
+        "transaction_time",
+        "transaction_category",
+        "transaction_source",
+        "transaction_location",
+    )
+    __slots__ = (
+        "card_ending",
+        "id",
+        "transaction_amount",
+        "transaction_category",
+        "transaction_location",
+        "transaction_name",
+        "transaction_source",
+        "transaction_time",
+    )
+
+    def __init__(
+        self,
+        case_id: int,
+        card_ending: str,
+        transaction_amount: float,
+        transaction_name: str,
+        transaction_time: str,
+        transaction_category: str,
+        transaction_source: str,
+        transaction_location: str,
+    ) -> None:
+        self.id = case_id
+        self.card_ending = card_ending
+        self.transaction_amount = transaction_amount
+        self.transaction_name = transaction_name
+        self.transaction_time = transaction_time
+        self.transaction_category = transaction_category
+        self.transaction_source = transaction_source
+        self.transaction_location = transaction_location
+
+    def __repr__(self) -> str:
+        return f"CaseDetails(id={self.id}, transaction_name={self.transaction_name!r})"
+
+
+_LOOKUP_BY_NAME_SQL = f"""
+    SELECT {", ".join(CaseLookup.COLUMNS)} FROM fraud_cases
+    WHERE LOWER(user_name) = LOWER(?)
+    AND status IN ('pending_review', 'in_progress')
+    ORDER BY status DESC, risk_score DESC
+    LIMIT 1
+"""
+
+_LOOKUP_BY_ID_SQL = f"""
+    SELECT {", ".join(CaseLookup.COLUMNS)} FROM fraud_cases
+    WHERE id = ?
+    AND status IN ('pending_review', 'in_progress')
+"""
+
+_DETAILS_BY_ID_SQL = f"""
+    SELECT {", ".join(CaseDetails.COLUMNS)} FROM fraud_cases
+    WHERE id = ?
+"""
+
+
+def get_case_lookup_by_name(user_name: str) -> Optional[CaseLookup]:
+    """Fetch the open case for a customer name, without any transaction data"""
+    try:
+        conn = _connect()
+        try:
+            row = conn.execute(_LOOKUP_BY_NAME_SQL, (user_name,)).fetchone()
+        finally:
+            conn.close()
+        return CaseLookup(*row) if row else None
+    except Exception as e:
+        logger.error(f"Database error: {e}")
+        return None
+
+
+def get_case_lookup_by_id(case_id: int) -> Optional[CaseLookup]:
+    """Fetch an open case by id, e.g. the case an outbound call was dialled for"""
+    try:
+        conn = _connect()
+        try:
+            row = conn.execute(_LOOKUP_BY_ID_SQL, (case_id,)).fetchone()
+        finally:
+            conn.close()
+        return CaseLookup(*row) if row else None
+    except Exception as e:
+        logger.error(f"Database error: {e}")
+        return None
+
+
+def check_security_answer(case_id: int, answer: str) -> bool:
+    """Check an answer against the stored one, case- and whitespace-insensitively"""
+    try:
+        conn = _connect()
+        try:
+            row = conn.execute(
+                """
+                SELECT 1 FROM fraud_cases
+                WHERE id = ? AND LOWER(TRIM(security_answer)) = ?
+            """,
+                (case_id, answer.lower().strip()),
+            ).fetchone()
+        finally:
+            conn.close()
+        return row is not None
+    except Exception as e:
+        logger.error(f"Database error: {e}")
+        return False
+
+
+def get_case_details(case_id: int) -> Optional[CaseDetails]:
+    """Fetch the transaction details for a case"""
+    try:
+        conn = _connect()
+        try:
+            row = conn.execute(_DETAILS_BY_ID_SQL, (case_id,)).fetchone()
+        finally:
+            conn.close()
+        return CaseDetails(*row) if row else None
+    except Exception as e:
+        logger.error(f"Database error: {e}")
+        return None
+
+
+# Case lifecycle. A call takes a case pending_review -> in_progress under a
+# lease, and ends it in one of the outcome statuses (or hands it back to
+# pending_review). Every transition is a single compare-and-set UPDATE on the
+# primary key, so two workers can never both own a case or overwrite an outcome.
+OUTCOME_STATUSES = (
+    "confirmed_safe",
+    "confirmed_fraud",
+    "verification_failed",
+    "call_failed",
+)
+
+
+def acquire_case(case_id: int, owner: str, lease_seconds: float, now: float) -> bool:
+    """
+    Take (or keep) the lease on a case for `owner`.
+
+    Succeeds for a pending case, a case `owner` already holds, or an in-progress
+    case whose lease has expired - i.e. its worker went away mid-call.
+    """
+    try:
+        conn = _connect()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE fraud_cases
+                SET status = 'in_progress', lease_owner = :owner, lease_expires_at = :expires
+                WHERE id = :id
+                AND (status = 'pending_review'
+                     OR (status = 'in_progress' AND (lease_owner = :owner OR lease_expires_at < :now)))
+            """,
+                {
+                    "id": case_id,
+                    "owner": owner,
+                    "expires": now + lease_seconds,
+                    "now": now,
+                },
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return cursor.rowcount == 1
+    except Exception as e:
+        logger.error(f"Database update error: {e}")
+        return False
+
+
+def renew_case_leases(
+    claims: List[Tuple[int, str]], lease_seconds: float, now: float
+) -> Optional[List[Tuple[int, str]]]:
+    """
+    Extend the leases on (case_id, owner) pairs still held by their owner.
+
+    Returns the pairs that were renewed - the others lost their lease - or
+    None if the database could not be updated.
+    """
+    if not claims:
+        return []
+    try:
+        conn = _connect()
+        try:
+            renewed = []
+            with conn:
+                for case_id, owner in claims:
+                    cursor = conn.execute(
+                        """
+                        UPDATE fraud_cases SET lease_expires_at = ?
+                        WHERE id = ? AND status = 'in_progress' AND lease_owner = ?
+                    """,
+                        (now + lease_seconds, case_id, owner),
+                    )
+                    if cursor.rowcount == 1:
+                        renewed.append((case_id, owner))
+        finally:
+            conn.close()
+        return renewed
+    except Exception as e:
+        logger.error(f"Database update error: {e}")
+        return None
+
+
+def transition_case(
+    case_id: int,
+    from_status: str,
+    to_status: str,
+    outcome_note: Optional[str] = None,
+    owner: Optional[str] = None,
+    retry_at: Optional[float] = None,
+) -> bool:
+    """
+    Move a case from `from_status` to `to_status`, clearing its lease.
+
+    Only applies if the case is still in `from_status` (and, if given, still
+    leased to `owner`); returns False if someone else got there first.
+    `retry_at` sets when a case handed back to pending_review may be called again.
+    """
+    try:
+        conn = _connect()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE fraud_cases
+                SET status = :to_status,
+                    outcome_note = COALESCE(:note, outcome_note),
+                    next_attempt_at = COALESCE(:retry_at, next_attempt_at),
+                    lease_owner = NULL,
+                    lease_expires_at = NULL
+                WHERE id = :id AND status = :from_status
+                AND (:owner IS NULL OR lease_owner = :owner)
+            """,
+                {
+                    "id": case_id,
+                    "from_status": from_status,
+                    "to_status": to_status,
+                    "note": outcome_note,
+                    "owner": owner,
+                    "retry_at": retry_at,
+                },
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return cursor.rowcount == 1
+    except Exception as e:
+        logger.error(f"Database update error: {e}")
+        return False
+
+
+def complete_case(
+    case_id: int, owner: str, status: str, outcome_note: str = ""
+) -> bool:
+    """Record the outcome of a call on a case `owner` holds"""
+    if status not in OUTCOME_STATUSES:
+        raise ValueError(f"Not an outcome status: {status}")
+    return transition_case(case_id, "in_progress", status, outcome_note, owner=owner)
+
+
+def release_case(case_id: int, owner: str, retry_at: float) -> bool:
+    """Hand a case `owner` holds back to the queue without an outcome"""
+    return transition_case(
+        case_id, "in_progress", "pending_review", owner=owner, retry_at=retry_at
+    )
+
+
+def reclaim_expired_cases(now: float) -> int:
+    """Put in-progress cases whose lease ran out (their worker died), or that never had one, back in the queue"""
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            """
+            UPDATE fraud_cases
+            SET status = 'pending_review', lease_owner = NULL, lease_expires_at = NULL
+            WHERE status = 'in_progress' AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+        """,
+            (now,),
+        )
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+# Columns added after the original schema, for the outbound call campaign.
+# ensure_schema() adds any that an existing database is missing.
+CAMPAIGN_COLUMNS = {
+    "lease_owner": "TEXT",
+    "lease_expires_at": "REAL",
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+    "next_attempt_at": "REAL NOT NULL DEFAULT 0",
+    # Maintained by risk_scoring's triggers; see risk_scoring.py
+    "risk_score": "REAL",
+    # Number the campaign's agent dials for the case
+    "phone_number": "TEXT",
+}
+
+CAMPAIGN_INDEXES = {
+    # Call queue order: riskiest first, then biggest amounts, then oldest transactions
+    "idx_fraud_cases_risk_queue": "fraud_cases (status, risk_score DESC, transaction_amount DESC, transaction_time)",
+    # Queue depth: callable vs. waiting out a retry backoff, counted as index ranges
+    "idx_fraud_cases_retry": "fraud_cases (status, next_attempt_at)",
+}
+# Indexes replaced by the ones above
+_DROPPED_INDEXES = ("idx_fraud_cases_queue",)
+
+# Append-only audit trail, one row per thing that happened on a case
+_CASE_EVENTS_DDL = (
+    """CREATE TABLE IF NOT EXISTS case_events (
+        id INTEGER PRIMARY KEY,
+        case_id INTEGER NOT NULL,
+        event TEXT NOT NULL,
+        actor TEXT NOT NULL DEFAULT '',
+        detail TEXT NOT NULL DEFAULT '',
+        created_at REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_case_events_case ON case_events (case_id, id)",
+)
+
+
+# PRAGMA user_version records which one-time migration steps a database has had:
+# 1 - the name index was built over the existing cases
+# 2 - the existing cases were risk-scored (new ones are scored by the trigger)
+SCHEMA_VERSION = 2
+
+# How long ensure_schema() waits for another process that is migrating the same database
+MIGRATION_TIMEOUT_SECONDS = 600
+
+
+def ensure_schema():
+    """
+    Add the campaign columns, indexes, risk scoring, name index and case_events table to an existing database.
+
+    Safe to run from several processes at once: the DDL runs in one BEGIN
+    IMMEDIATE transaction, so whoever gets the write lock first migrates and the
+    others find the columns already there. Slow steps over every existing case
+    run once, as recorded in user_version. Run it when deploying (setup_database.py,
+    the campaign scheduler) - not when an agent worker starts.
+    """
+    conn = sqlite3.connect(DB_PATH, timeout=MIGRATION_TIMEOUT_SECONDS)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(fraud_cases)")}
+        for column, definition in CAMPAIGN_COLUMNS.items():
+            if column not in existing:
+                conn.execute(
+                    f"ALTER TABLE fraud_cases ADD COLUMN {column} {definition}"
+                )
+        for name in _DROPPED_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        for name, definition in CAMPAIGN_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        install_risk_trigger(conn)
+        for statement in _CASE_EVENTS_DDL:
+            conn.execute(statement)
+        _ensure_name_index(conn, rebuild=version < 1)
+        conn.execute(f"PRAGMA user_version = {max(version, 1)}")
+        conn.commit()
+
+        if version < 2:
+            # In batches outside the migration transaction; a concurrent run
+            # just finds nothing left to score
+            score_cases(conn)
+            conn.execute("PRAGMA user_version = 2")
+            conn.commit()
+    finally:
+        conn.close()
+
+
+def schema_version() -> int:
+    """The database's user_version; ensure_schema() has run fully once it is SCHEMA_VERSION"""
+    conn = _connect()
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+# Trigram full-text index over customer names, kept in sync by triggers, so a
+# misheard name ("Jon Smyth") can still find its case. Needs SQLite >= 3.34.
+_NAME_INDEX_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS fraud_cases_name_fts USING fts5(
+        user_name, content='fraud_cases', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS fraud_cases_name_fts_insert AFTER INSERT ON fraud_cases BEGIN
+        INSERT INTO fraud_cases_name_fts (rowid, user_name) VALUES (new.id, new.user_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS fraud_cases_name_fts_delete AFTER DELETE ON fraud_cases BEGIN
+        INSERT INTO fraud_cases_name_fts (fraud_cases_name_fts, rowid, user_name)
+        VALUES ('delete', old.id, old.user_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS fraud_cases_name_fts_update AFTER UPDATE OF user_name ON fraud_cases BEGIN
+        INSERT INTO fraud_cases_name_fts (fraud_cases_name_fts, rowid, user_name)
+        VALUES ('delete', old.id, old.user_name);
+        INSERT INTO fraud_cases_name_fts (rowid, user_name) VALUES (new.id, new.user_name);
+    END""",
+)
+
+
+def _ensure_name_index(conn: sqlite3.Connection, rebuild: bool) -> None:
+    """Create the name index if missing and (re)index the existing cases when it is new or `rebuild` is set"""
+    created = (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'fraud_cases_name_fts'"
+        ).fetchone()
+        is None
+    )
+    # A savepoint, so a SQLite without the trigram tokenizer only loses fuzzy matching
+    conn.execute("SAVEPOINT name_index")
+    try:
+        for statement in _NAME_INDEX_DDL:
+            conn.execute(statement)
+        if created or rebuild:
+            conn.execute(
+                "INSERT INTO fraud_cases_name_fts (fraud_cases_name_fts) VALUES ('rebuild')"
+            )
+        conn.execute("RELEASE name_index")
+    except sqlite3.OperationalError as e:
+        conn.execute("ROLLBACK TO name_index")
+        conn.execute("RELEASE name_index")
+        logger.warning(
+            f"Fuzzy name matching unavailable (needs SQLite FTS5 trigram tokenizer): {e}"
+        )
+
+
+def _name_trigrams(name: str) -> List[str]:
+    text = " ".join(name.lower().split())
+    return sorted({text[i : i + 3] for i in range(len(text) - 2)})
+
+
+# A fuzzy lookup reads at most this many index entries, however large the table
+FUZZY_SCAN_ROWS = 5000
+# Names sharing fewer trigrams with the heard name aren't considered at all
+FUZZY_MIN_SHARED_TRIGRAMS = 2
+
+
+def _rarest_trigrams(conn: sqlite3.Connection, trigrams: List[str]) -> List[str]:
+    """The indexed trigrams of a name, rarest first, while their postings fit in FUZZY_SCAN_ROWS"""
+    conn.execute(
+        """CREATE VIRTUAL TABLE IF NOT EXISTS temp.fraud_cases_name_vocab
+        USING fts5vocab(main, fraud_cases_name_fts, 'row')"""
+    )
+    counts = []
+    for trigram in trigrams:
+        row = conn.execute(
+            "SELECT doc FROM temp.fraud_cases_name_vocab WHERE term = ?", (trigram,)
+        ).fetchone()
+        if row:
+            counts.append((row[0], trigram))
+    counts.sort()
+    selected, total = [], 0
+    for doc_count, trigram in counts:
+        if selected and total + doc_count > FUZZY_SCAN_ROWS:
+            break
+        selected.append(trigram)
+        total += doc_count
+    return selected
+
+
+def find_case_lookup_fuzzy(
+    user_name: str, min_similarity: float = 0.75, candidates: int = 20
+) -> Optional[Tuple[CaseLookup, float]]:
+    """
+    Find the open case whose customer name best matches a possibly misheard name.
+
+    The trigram index gives the open cases containing the name's rarest trigrams,
+    newest first and at most FUZZY_SCAN_ROWS of them, so the work stays bounded
+    on a large table. Their names are narrowed to the `candidates` sharing the
+    most trigrams with `user_name` (at least FUZZY_MIN_SHARED_TRIGRAMS), those
+    are scored by string similarity, and the best one is returned if it scores
+    at least `min_similarity`.
+    """
+    trigrams = _name_trigrams(user_name)
+    if not trigrams:
+        return None
+    try:
+        conn = _connect()
+        try:
+            rare = _rarest_trigrams(conn, trigrams)
+            if not rare:
+                return None
+            match = " OR ".join(
+                '"' + trigram.replace('"', '""') + '"' for trigram in rare
+            )
+            # CROSS JOIN keeps the index as the outer loop, read in rowid order up to the limit
+            rows = conn.execute(
+                f"""
+                SELECT {", ".join("c." + column for column in CaseLookup.COLUMNS)}
+                FROM fraud_cases_name_fts f
+                CROSS JOIN fraud_cases c ON c.id = f.rowid
+                WHERE fraud_cases_name_fts MATCH ?
+                AND c.status IN ('pending_review', 'in_progress')
+                ORDER BY f.rowid DESC
+                LIMIT ?
+            """,
+                (match, FUZZY_SCAN_ROWS),
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.OperationalError as e:
+        logger.error(f"Fuzzy name lookup failed: {e}")
+        return None
+
+    # Newest open case per distinct name
+    newest: Dict[str, tuple] = {}
+    for row in rows:
+        newest.setdefault(row[1].lower(), row)
+    heard_trigrams = set(trigrams)
+    min_shared = min(FUZZY_MIN_SHARED_TRIGRAMS, len(trigrams))
+    shared = {
+        name: len(heard_trigrams.intersection(_name_trigrams(name))) for name in newest
+    }
+    ranked = sorted(
+        (name for name in newest if shared[name] >= min_shared),
+        key=lambda name: shared[name],
+        reverse=True,
+    )[:candidates]
+
+    heard = " ".join(user_name.lower().split())
+    best, best_score = None, 0.0
+    for name in ranked:
+        score = SequenceMatcher(None, heard, name).ratio()
+        if score > best_score:
+            best, best_score = newest[name], score
+    if best is None or best_score < min_similarity:
+        return None
+    return CaseLookup(*best), best_score
+
+
+class QueuedCase:
+    """A case leased to the campaign for an outbound call"""
+
+    __slots__ = (
+        "attempts",
+        "id",
+        "owner",
+        "phone_number",
+        "risk_score",
+        "transaction_amount",
+        "user_name",
+    )
+
+    def __init__(
+        self,
+        case_id: int,
+        user_name: str,
+        transaction_amount: float,
+        risk_score: Optional[float],
+        attempts: int,
+        owner: str,
+        phone_number: Optional[str] = None,
+    ) -> None:
+        self.id = case_id
+        self.user_name = user_name
+        self.transaction_amount = transaction_amount
+        self.risk_score = risk_score
+        self.attempts = attempts
+        self.owner = owner
+        self.phone_number = phone_number
+
+    def __repr__(self) -> str:
+        return (
+            f"QueuedCase(id={self.id}, attempts={self.attempts}, owner={self.owner!r})"
+        )
+
+
+def lease_pending_cases(
+    owner_prefix: str, limit: int, lease_seconds: float, now: float
+) -> List[QueuedCase]:
+    """
+    Lease up to `limit` callable cases for outbound calls, highest priority first.
+
+    A case is callable while it is pending review and past its retry backoff.
+    Each one moves to in_progress, leased to "<owner_prefix>-<case id>-<attempt>";
+    the campaign names the call's room after it, so the agent that joins the
+    room already owns the lease and just renews it.
+    """
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        candidates = conn.execute(
+            """
+            SELECT id, user_name, transaction_amount, risk_score, attempts, phone_number FROM fraud_cases
+            WHERE status = 'pending_review' AND next_attempt_at <= ?
+            ORDER BY status, risk_score DESC, transaction_amount DESC, transaction_time
+            LIMIT ?
+        """,
+            (now, limit),
+        ).fetchall()
+
+        leased = []
+        for (
+            case_id,
+            user_name,
+            amount,
+            risk_score,
+            attempts,
+            phone_number,
+        ) in candidates:
+            owner = f"{owner_prefix}-{case_id}-{attempts + 1}"
+            cursor = conn.execute(
+                """
+                UPDATE fraud_cases
+                SET status = 'in_progress', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1
+                WHERE id = ? AND status = 'pending_review'
+            """,
+                (owner, now + lease_seconds, case_id),
+            )
+            if cursor.rowcount == 1:
+                leased.append(
+                    QueuedCase(
+                        case_id,
+                        user_name,
+                        amount,
+                        risk_score,
+                        attempts + 1,
+                        owner,
+                        phone_number,
+                    )
+                )
+        conn.commit()
+        return leased
+    finally:
+        conn.close()
+
+
+def get_case_progress(
+    case_ids: List[int],
+) -> Dict[int, Tuple[str, Optional[str], Optional[float]]]:
+    """Current (status, lease_owner, lease_expires_at) for each case id"""
+    if not case_ids:
+        return {}
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT id, status, lease_owner, lease_expires_at FROM fraud_cases
+            WHERE id IN ({", ".join("?" for _ in case_ids)})
+        """,
+            case_ids,
+        ).fetchall()
+    finally:
+        conn.close()
+    return {row[0]: row[1:] for row in rows}
+
+
+def defer_pending_case(case_id: int, retry_at: float) -> bool:
+    """Push back the next call attempt on a pending case"""
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            """
+            UPDATE fraud_cases SET next_attempt_at = ?
+            WHERE id = ? AND status = 'pending_review'
+        """,
+            (retry_at, case_id),
+        )
+        conn.commit()
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def count_queued_cases(now: float) -> Tuple[int, int]:
+    """(cases callable right now, pending cases still waiting out a retry backoff)"""
+    conn = _connect()
+    try:
+        # Two range counts over idx_fraud_cases_retry, so no table rows are read
+        ready, waiting = conn.execute(
+            """
+            SELECT
+                (SELECT COUNT(*) FROM fraud_cases WHERE status = 'pending_review' AND next_attempt_at <= :now),
+                (SELECT COUNT(*) FROM fraud_cases WHERE status = 'pending_review' AND next_attempt_at > :now)
+        """,
+            {"now": now},
+        ).fetchone()
+        return ready, waiting
+    finally:
+        conn.close()
+
+
+# (case_id, event, actor, detail, created_at)
+CaseEvent = Tuple[int, str, str, str, float]
+
+
+def append_case_events(events: List[CaseEvent]) -> None:
+    """Append a batch of audit events in a single transaction"""
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO case_events (case_id, event, actor, detail, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                events,
+            )
+    finally:
+        conn.close()
+
+
+def get_case_events(case_id: int) -> List[CaseEvent]:
+    """A case's audit trail, oldest first"""
+    conn = _connect()
+    try:
+        return conn.execute(
+            """
+            SELECT case_id, event, actor, detail, created_at FROM case_events
+            WHERE case_id = ?
+            ORDER BY id
+        """,
+            (case_id,),
+        ).fetchall()
+    finally:
+        conn.close()
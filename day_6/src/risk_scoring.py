@@ -0,0 +1,176 @@
+"""
+Risk scores for fraud cases, used to order the outbound call queue.
+
+A case's score (0-100) is the sum of rule weights for its amount, merchant
+category, transaction location and source domain. The rules compile to one SQL
+expression, so scoring is set-based: the batch job scores a whole range of
+cases per UPDATE, and a trigger scores each new case as it is inserted.
+
+    uv run src/risk_scoring.py --db fraud_cases.db            # score unscored cases
+    uv run src/risk_scoring.py --db fraud_cases.db --rescore  # after changing the rules
+"""
+
+import argparse
+import sqlite3
+import time
+from typing import Dict, List, Tuple
+
+# (minimum amount in rupees, weight), highest band first
+AMOUNT_BANDS: List[Tuple[float, float]] = [
+    (500000, 40),
+    (100000, 32),
+    (50000, 24),
+    (20000, 16),
+    (5000, 8),
+]
+
+CATEGORY_WEIGHTS: Dict[str, float] = {
+    "Money Transfer": 25,
+    "Cryptocurrency": 25,
+    "Gambling": 22,
+    "Gift Cards": 20,
+    "Jewelry & Accessories": 14,
+    "Electronics": 12,
+    "Pharmacy": 12,
+    "Travel": 10,
+    "Gaming & Entertainment": 8,
+    "Fashion & Apparel": 6,
+}
+
+# Matched against the end of transaction_location ("City, Country")
+COUNTRY_WEIGHTS: Dict[str, float] = {
+    "Nigeria": 20,
+    "Russia": 18,
+    "Romania": 14,
+    "Ukraine": 14,
+    "China": 12,
+    "Philippines": 12,
+    "Turkey": 10,
+    "Brazil": 10,
+    "Thailand": 8,
+    "UAE": 6,
+    "UK": 2,
+    "India": 0,
+}
+
+# Matched against the end of transaction_source
+DOMAIN_SUFFIX_WEIGHTS: Dict[str, float] = {
+    ".bet": 15,
+    ".biz": 12,
+    ".xyz": 12,
+    ".io": 8,
+    ".online": 8,
+    ".store": 6,
+    ".shop": 6,
+    ".co": 4,
+}
+
+MAX_RISK_SCORE = 100
+
+RISK_TRIGGER = "fraud_cases_risk_score"
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def risk_score_sql() -> str:
+    """The scoring rules as one SQL expression over a fraud_cases row"""
+    amount = " ".join(
+        f"WHEN transaction_amount >= {low} THEN {weight}"
+        for low, weight in AMOUNT_BANDS
+    )
+    category = " ".join(
+        f"WHEN {_quote(name)} THEN {weight}"
+        for name, weight in CATEGORY_WEIGHTS.items()
+    )
+    country = " ".join(
+        f"WHEN transaction_location LIKE {_quote('%, ' + name)} THEN {weight}"
+        for name, weight in COUNTRY_WEIGHTS.items()
+    )
+    domain = " ".join(
+        f"WHEN transaction_source LIKE {_quote('%' + suffix)} THEN {weight}"
+        for suffix, weight in DOMAIN_SUFFIX_WEIGHTS.items()
+    )
+    return (
+        f"MIN({MAX_RISK_SCORE}, "
+        f"(CASE {amount} ELSE 0 END)"
+        f" + (CASE transaction_category {category} ELSE 0 END)"
+        f" + (CASE {country} ELSE 0 END)"
+        f" + (CASE {domain} ELSE 0 END))"
+    )
+
+
+def install_risk_trigger(conn: sqlite3.Connection) -> None:
+    """(Re)create the triggers that score cases as they are inserted or edited"""
+    expression = risk_score_sql()
+    conn.execute(f"DROP TRIGGER IF EXISTS {RISK_TRIGGER}_insert")
+    conn.execute(f"DROP TRIGGER IF EXISTS {RISK_TRIGGER}_update")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {RISK_TRIGGER}_insert AFTER INSERT ON fraud_cases
+        WHEN new.risk_score IS NULL
+        BEGIN
+            UPDATE fraud_cases SET risk_score = {expression} WHERE id = new.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {RISK_TRIGGER}_update
+        AFTER UPDATE OF transaction_amount, transaction_category, transaction_location, transaction_source
+        ON fraud_cases
+        BEGIN
+            UPDATE fraud_cases SET risk_score = {expression} WHERE id = new.id;
+        END
+    """)
+
+
+def score_cases(
+    conn: sqlite3.Connection, rescore: bool = False, batch_size: int = 50000
+) -> int:
+    """
+    Score every unscored case (every case with `rescore`), one id range per transaction.
+
+    Returns the number of cases scored. Each batch is a single UPDATE over an
+    id range, so a large table never holds the write lock for long.
+    """
+    low, high = conn.execute("SELECT MIN(id), MAX(id) FROM fraud_cases").fetchone()
+    if low is None:
+        return 0
+    sql = f"""
+        UPDATE fraud_cases SET risk_score = {risk_score_sql()}
+        WHERE id BETWEEN ? AND ? {"" if rescore else "AND risk_score IS NULL"}
+    """
+    scored = 0
+    for start in range(low, high + 1, batch_size):
+        with conn:
+            scored += conn.execute(sql, (start, start + batch_size - 1)).rowcount
+    return scored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compute risk scores for fraud cases")
+    parser.add_argument("--db", default="fraud_cases.db")
+    parser.add_argument(
+        "--rescore",
+        action="store_true",
+        help="Rescore every case, not just unscored ones",
+    )
+    parser.add_argument("--batch-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    # Adds the risk_score column, its index and the triggers if they are missing
+    import case_store
+
+    case_store.DB_PATH = args.db
+    case_store.ensure_schema()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        started = time.perf_counter()
+        scored = score_cases(conn, rescore=args.rescore, batch_size=args.batch_size)
+        print(f"✓ Scored {scored:,} cases in {time.perf_counter() - started:.1f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
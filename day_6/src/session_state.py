@@ -0,0 +1,106 @@
+"""
+Call state for the fraud agent.
+
+Per-call state lives on the AgentSession (as its userdata) and is dropped when
+the job shuts down. Anything that has to outlive a single call goes in a
+bounded TTLCache, so a long-running worker keeps a flat memory footprint.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from case_store import CaseDetails, CaseLookup
+
+
+class FraudCallState:
+    """State for one fraud call, attached to the AgentSession as userdata"""
+
+    def __init__(self, call_id: str) -> None:
+        self.call_id = call_id
+        self.case: Optional[CaseLookup] = None
+        self.details: Optional[CaseDetails] = None
+        self.verified = False
+        # Lookups already made on this call, keyed by normalized name, so a
+        # repeated tool call doesn't go back to the database
+        self.lookups: Dict[str, Optional[CaseLookup]] = {}
+        # Case lookup started before the first turn, for calls dialled for a known case
+        self.prefetch: Optional[asyncio.Task[Optional[CaseLookup]]] = None
+
+    def load_case(self, case: CaseLookup) -> None:
+        """Start working on a case; verification always starts over"""
+        if self.case is None or self.case.id != case.id:
+            self.details = None
+        self.case = case
+        self.verified = False
+
+    def clear(self) -> None:
+        """Drop everything held for this call"""
+        self.case = None
+        self.details = None
+        self.verified = False
+        self.lookups.clear()
+        if self.prefetch and not self.prefetch.done():
+            self.prefetch.cancel()
+        self.prefetch = None
+
+
+def normalize_name(user_name: str) -> str:
+    """Key for per-call lookup caching: case and whitespace don't matter"""
+    return " ".join(user_name.lower().split())
+
+
+class TTLCache:
+    """
+    A small size-bounded mapping whose entries expire `ttl` seconds after they were last set.
+
+    Expired entries are evicted lazily on access, and once `maxsize` is reached
+    the least recently set entries are evicted first (reads don't count), so
+    the cache never grows without bound.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 900.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple] = OrderedDict()
+
+    def _purge(self, now: float) -> None:
+        # Entries are kept in insertion order with a fixed TTL, so the expired
+        # ones are always at the front
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            del self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        self._purge(now)
+        self._data.pop(key, None)
+        self._data[key] = (now + self.ttl, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        self._purge(time.monotonic())
+        entry = self._data.get(key)
+        return entry[1] if entry else default
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        self._purge(time.monotonic())
+        entry = self._data.pop(key, None)
+        return entry[1] if entry else default
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of the live (key, value) pairs"""
+        self._purge(time.monotonic())
+        return [(key, value) for key, (_, value) in self._data.items()]
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._purge(time.monotonic())
+        return key in self._data
+
+    def __len__(self) -> int:
+        self._purge(time.monotonic())
+        return len(self._data)
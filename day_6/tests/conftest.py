@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+import case_store
+
+CASES = [
+    # user_name, security_identifier, card_ending, amount, merchant, time, category, source, location, question, answer
+    (
+        "John Smith",
+        "JS2847",
+        "4242",
+        45999.50,
+        "Electronics World Online",
+        "2025-01-01 10:00:00",
+        "Electronics",
+        "electronicsworld.net",
+        "Lagos, Nigeria",
+        "What is your favorite color?",
+        "blue",
+    ),
+    (
+        "Sarah Wilson",
+        "SW1923",
+        "7890",
+        89750.00,
+        "Luxury Fashion Boutique",
+        "2025-01-01 08:00:00",
+        "Fashion & Apparel",
+        "luxuryfashion-outlet.com",
+        "Shanghai, China",
+        "What is your pet's name?",
+        "max",
+    ),
+]
+
+
+@pytest.fixture
+def legacy_fraud_db(tmp_path, monkeypatch):
+    """A small fraud_cases database in the original schema, before ensure_schema()."""
+    db_path = tmp_path / "fraud_cases.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE fraud_cases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_name TEXT NOT NULL,
+            security_identifier TEXT NOT NULL,
+            card_ending TEXT NOT NULL,
+            transaction_amount REAL NOT NULL,
+            transaction_name TEXT NOT NULL,
+            transaction_time TEXT NOT NULL,
+            transaction_category TEXT NOT NULL,
+            transaction_source TEXT NOT NULL,
+            transaction_location TEXT NOT NULL,
+            security_question TEXT NOT NULL,
+            security_answer TEXT NOT NULL,
+            status TEXT DEFAULT 'pending_review',
+            outcome_note TEXT DEFAULT ''
+        )
+    """)
+    conn.executemany(
+        """
+        INSERT INTO fraud_cases (
+            user_name, security_identifier, card_ending, transaction_amount,
+            transaction_name, transaction_time, transaction_category,
+            transaction_source, transaction_location, security_question, security_answer
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        CASES,
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(case_store, "DB_PATH", str(db_path))
+    return db_path
+
+
+@pytest.fixture
+def fraud_db(legacy_fraud_db):
+    """A small fraud_cases database that case_store is pointed at for the test."""
+    case_store.ensure_schema()
+    return legacy_fraud_db
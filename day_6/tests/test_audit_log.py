@@ -0,0 +1,35 @@
+import asyncio
+
+from audit_log import AuditWriter
+from case_store import get_case_events, get_case_lookup_by_name
+
+
+async def test_events_are_written_in_batches(fraud_db) -> None:
+    case = get_case_lookup_by_name("John Smith")
+    audit = AuditWriter(max_events=3, max_delay_ms=60_000)
+
+    audit.record(case.id, "claimed", "call-1")
+    audit.record(case.id, "verified", "call-1")
+    assert get_case_events(case.id) == []
+
+    # The third event fills the batch and flushes all three together
+    audit.record(case.id, "confirmed_safe", "call-1", "Customer authorized it")
+    await audit.aclose()
+
+    events = get_case_events(case.id)
+    assert [event for _, event, *_ in events] == [
+        "claimed",
+        "verified",
+        "confirmed_safe",
+    ]
+    assert events[-1][3] == "Customer authorized it"
+
+
+async def test_partial_batch_is_flushed_after_the_delay(fraud_db) -> None:
+    case = get_case_lookup_by_name("Sarah Wilson")
+    audit = AuditWriter(max_events=100, max_delay_ms=10)
+
+    audit.record(case.id, "claimed", "call-2")
+    await asyncio.sleep(0.2)
+
+    assert [event for _, event, *_ in get_case_events(case.id)] == ["claimed"]
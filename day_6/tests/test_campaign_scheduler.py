@@ -0,0 +1,171 @@
+import asyncio
+import sqlite3
+import time
+
+import campaign_scheduler
+from campaign_scheduler import CampaignScheduler, LocalDispatcher, WorkerPool
+from case_store import count_queued_cases, get_case_events
+
+
+def _cases(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            name: (status, attempts, next_attempt_at)
+            for name, status, attempts, next_attempt_at in conn.execute(
+                "SELECT user_name, status, attempts, next_attempt_at FROM fraud_cases"
+            )
+        }
+    finally:
+        conn.close()
+
+
+async def _run_calls(scheduler, ticks=2):
+    """Dispatch, let the simulated calls finish, then reap them."""
+    for _ in range(ticks):
+        await scheduler.tick()
+        await asyncio.sleep(0.05)
+    await scheduler.dispatcher.aclose()
+    await scheduler.audit.aclose()
+
+
+def _dispatcher(answer_rate, call_seconds=0.0):
+    return LocalDispatcher(
+        min_call_seconds=call_seconds,
+        max_call_seconds=call_seconds,
+        answer_rate=answer_rate,
+        seed=1,
+    )
+
+
+async def test_answered_calls_are_resolved(fraud_db) -> None:
+    scheduler = CampaignScheduler(
+        _dispatcher(answer_rate=1.0), [WorkerPool("fraud-agent", 4)], max_concurrent=4
+    )
+    await _run_calls(scheduler)
+
+    statuses = {status for status, _, _ in _cases(fraud_db).values()}
+    assert statuses <= {"confirmed_safe", "confirmed_fraud"}
+    assert scheduler.metrics.resolved == 2
+    assert scheduler.metrics.in_flight == 0
+
+
+async def test_unanswered_calls_are_retried_with_backoff(fraud_db) -> None:
+    scheduler = CampaignScheduler(
+        _dispatcher(answer_rate=0.0),
+        [WorkerPool("fraud-agent", 4)],
+        max_concurrent=4,
+        retry_base_seconds=300.0,
+    )
+    started = time.time()
+    await _run_calls(scheduler)
+
+    for status, attempts, next_attempt_at in _cases(fraud_db).values():
+        assert (status, attempts) == ("pending_review", 1)
+        # 300s, jittered by +-20%
+        assert started + 240 <= next_attempt_at <= time.time() + 360
+    assert scheduler.metrics.retried == 2
+    assert scheduler.metrics.queue_depth == 0
+    assert scheduler.metrics.retry_waiting == 2
+
+
+def test_backoff_doubles_per_attempt_up_to_the_cap() -> None:
+    scheduler = CampaignScheduler(
+        None, [], max_concurrent=1, retry_base_seconds=100.0, retry_max_seconds=500.0
+    )
+
+    assert 80 <= scheduler._retry_delay(1) <= 120
+    assert 160 <= scheduler._retry_delay(2) <= 240
+    assert 400 <= scheduler._retry_delay(4) <= 600
+    assert 400 <= scheduler._retry_delay(10) <= 600
+
+
+async def test_case_is_marked_call_failed_after_max_attempts(fraud_db) -> None:
+    scheduler = CampaignScheduler(
+        _dispatcher(answer_rate=0.0),
+        [WorkerPool("fraud-agent", 4)],
+        max_concurrent=4,
+        max_attempts=1,
+    )
+    await _run_calls(scheduler)
+
+    assert {status for status, _, _ in _cases(fraud_db).values()} == {"call_failed"}
+    assert scheduler.metrics.failed == 2
+    assert count_queued_cases(0.0) == (0, 0)
+    events = [event for _, event, *_ in get_case_events(1)]
+    assert events == ["dispatched", "call_failed"]
+
+
+class FailingDispatcher:
+    async def dispatch(self, case, pool) -> None:
+        raise ConnectionError("LiveKit unreachable")
+
+    async def aclose(self) -> None:
+        pass
+
+
+async def test_failed_dispatch_frees_the_slot_and_retries(fraud_db) -> None:
+    pool = WorkerPool("fraud-agent", 4)
+    scheduler = CampaignScheduler(FailingDispatcher(), [pool], max_concurrent=4)
+    await _run_calls(scheduler, ticks=1)
+
+    assert pool.active == 0
+    assert scheduler.metrics.retried == 2
+    assert {status for status, _, _ in _cases(fraud_db).values()} == {"pending_review"}
+
+
+async def test_pool_limits_cap_calls_in_flight(fraud_db) -> None:
+    scheduler = CampaignScheduler(
+        _dispatcher(answer_rate=1.0, call_seconds=60.0),
+        [WorkerPool("fraud-agent", 1)],
+        max_concurrent=4,
+    )
+    await scheduler.tick()
+    await scheduler.tick()
+
+    assert scheduler.metrics.dispatched == 1
+    assert scheduler.metrics.in_flight == 1
+    assert scheduler.metrics.queue_depth == 1
+    assert scheduler.pools[0].free == 0
+    await scheduler.dispatcher.aclose()
+    await scheduler.audit.aclose()
+
+
+async def test_calls_are_spread_over_pools(fraud_db) -> None:
+    pools = [WorkerPool("fraud-agent-a", 1), WorkerPool("fraud-agent-b", 1)]
+    scheduler = CampaignScheduler(
+        _dispatcher(answer_rate=1.0, call_seconds=60.0), pools, max_concurrent=4
+    )
+    await scheduler.tick()
+
+    assert [pool.active for pool in pools] == [1, 1]
+    assert scheduler.metrics.dispatched == 2
+    await scheduler.dispatcher.aclose()
+    await scheduler.audit.aclose()
+
+
+async def test_a_locked_database_does_not_stop_the_campaign(
+    fraud_db, monkeypatch
+) -> None:
+    real_lease = campaign_scheduler.lease_pending_cases
+    calls = []
+
+    def flaky_lease(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real_lease(*args)
+
+    monkeypatch.setattr(campaign_scheduler, "lease_pending_cases", flaky_lease)
+    scheduler = CampaignScheduler(
+        _dispatcher(answer_rate=1.0),
+        [WorkerPool("fraud-agent", 4)],
+        max_concurrent=4,
+        poll_interval=0.01,
+    )
+    await asyncio.wait_for(scheduler.run(until_empty=True), timeout=10)
+    await scheduler.dispatcher.aclose()
+    await scheduler.audit.aclose()
+
+    assert len(calls) >= 2
+    assert scheduler.metrics.resolved == 2
@@ -0,0 +1,158 @@
+import sqlite3
+import threading
+
+from case_store import (
+    SCHEMA_VERSION,
+    CaseDetails,
+    CaseLookup,
+    acquire_case,
+    check_security_answer,
+    complete_case,
+    count_queued_cases,
+    ensure_schema,
+    find_case_lookup_fuzzy,
+    get_case_details,
+    get_case_lookup_by_id,
+    get_case_lookup_by_name,
+    lease_pending_cases,
+    reclaim_expired_cases,
+    release_case,
+    schema_version,
+    transition_case,
+)
+
+
+def test_lookup_only_loads_lookup_columns(fraud_db) -> None:
+    """The lookup projection carries what verification needs and nothing else."""
+    case = get_case_lookup_by_name("john SMITH")
+
+    assert isinstance(case, CaseLookup)
+    assert case.user_name == "John Smith"
+    assert case.security_question == "What is your favorite color?"
+    assert not hasattr(case, "security_answer")
+    assert not hasattr(case, "__dict__")
+
+
+def test_security_answer_is_checked_in_the_database(fraud_db) -> None:
+    case = get_case_lookup_by_name("John Smith")
+
+    assert check_security_answer(case.id, "  Blue ")
+    assert not check_security_answer(case.id, "red")
+
+
+def test_details_projection(fraud_db) -> None:
+    case = get_case_lookup_by_name("Sarah Wilson")
+    details = get_case_details(case.id)
+
+    assert isinstance(details, CaseDetails)
+    assert details.card_ending == "7890"
+    assert details.transaction_location == "Shanghai, China"
+
+
+def test_lookup_skips_closed_cases(fraud_db) -> None:
+    case = get_case_lookup_by_name("John Smith")
+    assert transition_case(case.id, "pending_review", "confirmed_safe", "ok")
+
+    assert get_case_lookup_by_name("John Smith") is None
+
+
+def test_lookup_by_id_for_prefetch(fraud_db) -> None:
+    """Outbound calls prefetch by case id; closed cases are not prefetched."""
+    case = get_case_lookup_by_name("Sarah Wilson")
+    assert get_case_lookup_by_id(case.id).user_name == "Sarah Wilson"
+
+    transition_case(case.id, "pending_review", "confirmed_fraud", "blocked")
+    assert get_case_lookup_by_id(case.id) is None
+
+
+def test_campaign_leases_by_priority_and_never_twice(fraud_db) -> None:
+    """Highest risk is called first, and a leased case is not handed out again."""
+    # John's case is smaller but riskier: electronics, from Lagos
+    first = lease_pending_cases("fraud-case", 1, lease_seconds=60, now=1000.0)
+    assert [case.user_name for case in first] == ["John Smith"]
+    assert first[0].attempts == 1
+    assert first[0].owner == f"fraud-case-{first[0].id}-1"
+
+    second = lease_pending_cases("fraud-case", 5, lease_seconds=60, now=1001.0)
+    assert [case.user_name for case in second] == ["Sarah Wilson"]
+    assert count_queued_cases(1002.0) == (0, 0)
+
+
+def test_released_case_waits_out_its_backoff(fraud_db) -> None:
+    (case,) = lease_pending_cases("fraud-case", 1, lease_seconds=60, now=1000.0)
+
+    assert release_case(case.id, case.owner, retry_at=1300.0)
+    assert count_queued_cases(1100.0) == (1, 1)
+    assert [c.id for c in lease_pending_cases("fraud-case", 5, 60, now=1100.0)] != [
+        case.id
+    ]
+    assert case.id in [
+        c.id for c in lease_pending_cases("fraud-case", 5, 60, now=1301.0)
+    ]
+
+
+def test_lease_excludes_other_workers_until_it_expires(fraud_db) -> None:
+    case = get_case_lookup_by_name("John Smith")
+
+    assert acquire_case(case.id, "room-a", lease_seconds=60, now=1000.0)
+    assert acquire_case(case.id, "room-a", lease_seconds=60, now=1010.0)
+    assert not acquire_case(case.id, "room-b", lease_seconds=60, now=1030.0)
+    assert acquire_case(case.id, "room-b", lease_seconds=60, now=1071.0)
+
+    # room-a lost the lease, so its outcome must not overwrite room-b's call
+    assert not complete_case(case.id, "room-a", "confirmed_safe", "late")
+    assert complete_case(case.id, "room-b", "confirmed_fraud", "blocked")
+    assert not acquire_case(case.id, "room-c", lease_seconds=60, now=2000.0)
+
+
+def test_expired_leases_are_reclaimed(fraud_db) -> None:
+    case = get_case_lookup_by_name("Sarah Wilson")
+    acquire_case(case.id, "room-a", lease_seconds=60, now=1000.0)
+
+    assert reclaim_expired_cases(now=1030.0) == 0
+    assert reclaim_expired_cases(now=1061.0) == 1
+    assert count_queued_cases(1061.0) == (2, 0)
+
+
+def test_fuzzy_lookup_recovers_misheard_names(fraud_db) -> None:
+    case, score = find_case_lookup_fuzzy("Jon Smyth")
+    assert case.user_name == "John Smith"
+    assert score >= 0.75
+    assert find_case_lookup_fuzzy("Sarah Wilson")[0].user_name == "Sarah Wilson"
+    assert find_case_lookup_fuzzy("Zed Quux") is None
+
+
+def test_concurrent_migrations_do_not_collide(legacy_fraud_db) -> None:
+    """Workers and the scheduler may all start against an unmigrated database at once."""
+    errors = []
+
+    def migrate() -> None:
+        try:
+            ensure_schema()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=migrate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert schema_version() == SCHEMA_VERSION
+    assert find_case_lookup_fuzzy("Jon Smyth")[0].user_name == "John Smith"
+
+
+def test_leased_case_carries_the_number_to_dial(fraud_db) -> None:
+    conn = sqlite3.connect(fraud_db)
+    with conn:
+        conn.execute(
+            "UPDATE fraud_cases SET phone_number = '+15550100' WHERE user_name = 'John Smith'"
+        )
+    conn.close()
+
+    leased = lease_pending_cases("fraud-case", 2, lease_seconds=60, now=1000.0)
+    assert {case.user_name: case.phone_number for case in leased} == {
+        "John Smith": "+15550100",
+        "Sarah Wilson": None,
+    }
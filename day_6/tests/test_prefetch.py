@@ -0,0 +1,232 @@
+import asyncio
+
+import pytest
+from livekit import api
+
+import agent
+import session_state
+from agent import (
+    FraudAlertAssistant,
+    await_prefetched_case,
+    dial_customer,
+    prefetch_case,
+    read_case_key,
+    read_phone_number,
+)
+from audit_log import AuditWriter
+from case_store import acquire_case, get_case_lookup_by_name, renew_case_leases
+from session_state import FraudCallState, TTLCache
+
+
+@pytest.fixture(autouse=True)
+async def call_worker(monkeypatch):
+    """Fresh worker-wide lease and audit state, with the lease renewer stopped after the test."""
+    monkeypatch.setattr(agent, "active_cases", TTLCache(ttl=agent.CLAIM_TTL_SECONDS))
+    monkeypatch.setattr(agent, "audit", AuditWriter())
+    yield
+    await agent.audit.aclose()
+    if agent._lease_renewer is not None:
+        agent._lease_renewer.cancel()
+        agent._lease_renewer = None
+
+
+@pytest.mark.parametrize(
+    ("metadata", "expected"),
+    [
+        ('{"case_id": 42}', (42, None)),
+        ('{"case_id": "42"}', (42, None)),
+        ('{"user_name": "John Smith"}', (None, "John Smith")),
+        (None, (None, None)),
+        ("", (None, None)),
+        ("{}", (None, None)),
+        ("case 42", (None, None)),
+        ("[42]", (None, None)),
+        ('{"case_id": "forty-two"}', (None, None)),
+        ('{"case_id": [42], "user_name": ""}', (None, None)),
+    ],
+)
+def test_read_case_key(metadata, expected) -> None:
+    """Missing or malformed metadata means no prefetch, never an exception."""
+    assert read_case_key(metadata) == expected
+
+
+def _prefetch(state, case_id=None, user_name=None):
+    state.prefetch = asyncio.create_task(
+        asyncio.to_thread(prefetch_case, case_id, user_name)
+    )
+
+
+async def test_prefetched_case_is_claimed_for_the_call(fraud_db) -> None:
+    case_id = get_case_lookup_by_name("Sarah Wilson").id
+    state = FraudCallState(call_id="fraud-case-2-1")
+    _prefetch(state, case_id=case_id)
+
+    case = await await_prefetched_case(state)
+
+    assert case.user_name == "Sarah Wilson"
+    assert state.case is case
+    assert state.prefetch is None
+    assert state.lookups["sarah wilson"] is case
+    assert not acquire_case(case_id, "another-call", lease_seconds=60, now=0.0)
+
+
+async def test_prefetch_by_name(fraud_db) -> None:
+    state = FraudCallState(call_id="call-1")
+    _prefetch(state, user_name="John Smith")
+
+    assert (await await_prefetched_case(state)).user_name == "John Smith"
+
+
+async def test_no_prefetch_without_a_case_key(fraud_db) -> None:
+    state = FraudCallState(call_id="call-1")
+
+    assert prefetch_case(None, None) is None
+    assert await await_prefetched_case(state) is None
+    assert state.case is None
+
+
+async def test_prefetch_of_an_unknown_case(fraud_db) -> None:
+    state = FraudCallState(call_id="call-1")
+    _prefetch(state, case_id=999)
+
+    assert await await_prefetched_case(state) is None
+    assert state.case is None
+
+
+async def test_prefetched_case_held_by_another_call(fraud_db) -> None:
+    case_id = get_case_lookup_by_name("John Smith").id
+    assert acquire_case(case_id, "other-call", lease_seconds=3600, now=4e9)
+    state = FraudCallState(call_id="call-1")
+    _prefetch(state, case_id=case_id)
+
+    assert await await_prefetched_case(state) is None
+    assert state.case is None
+
+
+class FakeSession:
+    def __init__(self, state):
+        self.userdata = state
+        self.replies = []
+
+    def generate_reply(self, instructions):
+        self.replies.append(instructions)
+
+
+async def _enter(monkeypatch, state):
+    session = FakeSession(state)
+    monkeypatch.setattr(FraudAlertAssistant, "session", property(lambda self: session))
+    await FraudAlertAssistant().on_enter()
+    return session.replies
+
+
+async def test_on_enter_opens_with_the_security_question(fraud_db, monkeypatch) -> None:
+    state = FraudCallState(call_id="call-1")
+    _prefetch(state, *read_case_key('{"case_id": 1}'))
+
+    (reply,) = await _enter(monkeypatch, state)
+
+    assert "John Smith" in reply
+    assert "What is your favorite color?" in reply
+
+
+@pytest.mark.parametrize("metadata", [None, "not json", '{"case_id": "abc"}'])
+async def test_on_enter_without_a_usable_case_key(
+    fraud_db, monkeypatch, metadata
+) -> None:
+    """The agent falls back to asking for the customer's name."""
+    state = FraudCallState(call_id="call-1")
+    case_id, user_name = read_case_key(metadata)
+    if case_id is not None or user_name:
+        _prefetch(state, case_id, user_name)
+
+    assert await _enter(monkeypatch, state) == []
+    assert state.case is None
+
+
+@pytest.mark.parametrize(
+    ("metadata", "expected"),
+    [
+        ('{"case_id": 1, "phone_number": "+15550100"}', "+15550100"),
+        ('{"case_id": 1}', None),
+        ('{"phone_number": ""}', None),
+        ('{"phone_number": 15550100}', None),
+        ("not json", None),
+        (None, None),
+    ],
+)
+def test_read_phone_number(metadata, expected) -> None:
+    assert read_phone_number(metadata) == expected
+
+
+class FakeSIP:
+    def __init__(self, error=None):
+        self.requests = []
+        self.error = error
+
+    async def create_sip_participant(self, request):
+        self.requests.append(request)
+        if self.error:
+            raise self.error
+
+
+class FakeJobContext:
+    def __init__(self, sip):
+        self.api = type("FakeAPI", (), {"sip": sip})()
+        self.room = type("FakeRoom", (), {"name": "fraud-case-1-1"})()
+
+
+async def test_dial_customer_waits_for_the_answer(monkeypatch) -> None:
+    monkeypatch.setattr(agent, "SIP_OUTBOUND_TRUNK_ID", "ST_trunk")
+    sip = FakeSIP()
+
+    assert await dial_customer(FakeJobContext(sip), "+15550100")
+    (request,) = sip.requests
+    assert request.room_name == "fraud-case-1-1"
+    assert request.sip_call_to == "+15550100"
+    assert request.sip_trunk_id == "ST_trunk"
+    assert request.wait_until_answered
+
+
+async def test_unanswered_or_unconfigured_dial_fails(monkeypatch) -> None:
+    busy = FakeSIP(
+        api.TwirpError(
+            "unavailable", "busy", status=503, metadata={"sip_status_code": "486"}
+        )
+    )
+    monkeypatch.setattr(agent, "SIP_OUTBOUND_TRUNK_ID", "ST_trunk")
+    assert not await dial_customer(FakeJobContext(busy), "+15550100")
+
+    monkeypatch.setattr(agent, "SIP_OUTBOUND_TRUNK_ID", "")
+    unused = FakeSIP()
+    assert not await dial_customer(FakeJobContext(unused), "+15550100")
+    assert unused.requests == []
+
+
+def test_renewed_claims_outlive_the_claim_ttl(monkeypatch) -> None:
+    """A long call keeps its claim for as long as its lease keeps being renewed."""
+    now = [1000.0]
+    monkeypatch.setattr(session_state.time, "monotonic", lambda: now[0])
+    agent.active_cases.set(1, "call-1")
+    agent.active_cases.set(2, "call-2")
+
+    for _ in range(3):
+        now[0] += agent.CLAIM_TTL_SECONDS * 0.6
+        claims = agent.active_cases.items()
+        agent.refresh_claims(claims, claims)
+    assert sorted(agent.active_cases.items()) == [(1, "call-1"), (2, "call-2")]
+
+    # call-2's lease was taken over, so it is no longer renewed
+    agent.refresh_claims(agent.active_cases.items(), [(1, "call-1")])
+    assert agent.active_cases.items() == [(1, "call-1")]
+
+
+def test_lost_leases_are_forgotten(fraud_db) -> None:
+    case_id = get_case_lookup_by_name("John Smith").id
+    assert acquire_case(case_id, "call-1", lease_seconds=60, now=1000.0)
+    assert acquire_case(case_id, "call-2", lease_seconds=60, now=1061.0)
+    agent.active_cases.set(case_id, "call-1")
+
+    claims = agent.active_cases.items()
+    agent.refresh_claims(claims, renew_case_leases(claims, 60, now=1070.0))
+
+    assert case_id not in agent.active_cases
@@ -0,0 +1,54 @@
+import sqlite3
+
+import risk_scoring
+from case_store import get_case_lookup_by_name
+
+
+def _scores(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute("SELECT user_name, risk_score FROM fraud_cases"))
+    finally:
+        conn.close()
+
+
+def test_existing_cases_are_scored_when_the_column_is_added(fraud_db) -> None:
+    # 45999.50 (16) + Electronics (12) + Nigeria (20) + .net (0)
+    # 89750.00 (24) + Fashion & Apparel (6) + China (12) + .com (0)
+    assert _scores(fraud_db) == {"John Smith": 48, "Sarah Wilson": 42}
+
+
+def test_new_and_edited_cases_are_scored_by_trigger(fraud_db) -> None:
+    conn = sqlite3.connect(fraud_db)
+    with conn:
+        conn.execute("""
+            INSERT INTO fraud_cases (
+                user_name, security_identifier, card_ending, transaction_amount,
+                transaction_name, transaction_time, transaction_category,
+                transaction_source, transaction_location, security_question, security_answer
+            ) VALUES ('Mike Johnson', 'MJ5612', '3456', 125000.00, 'International Wire Transfer Service',
+                      '2025-01-01 09:00:00', 'Money Transfer', 'quickwire-transfer.biz', 'Moscow, Russia',
+                      'What city were you born in?', 'london')
+        """)
+        conn.execute(
+            "UPDATE fraud_cases SET transaction_location = 'Mumbai, India' WHERE user_name = 'John Smith'"
+        )
+    conn.close()
+
+    scores = _scores(fraud_db)
+    # 125000.00 (32) + Money Transfer (25) + Russia (18) + .biz (12)
+    assert scores["Mike Johnson"] == 87
+    assert scores["John Smith"] == 28
+    assert get_case_lookup_by_name("Mike Johnson") is not None
+
+
+def test_rescore_applies_changed_rules(fraud_db, monkeypatch) -> None:
+    monkeypatch.setitem(risk_scoring.CATEGORY_WEIGHTS, "Fashion & Apparel", 30)
+    conn = sqlite3.connect(fraud_db)
+    try:
+        assert risk_scoring.score_cases(conn) == 0
+        assert risk_scoring.score_cases(conn, rescore=True, batch_size=1) == 2
+    finally:
+        conn.close()
+
+    assert _scores(fraud_db)["Sarah Wilson"] == 66
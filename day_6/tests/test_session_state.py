@@ -0,0 +1,43 @@
+import session_state
+from case_store import CaseLookup
+from session_state import FraudCallState, TTLCache
+
+
+def test_ttl_cache_expires_entries(monkeypatch) -> None:
+    """Entries disappear once their TTL has passed."""
+    now = [1000.0]
+    monkeypatch.setattr(session_state.time, "monotonic", lambda: now[0])
+
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("case-1", "room-a")
+    assert cache.get("case-1") == "room-a"
+
+    now[0] += 61
+    assert cache.get("case-1") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_is_bounded() -> None:
+    """The oldest entries are evicted once maxsize is reached."""
+    cache = TTLCache(maxsize=3, ttl=60)
+    for i in range(10):
+        cache.set(i, str(i))
+
+    assert len(cache) == 3
+    assert 6 not in cache
+    assert cache.get(9) == "9"
+
+
+def test_call_state_resets_verification_on_new_case() -> None:
+    """Loading a different case must never carry over a previous verification."""
+    state = FraudCallState(call_id="room-a")
+    state.load_case(
+        CaseLookup(1, "John Smith", "JS2847", "What is your favorite color?")
+    )
+    state.verified = True
+
+    state.load_case(CaseLookup(2, "Sarah Wilson", "SW1923", "What is your pet's name?"))
+    assert state.verified is False
+
+    state.clear()
+    assert state.case is None
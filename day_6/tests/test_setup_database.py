@@ -0,0 +1,111 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+import case_store
+from case_store import SCHEMA_VERSION, find_case_lookup_fuzzy, reclaim_expired_cases
+from setup_database import bulk_load, generate_cases, parse_status_mix
+
+ANCHOR = datetime(2025, 11, 1, 12, 0, 0)
+
+
+def _rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT * FROM fraud_cases ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def _triggers_and_indexes(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            name
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master"
+                " WHERE tbl_name = 'fraud_cases' AND type IN ('index', 'trigger')"
+            )
+        }
+    finally:
+        conn.close()
+
+
+def test_same_seed_produces_the_same_rows(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(case_store, "DB_PATH", case_store.DB_PATH)
+    first, second = tmp_path / "first.db", tmp_path / "second.db"
+    bulk_load(500, db_path=str(first), seed=7, batch_size=128, anchor_time=ANCHOR)
+    bulk_load(500, db_path=str(second), seed=7, batch_size=128, anchor_time=ANCHOR)
+
+    assert len(_rows(first)) == 500
+    assert _rows(first) == _rows(second)
+    assert list(generate_cases(50, seed=8, anchor_time=ANCHOR)) != list(
+        generate_cases(50, seed=7, anchor_time=ANCHOR)
+    )
+
+
+def test_bulk_load_into_a_migrated_database(fraud_db) -> None:
+    """Triggers and indexes are dropped for the load and the new rows are scored and indexed after."""
+    before = _triggers_and_indexes(fraud_db)
+    bulk_load(200, db_path=str(fraud_db), seed=3, anchor_time=ANCHOR)
+
+    assert before <= _triggers_and_indexes(fraud_db)
+    conn = sqlite3.connect(fraud_db)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        unscored = conn.execute(
+            "SELECT COUNT(*) FROM fraud_cases WHERE risk_score IS NULL"
+        ).fetchone()[0]
+        (name,) = conn.execute(
+            "SELECT user_name FROM fraud_cases"
+            " WHERE id > 2 AND status = 'pending_review' LIMIT 1"
+        ).fetchone()
+    finally:
+        conn.close()
+    assert unscored == 0
+    assert find_case_lookup_fuzzy(name) is not None
+
+
+def _fuzzy_lookup_steps(db_path, monkeypatch, name):
+    """find_case_lookup_fuzzy() on a database, and the SQLite VM steps it took (in tens)"""
+    steps = [0]
+
+    def counting_connect():
+        conn = sqlite3.connect(db_path)
+        conn.set_progress_handler(lambda: steps.__setitem__(0, steps[0] + 1), 10)
+        return conn
+
+    monkeypatch.setattr(case_store, "_connect", counting_connect)
+    return find_case_lookup_fuzzy(name), steps[0]
+
+
+def test_fuzzy_lookup_work_is_bounded_on_a_large_table(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(case_store, "DB_PATH", case_store.DB_PATH)
+    monkeypatch.setattr(case_store, "FUZZY_SCAN_ROWS", 20)
+    small, large = tmp_path / "small.db", tmp_path / "large.db"
+    bulk_load(2000, db_path=str(small), seed=5, anchor_time=ANCHOR)
+    bulk_load(20000, db_path=str(large), seed=5, anchor_time=ANCHOR)
+
+    small_match, small_steps = _fuzzy_lookup_steps(small, monkeypatch, "Jon Smyth")
+    large_match, large_steps = _fuzzy_lookup_steps(large, monkeypatch, "Jon Smyth")
+
+    assert small_match[0].user_name == large_match[0].user_name == "John Smith"
+    # Ten times the cases, about the same work
+    assert large_steps < 2 * small_steps
+    assert _fuzzy_lookup_steps(large, monkeypatch, "Zed Quux")[0] is None
+
+
+def test_every_status_can_be_generated(fraud_db) -> None:
+    mix = parse_status_mix("in_progress=1,call_failed=1")
+    bulk_load(20, db_path=str(fraud_db), seed=1, status_mix=mix, anchor_time=ANCHOR)
+
+    statuses = [row[12] for row in _rows(fraud_db)[2:]]
+    assert set(statuses) == {"in_progress", "call_failed"}
+    # Generated in-progress cases have no lease to wait out
+    assert reclaim_expired_cases(now=0.0) == statuses.count("in_progress")
+
+
+def test_unknown_status_is_rejected() -> None:
+    with pytest.raises(ValueError, match="Unknown status"):
+        parse_status_mix("pending=1")
@@ -0,0 +1,85 @@
+import csv
+import json
+
+from case_store import append_case_events, get_case_lookup_by_name, transition_case
+from view_cases import main
+
+
+def test_list_is_the_default_command(fraud_db, capsys) -> None:
+    main(["--db", str(fraud_db)])
+
+    out = capsys.readouterr().out
+    assert "John Smith" in out
+    assert "Sarah Wilson" in out
+
+
+def test_list_pages_by_id(fraud_db, capsys) -> None:
+    main(["list", "--db", str(fraud_db), "--limit", "1", "--page-size", "1"])
+    first = capsys.readouterr().out
+    assert "John Smith" in first
+    assert "Sarah Wilson" not in first
+    assert "Next page: --after-id 1" in first
+
+    main(["list", "--db", str(fraud_db), "--after-id", "1"])
+    assert "John Smith" not in capsys.readouterr().out
+
+
+def test_summary_filters_by_status(fraud_db, capsys) -> None:
+    case = get_case_lookup_by_name("Sarah Wilson")
+    transition_case(case.id, "pending_review", "confirmed_fraud", "blocked")
+
+    main(["summary", "--db", str(fraud_db), "--status", "confirmed_fraud"])
+
+    out = capsys.readouterr().out
+    assert "confirmed_fraud" in out
+    assert "89,750.00" in out
+    assert "pending_review" not in out
+
+
+def test_export_csv_leaves_out_the_security_answer(fraud_db, tmp_path) -> None:
+    output = tmp_path / "cases.csv"
+    main(["export", "--db", str(fraud_db), "-o", str(output)])
+
+    with open(output, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["user_name"] for row in rows] == ["John Smith", "Sarah Wilson"]
+    assert "security_answer" not in rows[0]
+    assert "security_question" not in rows[0]
+
+
+def test_export_jsonl_to_stdout(fraud_db, capsys) -> None:
+    main(
+        ["export", "--db", str(fraud_db), "--format", "jsonl", "--card-ending", "7890"]
+    )
+
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [row["user_name"] for row in rows] == ["Sarah Wilson"]
+
+
+def test_events_prints_the_audit_trail(fraud_db, capsys) -> None:
+    case = get_case_lookup_by_name("John Smith")
+    append_case_events(
+        [
+            (case.id, "claimed", "call-1", "", 1_700_000_000.0),
+            (
+                case.id,
+                "confirmed_safe",
+                "call-1",
+                "Customer authorized it",
+                1_700_000_060.0,
+            ),
+        ]
+    )
+
+    main(["events", str(case.id), "--db", str(fraud_db)])
+
+    out = capsys.readouterr().out
+    assert out.index("claimed") < out.index("confirmed_safe")
+    assert "Customer authorized it" in out
+
+
+def test_events_without_an_audit_table(legacy_fraud_db, capsys) -> None:
+    """A database from before the audit trail gets a message, not a traceback."""
+    main(["events", "1", "--db", str(legacy_fraud_db)])
+
+    assert "no case_events table" in capsys.readouterr().out
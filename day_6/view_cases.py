@@ -1,21 +1,262 @@
+import argparse
+import csv
+import json
 import sqlite3
+import sys
+from datetime import datetime
 
-conn = sqlite3.connect('fraud_cases.db')
-conn.row_factory = sqlite3.Row
-cursor = conn.cursor()
-cursor.execute('SELECT user_name, card_ending, transaction_amount, status, outcome_note FROM fraud_cases')
-
-print("\n" + "="*70)
-print("🏦 SECUREBANK FRAUD CASES DATABASE")
-print("="*70)
-
-for row in cursor.fetchall():
-    status_emoji = "✅" if row['status'] == 'confirmed_safe' else "🚨" if row['status'] == 'confirmed_fraud' else "⏳"
-    print(f"\n{status_emoji} {row['user_name']}")
-    print(f"   Card: ****{row['card_ending']} | Amount: ₹{row['transaction_amount']:,.2f}")
-    print(f"   Status: {row['status']}")
-    if row['outcome_note']:
-        print(f"   Note: {row['outcome_note']}")
-
-print("\n" + "="*70 + "\n")
-conn.close()
\ No newline at end of file
+DB_PATH = "fraud_cases.db"
+
+# Everything except the security question/answer, which never leave the database
+REPORT_COLUMNS = (
+    "id",
+    "user_name",
+    "card_ending",
+    "transaction_amount",
+    "transaction_name",
+    "transaction_time",
+    "transaction_category",
+    "transaction_source",
+    "transaction_location",
+    "status",
+    "outcome_note",
+)
+
+
+def build_filters(args):
+    """Turn the CLI filters into a WHERE clause and its parameters"""
+    clauses, params = [], []
+    if args.status:
+        clauses.append(f"status IN ({', '.join('?' for _ in args.status)})")
+        params.extend(args.status)
+    if args.since:
+        clauses.append("transaction_time >= ?")
+        params.append(args.since)
+    if args.until:
+        clauses.append("transaction_time < ?")
+        params.append(args.until)
+    if args.card_ending:
+        clauses.append("card_ending = ?")
+        params.append(args.card_ending)
+    return clauses, params
+
+
+def iter_cases(conn, clauses, params, after_id=0, page_size=1000, limit=None):
+    """
+    Stream matching cases in id order, one keyset page at a time.
+
+    Each page is `WHERE id > last_id ... ORDER BY id LIMIT page_size`, so every
+    page is an index seek and only one page of rows is held in memory.
+    """
+    sql = f"""
+        SELECT {", ".join(REPORT_COLUMNS)} FROM fraud_cases
+        WHERE {" AND ".join(["id > ?", *clauses])}
+        ORDER BY id
+        LIMIT ?
+    """
+    last_id = after_id
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        rows = 0
+        for row in conn.execute(sql, (last_id, *params, size)):
+            rows += 1
+            last_id = row["id"]
+            yield row
+        if remaining is not None:
+            remaining -= rows
+        if rows < size:
+            break
+
+
+def print_cases(conn, args):
+    clauses, params = build_filters(args)
+
+    print("\n" + "=" * 70)
+    print("🏦 SECUREBANK FRAUD CASES DATABASE")
+    print("=" * 70)
+
+    last_id = None
+    shown = 0
+    for row in iter_cases(
+        conn, clauses, params, args.after_id, args.page_size, args.limit
+    ):
+        status_emoji = (
+            "✅"
+            if row["status"] == "confirmed_safe"
+            else "🚨"
+            if row["status"] == "confirmed_fraud"
+            else "⏳"
+        )
+        print(f"\n{status_emoji} {row['user_name']}")
+        print(
+            f"   Card: ****{row['card_ending']} | Amount: ₹{row['transaction_amount']:,.2f}"
+        )
+        print(f"   Status: {row['status']}")
+        if row["outcome_note"]:
+            print(f"   Note: {row['outcome_note']}")
+        last_id = row["id"]
+        shown += 1
+
+    print("\n" + "=" * 70)
+    if args.limit is not None and shown == args.limit:
+        print(f"Showing {shown} cases. Next page: --after-id {last_id}")
+    print()
+
+
+def print_summary(conn, args):
+    clauses, params = build_filters(args)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = conn.execute(
+        f"""
+        SELECT status, COUNT(*) AS cases, SUM(transaction_amount) AS total,
+               AVG(transaction_amount) AS average, MAX(transaction_amount) AS largest
+        FROM fraud_cases
+        {where}
+        GROUP BY status
+        ORDER BY cases DESC
+    """,
+        params,
+    ).fetchall()
+
+    print("\n" + "=" * 70)
+    print("🏦 SECUREBANK FRAUD CASES SUMMARY")
+    print("=" * 70)
+    print(f"\n{'Status':<22}{'Cases':>10}{'Total (₹)':>20}{'Average (₹)':>16}")
+    total_cases, total_amount = 0, 0.0
+    for row in rows:
+        print(
+            f"{row['status']:<22}{row['cases']:>10,}{row['total']:>20,.2f}{row['average']:>16,.2f}"
+        )
+        total_cases += row["cases"]
+        total_amount += row["total"]
+    print("-" * 68)
+    print(f"{'All':<22}{total_cases:>10,}{total_amount:>20,.2f}")
+    print()
+
+
+def write_cases(conn, args, out):
+    clauses, params = build_filters(args)
+    rows = iter_cases(conn, clauses, params, args.after_id, args.page_size, args.limit)
+    if args.format == "csv":
+        writer = csv.writer(out)
+        writer.writerow(REPORT_COLUMNS)
+        for row in rows:
+            writer.writerow(tuple(row))
+    else:
+        for row in rows:
+            out.write(
+                json.dumps(dict(zip(REPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+            )
+
+
+def export_cases(conn, args):
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            write_cases(conn, args, out)
+    else:
+        write_cases(conn, args, sys.stdout)
+
+
+def print_events(conn, args):
+    """Print a case's audit trail from the case_events table, oldest first"""
+    has_events = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'case_events'"
+    ).fetchone()
+    if not has_events:
+        print(
+            f"No audit trail in '{args.db}': it has no case_events table. "
+            "Run `uv run setup_database.py --migrate-only` to add it."
+        )
+        return
+
+    rows = conn.execute(
+        """
+        SELECT event, actor, detail, created_at FROM case_events
+        WHERE case_id = ?
+        ORDER BY id
+    """,
+        (args.case_id,),
+    ).fetchall()
+
+    print("\n" + "=" * 70)
+    print(f"🏦 AUDIT TRAIL FOR CASE {args.case_id}")
+    print("=" * 70)
+    for row in rows:
+        when = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"\n{when}  {row['event']:<22}{row['actor']}")
+        if row["detail"]:
+            print(f"   {row['detail']}")
+    if not rows:
+        print("\nNo events recorded for this case.")
+    print("\n" + "=" * 70 + "\n")
+
+
+def main(argv=None):
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument(
+        "--db", default=DB_PATH, help="Database file (default: %(default)s)"
+    )
+    filters.add_argument(
+        "--status", action="append", help="Only cases with this status (repeatable)"
+    )
+    filters.add_argument(
+        "--since", help="Transactions at or after this time, e.g. 2025-11-01"
+    )
+    filters.add_argument(
+        "--until", help="Transactions before this time, e.g. 2025-12-01"
+    )
+    filters.add_argument("--card-ending", help="Only cases for this card ending")
+
+    paging = argparse.ArgumentParser(add_help=False)
+    paging.add_argument(
+        "--after-id", type=int, default=0, help="Resume after this case id"
+    )
+    paging.add_argument("--limit", type=int, help="Stop after this many cases")
+    paging.add_argument(
+        "--page-size",
+        type=int,
+        default=1000,
+        help="Rows fetched per query (default: %(default)s)",
+    )
+
+    parser = argparse.ArgumentParser(description="Report on SecureBank fraud cases")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("list", parents=[filters, paging], help="Print cases (default)")
+    commands.add_parser(
+        "summary", parents=[filters], help="Case counts and amounts by status"
+    )
+    export = commands.add_parser(
+        "export", parents=[filters, paging], help="Export cases as CSV or JSONL"
+    )
+    export.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    export.add_argument("-o", "--output", help="Output file (default: stdout)")
+    events = commands.add_parser("events", help="Audit trail of one case")
+    events.add_argument("case_id", type=int)
+    events.add_argument(
+        "--db", default=DB_PATH, help="Database file (default: %(default)s)"
+    )
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or (
+        argv[0] not in commands.choices and argv[0] not in ("-h", "--help")
+    ):
+        argv = ["list", *argv]
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    conn.row_factory = sqlite3.Row
+    try:
+        if args.command == "summary":
+            print_summary(conn, args)
+        elif args.command == "export":
+            export_cases(conn, args)
+        elif args.command == "events":
+            print_events(conn, args)
+        else:
+            print_cases(conn, args)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()